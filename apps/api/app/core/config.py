@@ -16,6 +16,8 @@ class Settings(BaseSettings):
 
     worker_id: str | None = None
     poll_interval_seconds: float = 2
+    # How long a succeeded job still answers enqueues with its dedupe_key
+    job_dedupe_window_seconds: float = 300
     
     # AI/LLM settings
     anthropic_api_key: str | None = None
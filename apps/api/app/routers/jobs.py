@@ -7,9 +7,16 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
 from app.core.security import get_current_profile, Profile, require_role
 from app.db.session import get_pool
-from app.services.job_queue_service import enqueue_job, get_job_status, list_jobs
+from app.services.job_queue_service import (
+    JOB_PRIORITY_INTERACTIVE,
+    enqueue_job,
+    get_job_status,
+    get_queue_stats,
+    list_jobs,
+)
 
 
 router = APIRouter(prefix="/v1/jobs", tags=["jobs"])
@@ -21,6 +28,18 @@ class EnqueueJobRequest(BaseModel):
     type: str = Field(..., description="Job type (ai_enrich, schedule_run)")
     payload: dict[str, Any] = Field(..., description="Job payload (JSON)")
     max_attempts: int = Field(3, ge=1, le=10, description="Maximum retry attempts")
+    priority: int = Field(
+        JOB_PRIORITY_INTERACTIVE,
+        ge=0,
+        le=100,
+        description="Claim priority, higher first (bulk imports should use 0)",
+    )
+    dedupe_key: str | None = Field(
+        None,
+        min_length=1,
+        max_length=200,
+        description="Idempotency key; repeats return the matching queued, running or recently succeeded job",
+    )
 
 
 class EnqueueJobResponse(BaseModel):
@@ -40,13 +59,43 @@ class JobStatusResponse(BaseModel):
     run_after: str
     attempts: int
     max_attempts: int
+    priority: int = 0
     locked_at: str | None
     locked_by: str | None
+    lease_expires_at: str | None = None
+    dedupe_key: str | None = None
     error: str | None
+    error_class: str | None = None
     created_at: str
     updated_at: str | None
 
 
+class JobTypeStats(BaseModel):
+    """Queue counts for one job type."""
+    
+    type: str
+    queued: int = 0
+    running: int = 0
+    retrying: int = Field(0, description="Queued jobs that have failed at least once")
+    oldest_queued_age_seconds: float | None = Field(
+        None, description="Seconds the oldest due queued job has waited"
+    )
+    succeeded: int = Field(0, description="Succeeded within the window")
+    dead_lettered: int = Field(0, description="Failed for good within the window")
+    timed_out: int = Field(
+        0,
+        description="Jobs whose last attempt timed out: finished within the window, or waiting to retry",
+    )
+
+
+class JobQueueStatsResponse(BaseModel):
+    """Queue health for the current organization."""
+    
+    window_seconds: float
+    types: list[JobTypeStats]
+    running_by_worker: dict[str, int]
+
+
 @router.post("", response_model=EnqueueJobResponse)
 async def create_job(
     req: EnqueueJobRequest,
@@ -55,7 +104,8 @@ async def create_job(
     """
     Enqueue a job for async processing.
     
-    Only admins and dispatchers can enqueue jobs.
+    Only admins and dispatchers can enqueue jobs. With a `dedupe_key`, a
+    repeated request returns the existing job's ID instead of a new job.
     """
     # Validate job type
     valid_types = ["ai_enrich", "schedule_run"]
@@ -72,11 +122,30 @@ async def create_job(
         job_type=req.type,
         payload=req.payload,
         max_attempts=req.max_attempts,
+        priority=req.priority,
+        dedupe_key=req.dedupe_key,
+        dedupe_window_seconds=settings.job_dedupe_window_seconds,
     )
     
     return EnqueueJobResponse(job_id=job_id)
 
 
+@router.get("/stats", response_model=JobQueueStatsResponse)
+async def get_job_stats(
+    window_minutes: int = Query(60, ge=1, le=1440, description="Window for finished-job counts"),
+    profile: Profile = Depends(get_current_profile),
+) -> JobQueueStatsResponse:
+    """
+    Get queue depth, wait and failure counts for the current organization.
+    
+    Declared before `/{job_id}` so "stats" is not taken for a job ID.
+    """
+    pool = await get_pool()
+    stats = await get_queue_stats(pool, org_id=profile.org_id, window_seconds=window_minutes * 60)
+    
+    return JobQueueStatsResponse(**stats)
+
+
 @router.get("/{job_id}", response_model=JobStatusResponse)
 async def get_job(
     job_id: str,
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
@@ -26,6 +27,11 @@ class CreateScheduleRunRequest(BaseModel):
     horizon_start: datetime = Field(..., description="Start of scheduling horizon")
     horizon_end: datetime = Field(..., description="End of scheduling horizon")
     trigger: str = Field("manual", description="Trigger type")
+    # The worker's PROFILES (apps/worker/app/scheduler/profiles.py); others get a 422
+    solver_profile: Literal["fast", "balanced", "thorough"] | None = Field(
+        None,
+        description="Solver profile for this run (default: org setting, then task count)",
+    )
 
 
 class CreateScheduleRunResponse(BaseModel):
@@ -66,6 +72,7 @@ async def create_schedule(
         horizon_start=req.horizon_start,
         horizon_end=req.horizon_end,
         trigger=req.trigger,
+        solver_profile=req.solver_profile,
     )
     
     return CreateScheduleRunResponse(**result)
@@ -9,6 +9,18 @@ from uuid import UUID
 
 import asyncpg
 
+# Workers LISTEN here to wake up as soon as a job is enqueued
+JOB_NOTIFY_CHANNEL = "job_queue_ready"
+
+# Claim priorities (0-100, higher first); rows inserted without one get 0
+JOB_PRIORITY_BULK = 0  # imports, backfills, background maintenance
+JOB_PRIORITY_NORMAL = 50
+JOB_PRIORITY_INTERACTIVE = 100  # a user is waiting on the result
+
+
+# Statement attempts when a concurrent enqueue with the same dedupe key wins
+_DEDUPE_ATTEMPTS = 3
+
 
 async def enqueue_job(
     pool: asyncpg.Pool,
@@ -18,20 +30,31 @@ async def enqueue_job(
     payload: dict[str, Any],
     run_after: datetime | None = None,
     max_attempts: int = 3,
+    priority: int = JOB_PRIORITY_NORMAL,
+    dedupe_key: str | None = None,
+    dedupe_window_seconds: float = 0,
 ) -> str:
     """
-    Enqueue a job for async processing.
+    Enqueue a job for async processing and notify listening workers.
+
+    With a `dedupe_key`, no new job is created while a job of the same org,
+    type and key is queued or running, or succeeded less than
+    `dedupe_window_seconds` ago; that job's ID is returned instead.
 
     Args:
         pool: Database connection pool
         org_id: Organization ID
-        job_type: Job type (ai_enrich, schedule_run)
+        job_type: Job type (ai_enrich, schedule_run, retention)
         payload: Job payload (must be JSON-serializable)
         run_after: Earliest time to run the job (defaults to now)
         max_attempts: Maximum number of retry attempts (default 3)
+        priority: Claim priority, 0-100 (default JOB_PRIORITY_NORMAL); within
+            a priority, workers take turns across orgs
+        dedupe_key: Idempotency key, e.g. a request or webhook delivery ID
+        dedupe_window_seconds: How long after success a key still matches
 
     Returns:
-        Job ID (UUID as string)
+        Job ID (UUID as string) of the new or the matching job
     """
     if run_after is None:
         # Use timezone-aware UTC datetime to avoid timezone conversion issues
@@ -40,23 +63,117 @@ async def enqueue_job(
     # Serialize payload to JSON string for PostgreSQL jsonb column
     payload_json = json.dumps(payload)
 
-    row = await pool.fetchrow(
-        """
-        insert into public.job_queue (org_id, type, payload, status, run_after, max_attempts)
-        values ($1::uuid, $2, $3::jsonb, 'queued', $4::timestamptz, $5)
-        returning id::text as id
-        """,
+    args = (
         str(org_id),
         job_type,
         payload_json,
         run_after,
         max_attempts,
+        JOB_NOTIFY_CHANNEL,
+        priority,
     )
 
-    if row is None:
-        raise RuntimeError("Failed to enqueue job")
+    # The notification is delivered on commit, with run_after so workers can
+    # wait for delayed jobs without polling
+    if dedupe_key is None:
+        row = await pool.fetchrow(
+            """
+            with job as (
+              insert into public.job_queue (org_id, type, payload, status, run_after, max_attempts, priority)
+              values ($1::uuid, $2, $3::jsonb, 'queued', $4::timestamptz, $5, $7)
+              returning id, type, run_after
+            )
+            select
+              id::text as id,
+              pg_notify(
+                $6,
+                json_build_object('type', type, 'run_after', extract(epoch from run_after))::text
+              )
+            from job
+            """,
+            *args,
+        )
+        if row is None:
+            raise RuntimeError("Failed to enqueue job")
+        return row["id"]
+
+    # Return a matching job, or insert; a concurrent insert of the same key
+    # makes ours a no-op, and the next attempt sees the committed winner
+    for _ in range(_DEDUPE_ATTEMPTS):
+        row = await pool.fetchrow(
+            """
+            with existing as (
+              select id
+              from public.job_queue
+              where org_id = $1::uuid
+                and type = $2
+                and dedupe_key = $8
+                and (
+                  status in ('queued', 'running')
+                  or (status = 'succeeded' and updated_at > now() - make_interval(secs => $9))
+                )
+              union all
+              select id
+              from public.job_history
+              where org_id = $1::uuid
+                and type = $2
+                and dedupe_key = $8
+                and status = 'succeeded'
+                and updated_at > now() - make_interval(secs => $9)
+              limit 1
+            ),
+            job as (
+              insert into public.job_queue (
+                org_id, type, payload, status, run_after, max_attempts, priority, dedupe_key
+              )
+              select $1::uuid, $2, $3::jsonb, 'queued', $4::timestamptz, $5, $7, $8
+              where not exists (select 1 from existing)
+              on conflict (org_id, type, dedupe_key)
+                where dedupe_key is not null and status in ('queued', 'running')
+                do nothing
+              returning id, type, run_after
+            )
+            select job.id::text as id
+            from job
+            cross join lateral (
+              select pg_notify(
+                $6,
+                json_build_object('type', job.type, 'run_after', extract(epoch from job.run_after))::text
+              )
+            ) notified
+            union all
+            select id::text from existing
+            """,
+            *args,
+            dedupe_key,
+            dedupe_window_seconds,
+        )
+        if row is not None:
+            return row["id"]
+
+    raise RuntimeError("Failed to enqueue job")
 
-    return row["id"]
+
+# Columns returned by get_job_status and list_jobs, from either table
+_JOB_COLUMNS = """
+  id::text as id,
+  org_id::text as org_id,
+  type,
+  payload,
+  status,
+  run_after,
+  attempts,
+  max_attempts,
+  priority,
+  dedupe_key,
+  locked_at,
+  locked_by,
+  lease_expires_at,
+  error,
+  error_class,
+  created_at,
+  updated_at
+"""
 
 
 async def get_job_status(
@@ -66,7 +183,7 @@ async def get_job_status(
     org_id: UUID | str,
 ) -> dict[str, Any] | None:
     """
-    Get job status by ID.
+    Get job status by ID, whether the job is active or finished.
 
     Args:
         pool: Database connection pool
@@ -76,24 +193,17 @@ async def get_job_status(
     Returns:
         Job record or None if not found
     """
+    # Active jobs are in job_queue, finished ones in job_history (migration 0017)
     row = await pool.fetchrow(
-        """
-        select
-          id::text as id,
-          org_id::text as org_id,
-          type,
-          payload,
-          status,
-          run_after,
-          attempts,
-          max_attempts,
-          locked_at,
-          locked_by,
-          error,
-          created_at,
-          updated_at
+        f"""
+        select {_JOB_COLUMNS}
         from public.job_queue
         where id = $1::uuid and org_id = $2::uuid
+        union all
+        select {_JOB_COLUMNS}
+        from public.job_history
+        where id = $1::uuid and org_id = $2::uuid
+        limit 1
         """,
         str(job_id),
         str(org_id),
@@ -111,7 +221,7 @@ async def list_jobs(
     limit: int = 100,
 ) -> list[dict[str, Any]]:
     """
-    List jobs for an organization.
+    List active and finished jobs for an organization, newest first.
 
     Args:
         pool: Database connection pool
@@ -134,23 +244,25 @@ async def list_jobs(
         where.append(f"type = ${len(args) + 1}")
         args.append(job_type)
 
+    # Newest of each table first, so both sides stop after `limit` rows
     sql = f"""
-        select
-          id::text as id,
-          org_id::text as org_id,
-          type,
-          payload,
-          status,
-          run_after,
-          attempts,
-          max_attempts,
-          locked_at,
-          locked_by,
-          error,
-          created_at,
-          updated_at
-        from public.job_queue
-        where {' and '.join(where)}
+        select * from (
+          (
+            select {_JOB_COLUMNS}
+            from public.job_queue
+            where {' and '.join(where)}
+            order by created_at desc
+            limit ${len(args) + 1}
+          )
+          union all
+          (
+            select {_JOB_COLUMNS}
+            from public.job_history
+            where {' and '.join(where)}
+            order by created_at desc
+            limit ${len(args) + 1}
+          )
+        ) jobs
         order by created_at desc
         limit ${len(args) + 1}
     """
@@ -158,3 +270,104 @@ async def list_jobs(
 
     rows = await pool.fetch(sql, *args)
     return [dict(r) for r in rows]
+
+
+async def get_queue_stats(
+    pool: asyncpg.Pool,
+    *,
+    org_id: UUID | str,
+    window_seconds: float = 3600,
+) -> dict[str, Any]:
+    """
+    Queue health for an organization.
+
+    Active jobs are counted from the (org_id, status) index, and jobs that
+    finished within `window_seconds` from job_history's (org_id, updated_at)
+    index, so the cost follows the queue's size rather than its history.
+
+    Args:
+        pool: Database connection pool
+        org_id: Organization ID
+        window_seconds: How far back finished jobs are counted
+
+    Returns:
+        Per-type counts and the running jobs per worker
+    """
+    active = await pool.fetch(
+        """
+        select
+          type,
+          count(*) filter (where status = 'queued') as queued,
+          count(*) filter (where status = 'running') as running,
+          count(*) filter (where status = 'queued' and attempts > 0) as retrying,
+          count(*) filter (where status = 'queued' and error_class = 'timeout') as timed_out,
+          extract(epoch from now() - min(run_after) filter (
+            where status = 'queued' and run_after <= now()
+          )) as oldest_queued_age_seconds
+        from public.job_queue
+        where org_id = $1::uuid and status in ('queued', 'running')
+        group by type
+        """,
+        str(org_id),
+    )
+    finished = await pool.fetch(
+        """
+        select
+          type,
+          count(*) filter (where status = 'succeeded') as succeeded,
+          count(*) filter (where status = 'failed') as dead_lettered,
+          count(*) filter (where error_class = 'timeout') as timed_out
+        from (
+          select type, status, error_class
+          from public.job_history
+          where org_id = $1::uuid and updated_at > now() - make_interval(secs => $2)
+          union all
+          -- Finished before job_history existed and not yet moved by retention
+          select type, status, error_class
+          from public.job_queue
+          where org_id = $1::uuid
+            and status in ('succeeded', 'failed')
+            and updated_at > now() - make_interval(secs => $2)
+        ) finished
+        group by type
+        """,
+        str(org_id),
+        window_seconds,
+    )
+    workers = await pool.fetch(
+        """
+        select locked_by, count(*) as running
+        from public.job_queue
+        where org_id = $1::uuid and status = 'running'
+        group by locked_by
+        """,
+        str(org_id),
+    )
+
+    types: dict[str, dict[str, Any]] = {}
+    for row in active:
+        types[row["type"]] = {
+            "type": row["type"],
+            "queued": row["queued"],
+            "running": row["running"],
+            "retrying": row["retrying"],
+            "timed_out": row["timed_out"],
+            "oldest_queued_age_seconds": (
+                float(row["oldest_queued_age_seconds"])
+                if row["oldest_queued_age_seconds"] is not None
+                else None
+            ),
+        }
+    for row in finished:
+        stats = types.setdefault(row["type"], {"type": row["type"]})
+        stats["succeeded"] = row["succeeded"]
+        stats["dead_lettered"] = row["dead_lettered"]
+        stats["timed_out"] = stats.get("timed_out", 0) + row["timed_out"]
+
+    return {
+        "window_seconds": window_seconds,
+        "types": [types[job_type] for job_type in sorted(types)],
+        "running_by_worker": {
+            row["locked_by"] or "unknown": row["running"] for row in workers
+        },
+    }
@@ -9,7 +9,7 @@ import asyncpg
 
 from app.core.security import Profile
 from app.services.audit_service import write_audit_log
-from app.services.job_queue_service import enqueue_job
+from app.services.job_queue_service import JOB_PRIORITY_INTERACTIVE, enqueue_job
 
 
 async def create_schedule_run(
@@ -19,6 +19,7 @@ async def create_schedule_run(
     horizon_start: datetime,
     horizon_end: datetime,
     trigger: str = "manual",
+    solver_profile: str | None = None,
 ) -> dict[str, Any]:
     """
     Create a new schedule run and enqueue job.
@@ -29,6 +30,7 @@ async def create_schedule_run(
         horizon_start: Start of scheduling horizon
         horizon_end: End of scheduling horizon
         trigger: Trigger type (manual, auto_parts, auto_callout, etc.)
+        solver_profile: Solver profile override (fast, balanced, thorough)
     
     Returns:
         Created schedule run with job_id
@@ -68,19 +70,24 @@ async def create_schedule_run(
     
     schedule_run_id = row["id"]
     
+    payload = {
+        "schedule_run_id": schedule_run_id,
+        "org_id": profile.org_id,
+        "horizon_start": horizon_start.isoformat(),
+        "horizon_end": horizon_end.isoformat(),
+        "time_limit_seconds": 30,
+    }
+    if solver_profile:
+        payload["solver_profile"] = solver_profile
+    
     # Enqueue job
     job_id = await enqueue_job(
         pool,
         org_id=profile.org_id,
         job_type="schedule_run",
-        payload={
-            "schedule_run_id": schedule_run_id,
-            "org_id": profile.org_id,
-            "horizon_start": horizon_start.isoformat(),
-            "horizon_end": horizon_end.isoformat(),
-            "time_limit_seconds": 30,
-        },
+        payload=payload,
         max_attempts=1,  # Don't retry scheduling failures
+        priority=JOB_PRIORITY_INTERACTIVE,
     )
     
     # Write audit log
@@ -137,6 +144,8 @@ async def get_schedule_run(
           objective_breakdown,
           solver_status,
           infeasible_reason,
+          metrics,
+          publish_seq,
           created_by::text as created_by,
           created_at,
           updated_at
@@ -183,6 +192,7 @@ async def list_schedule_runs(
           objective_breakdown,
           solver_status,
           infeasible_reason,
+          metrics,
           created_by::text as created_by,
           created_at,
           updated_at
@@ -207,6 +217,12 @@ async def get_schedule_items(
     """
     Get schedule items for a schedule run.
     
+    Published runs (with a `publish_seq`) share unchanged items with earlier
+    runs, so their items are the rows live at that seq; runs from before
+    diff-based publishing are read by `schedule_run_id`. The two cases are
+    separate branches with plain predicates, so the seq window can use
+    `schedule_items_org_published_seq_idx`.
+    
     Args:
         pool: Database connection pool
         profile: User profile
@@ -217,6 +233,25 @@ async def get_schedule_items(
     """
     rows = await pool.fetch(
         """
+        with run as (
+          select id, org_id, publish_seq
+          from public.schedule_runs
+          where id = $1::uuid
+            and org_id = $2::uuid
+        ),
+        run_items as (
+          select si.*
+          from run
+          join public.schedule_items si on si.org_id = run.org_id
+          where run.publish_seq is null
+            and si.schedule_run_id = run.id
+          union all
+          select si.*
+          from run
+          join public.schedule_items si on si.org_id = run.org_id
+          where si.published_seq <= run.publish_seq
+            and (si.retired_seq is null or si.retired_seq > run.publish_seq)
+        )
         select
           si.id::text as id,
           si.task_id::text as task_id,
@@ -230,12 +265,10 @@ async def get_schedule_items(
           t.work_order_id::text as work_order_id,
           tech.name as technician_name,
           b.name as bay_name
-        from public.schedule_items si
+        from run_items si
         join public.tasks t on t.id = si.task_id
         join public.technicians tech on tech.id = si.technician_id
         join public.bays b on b.id = si.bay_id
-        where si.schedule_run_id = $1::uuid
-          and si.org_id = $2::uuid
         order by si.start_at, tech.name
         """,
         schedule_run_id,
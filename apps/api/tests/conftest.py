@@ -1,8 +1,42 @@
+import os
 import sys
+from collections.abc import AsyncIterator
 from pathlib import Path
 
+import asyncpg
+import pytest
+
 
 # Ensure repo root is on sys.path so `import apps...` works in tests.
 REPO_ROOT = Path(__file__).resolve().parents[3]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture
+async def db_pool() -> AsyncIterator[asyncpg.Pool]:
+    """Pool on TEST_DATABASE_URL (a throwaway database with all migrations applied)."""
+    dsn = os.getenv("TEST_DATABASE_URL")
+    if not dsn:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    pool = await asyncpg.create_pool(dsn, min_size=1, max_size=4)
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+@pytest.fixture
+async def demo_org_id(db_pool: asyncpg.Pool) -> AsyncIterator[str]:
+    """A fresh organization, deleted (with its jobs) afterwards."""
+    org = await db_pool.fetchval(
+        """
+        insert into public.organizations (name, timezone)
+        values ('Test Org', 'UTC')
+        returning id::text
+        """
+    )
+    try:
+        yield org
+    finally:
+        await db_pool.execute("delete from public.organizations where id = $1::uuid", org)
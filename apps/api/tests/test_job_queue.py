@@ -4,7 +4,12 @@ import asyncio
 import asyncpg
 import pytest
 
-from app.services.job_queue_service import enqueue_job, get_job_status, list_jobs
+from app.services.job_queue_service import (
+    enqueue_job,
+    get_job_status,
+    get_queue_stats,
+    list_jobs,
+)
 
 
 pytestmark = pytest.mark.asyncio
@@ -80,40 +85,43 @@ async def test_job_org_isolation(db_pool: asyncpg.Pool, demo_org_id: str) -> Non
         """
     )
     
-    # Enqueue a job for org 1
-    job_id_1 = await enqueue_job(
-        db_pool,
-        org_id=demo_org_id,
-        job_type="ai_enrich",
-        payload={"work_order_id": "wo-1"},
-    )
-    
-    # Enqueue a job for org 2
-    job_id_2 = await enqueue_job(
-        db_pool,
-        org_id=org2_id,
-        job_type="ai_enrich",
-        payload={"work_order_id": "wo-2"},
-    )
-    
-    # Org 1 should not see org 2's job
-    job = await get_job_status(db_pool, job_id=job_id_2, org_id=demo_org_id)
-    assert job is None
-    
-    # Org 2 should not see org 1's job
-    job = await get_job_status(db_pool, job_id=job_id_1, org_id=org2_id)
-    assert job is None
-    
-    # Each org should see only their own jobs
-    org1_jobs = await list_jobs(db_pool, org_id=demo_org_id)
-    org1_job_ids = [job["id"] for job in org1_jobs]
-    assert job_id_1 in org1_job_ids
-    assert job_id_2 not in org1_job_ids
-    
-    org2_jobs = await list_jobs(db_pool, org_id=org2_id)
-    org2_job_ids = [job["id"] for job in org2_jobs]
-    assert job_id_2 in org2_job_ids
-    assert job_id_1 not in org2_job_ids
+    try:
+        # Enqueue a job for org 1
+        job_id_1 = await enqueue_job(
+            db_pool,
+            org_id=demo_org_id,
+            job_type="ai_enrich",
+            payload={"work_order_id": "wo-1"},
+        )
+        
+        # Enqueue a job for org 2
+        job_id_2 = await enqueue_job(
+            db_pool,
+            org_id=org2_id,
+            job_type="ai_enrich",
+            payload={"work_order_id": "wo-2"},
+        )
+        
+        # Org 1 should not see org 2's job
+        job = await get_job_status(db_pool, job_id=job_id_2, org_id=demo_org_id)
+        assert job is None
+        
+        # Org 2 should not see org 1's job
+        job = await get_job_status(db_pool, job_id=job_id_1, org_id=org2_id)
+        assert job is None
+        
+        # Each org should see only their own jobs
+        org1_jobs = await list_jobs(db_pool, org_id=demo_org_id)
+        org1_job_ids = [job["id"] for job in org1_jobs]
+        assert job_id_1 in org1_job_ids
+        assert job_id_2 not in org1_job_ids
+        
+        org2_jobs = await list_jobs(db_pool, org_id=org2_id)
+        org2_job_ids = [job["id"] for job in org2_jobs]
+        assert job_id_2 in org2_job_ids
+        assert job_id_1 not in org2_job_ids
+    finally:
+        await db_pool.execute("delete from public.organizations where id = $1::uuid", org2_id)
 
 
 async def test_concurrent_job_claiming(db_pool: asyncpg.Pool, demo_org_id: str) -> None:
@@ -212,3 +220,137 @@ async def test_job_success(db_pool: asyncpg.Pool, demo_org_id: str) -> None:
     assert job["status"] == "succeeded"
     assert job["locked_at"] is None
     assert job["locked_by"] is None
+
+
+async def _finish(pool: asyncpg.Pool, job_id: str, status: str) -> None:
+    """Move a job to job_history as the worker does when it finishes."""
+    await pool.execute(
+        """
+        with finished as (
+          delete from public.job_queue where id = $1::uuid returning *
+        )
+        insert into public.job_history (
+          id, org_id, type, payload, status, run_after, attempts, max_attempts,
+          priority, dedupe_key, created_at, updated_at
+        )
+        select
+          id, org_id, type, payload, $2, run_after, attempts, max_attempts,
+          priority, dedupe_key, created_at, now()
+        from finished
+        """,
+        job_id,
+        status,
+    )
+
+
+async def test_dedupe_key_returns_existing_job(db_pool: asyncpg.Pool, demo_org_id: str) -> None:
+    """A queued job with the same org, type and key is returned instead of a new one."""
+    first = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={}, dedupe_key="delivery-1"
+    )
+    
+    again = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={}, dedupe_key="delivery-1"
+    )
+    other_key = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={}, dedupe_key="delivery-2"
+    )
+    other_type = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="retention", payload={}, dedupe_key="delivery-1"
+    )
+    
+    assert again == first
+    assert len({first, other_key, other_type}) == 3
+    assert await db_pool.fetchval(
+        "select count(*) from public.job_queue where org_id = $1::uuid", demo_org_id
+    ) == 3
+
+
+async def test_dedupe_window_after_success(db_pool: asyncpg.Pool, demo_org_id: str) -> None:
+    """A succeeded job matches its key only within the window; a failed one never does."""
+    done = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={}, dedupe_key="k"
+    )
+    await _finish(db_pool, done, "succeeded")
+    
+    within = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={},
+        dedupe_key="k", dedupe_window_seconds=300,
+    )
+    without_window = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={}, dedupe_key="k"
+    )
+    
+    assert within == done
+    assert without_window != done
+    
+    await _finish(db_pool, without_window, "failed")
+    retried = await enqueue_job(
+        db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={},
+        dedupe_key="k", dedupe_window_seconds=0,
+    )
+    assert retried not in {done, without_window}
+
+
+async def test_reads_cover_active_and_finished_jobs(db_pool: asyncpg.Pool, demo_org_id: str) -> None:
+    """get_job_status and list_jobs read job_queue and job_history as one list."""
+    ids = [
+        await enqueue_job(db_pool, org_id=demo_org_id, job_type="ai_enrich", payload={"n": n})
+        for n in range(4)
+    ]
+    await _finish(db_pool, ids[0], "succeeded")
+    await _finish(db_pool, ids[2], "failed")
+    
+    finished = await get_job_status(db_pool, job_id=ids[0], org_id=demo_org_id)
+    newest_first = await list_jobs(db_pool, org_id=demo_org_id)
+    failed = await list_jobs(db_pool, org_id=demo_org_id, status="failed")
+    latest_two = await list_jobs(db_pool, org_id=demo_org_id, limit=2)
+    
+    assert finished["status"] == "succeeded" and finished["id"] == ids[0]
+    assert [job["id"] for job in newest_first] == ids[::-1]
+    assert [job["id"] for job in failed] == [ids[2]]
+    assert [job["id"] for job in latest_two] == [ids[3], ids[2]]
+
+
+async def test_queue_stats(db_pool: asyncpg.Pool, demo_org_id: str) -> None:
+    """Active jobs are counted per type and worker; finished ones only within the window."""
+    ids = [
+        await enqueue_job(db_pool, org_id=demo_org_id, job_type=job_type, payload={})
+        for job_type in ("ai_enrich", "ai_enrich", "ai_enrich", "schedule_run", "schedule_run")
+    ]
+    await db_pool.execute(
+        """
+        update public.job_queue
+        set run_after = now() - interval '90 seconds', attempts = 1, error_class = 'timeout'
+        where id = $1::uuid
+        """,
+        ids[0],
+    )
+    await db_pool.execute(
+        """
+        update public.job_queue
+        set status = 'running', locked_by = 'w1', locked_at = now()
+        where id = $1::uuid
+        """,
+        ids[1],
+    )
+    await _finish(db_pool, ids[3], "succeeded")
+    await _finish(db_pool, ids[4], "failed")
+    await db_pool.execute(
+        "update public.job_history set updated_at = now() - interval '2 hours' where id = $1::uuid",
+        ids[4],
+    )
+    
+    stats = await get_queue_stats(db_pool, org_id=demo_org_id, window_seconds=600)
+    
+    assert stats["window_seconds"] == 600
+    assert stats["running_by_worker"] == {"w1": 1}
+    ai_enrich, schedule_run = stats["types"]
+    assert ai_enrich["type"] == "ai_enrich"
+    assert (ai_enrich["queued"], ai_enrich["running"], ai_enrich["retrying"]) == (2, 1, 1)
+    assert ai_enrich["timed_out"] == 1
+    assert 90 <= ai_enrich["oldest_queued_age_seconds"] < 120
+    # Only finished jobs, so no active counts; the failure is outside the window
+    assert schedule_run == {
+        "type": "schedule_run", "succeeded": 1, "dead_lettered": 0, "timed_out": 0,
+    }
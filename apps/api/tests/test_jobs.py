@@ -0,0 +1,83 @@
+"""Tests for the job queue stats endpoint."""
+
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.security import Profile, get_current_profile
+from app.routers import jobs
+from app.routers.jobs import router
+
+PROFILE = Profile(
+    id="user-1", org_id="org-1", role="dispatcher", email="d@example.com", display_name=None
+)
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    """Arguments of each get_queue_stats call, which returns one type's counts."""
+    recorded: list[dict[str, Any]] = []
+    
+    async def fake_get_pool() -> object:
+        return "pool"
+    
+    async def fake_get_queue_stats(pool: object, **kwargs: Any) -> dict[str, Any]:
+        recorded.append({"pool": pool, **kwargs})
+        return {
+            "window_seconds": kwargs["window_seconds"],
+            "types": [{"type": "ai_enrich", "queued": 2, "oldest_queued_age_seconds": 1.5}],
+            "running_by_worker": {"w1": 1},
+        }
+    
+    monkeypatch.setattr(jobs, "get_pool", fake_get_pool)
+    monkeypatch.setattr(jobs, "get_queue_stats", fake_get_queue_stats)
+    return recorded
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_profile] = lambda: PROFILE
+    return TestClient(app)
+
+
+def test_stats_for_the_current_org(client: TestClient, calls: list[dict[str, Any]]) -> None:
+    """The window is given in minutes, and counts missing for a type default to zero."""
+    response = client.get("/v1/jobs/stats", params={"window_minutes": 15})
+    
+    assert response.status_code == 200
+    assert calls == [{"pool": "pool", "org_id": "org-1", "window_seconds": 900}]
+    assert response.json() == {
+        "window_seconds": 900,
+        "types": [{
+            "type": "ai_enrich",
+            "queued": 2,
+            "running": 0,
+            "retrying": 0,
+            "oldest_queued_age_seconds": 1.5,
+            "succeeded": 0,
+            "dead_lettered": 0,
+            "timed_out": 0,
+        }],
+        "running_by_worker": {"w1": 1},
+    }
+
+
+def test_stats_window_defaults_to_an_hour(client: TestClient, calls: list[dict[str, Any]]) -> None:
+    """Without window_minutes the last 60 minutes are counted."""
+    assert client.get("/v1/jobs/stats").status_code == 200
+    assert calls[0]["window_seconds"] == 3600
+
+
+@pytest.mark.parametrize("window_minutes", [0, 1441])
+def test_stats_window_out_of_range(
+    client: TestClient, calls: list[dict[str, Any]], window_minutes: int
+) -> None:
+    """Windows outside 1 minute to 1 day are a 422, not a query."""
+    response = client.get("/v1/jobs/stats", params={"window_minutes": window_minutes})
+    
+    assert response.status_code == 422
+    assert calls == []
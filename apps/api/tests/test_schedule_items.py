@@ -0,0 +1,115 @@
+"""Tests for reading a schedule run's items."""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import asyncpg
+
+from app.core.security import Profile
+from app.services.schedule_service import get_schedule_items
+
+START = datetime(2026, 1, 5, 8, tzinfo=timezone.utc)
+
+
+async def _insert_run(pool: asyncpg.Pool, org_id: str, publish_seq: int | None) -> str:
+    """Succeeded schedule run; returns its ID."""
+    return await pool.fetchval(
+        """
+        insert into public.schedule_runs (
+          org_id, horizon_start, horizon_end, status, trigger, publish_seq
+        )
+        values ($1::uuid, $2::timestamptz, $2::timestamptz + interval '1 day', 'succeeded', 'manual', $3)
+        returning id::text
+        """,
+        org_id,
+        START,
+        publish_seq,
+    )
+
+
+async def test_items_of_legacy_and_published_runs(db_pool: asyncpg.Pool, demo_org_id: str) -> None:
+    """Legacy runs read their own rows; published runs read the rows live at their seq."""
+    unit_id = await db_pool.fetchval(
+        "insert into public.units (org_id, unit_number, asset_type) values ($1::uuid, 'U-1', 'truck') returning id",
+        demo_org_id,
+    )
+    wo_id = await db_pool.fetchval(
+        """
+        insert into public.work_orders (org_id, unit_id, asset_type, priority, location, status)
+        values ($1::uuid, $2, 'truck', 3, 'shop', 'scheduled')
+        returning id
+        """,
+        demo_org_id,
+        unit_id,
+    )
+    task_ids = [
+        await db_pool.fetchval(
+            """
+            insert into public.tasks (
+              org_id, work_order_id, type, status, duration_minutes_low, duration_minutes_high
+            )
+            values ($1::uuid, $2, 'repair', 'scheduled', 60, 60)
+            returning id::text
+            """,
+            demo_org_id,
+            wo_id,
+        )
+        for _ in range(3)
+    ]
+    tech_id = await db_pool.fetchval(
+        "insert into public.technicians (org_id, name) values ($1::uuid, 'Tech') returning id",
+        demo_org_id,
+    )
+    bay_id = await db_pool.fetchval(
+        "insert into public.bays (org_id, name, bay_type) values ($1::uuid, 'Bay', 'general') returning id",
+        demo_org_id,
+    )
+    legacy = await _insert_run(db_pool, demo_org_id, None)
+    first = await _insert_run(db_pool, demo_org_id, 1)
+    second = await _insert_run(db_pool, demo_org_id, 2)
+    
+    # (run, task, start hour, published_seq, retired_seq)
+    rows = [
+        (legacy, 0, 0, None, None),
+        (first, 0, 1, 1, 2),  # moved by the second run
+        (first, 1, 2, 1, None),  # unchanged, shared with the second run
+        (second, 0, 3, 2, None),
+        (second, 2, 4, 2, None),
+    ]
+    for run_id, task, hour, published_seq, retired_seq in rows:
+        await db_pool.execute(
+            """
+            insert into public.schedule_items (
+              org_id, schedule_run_id, task_id, technician_id, bay_id,
+              start_at, end_at, published_seq, retired_seq
+            )
+            values ($1::uuid, $2::uuid, $3::uuid, $4, $5, $6::timestamptz, $6::timestamptz + interval '1 hour', $7, $8)
+            """,
+            demo_org_id,
+            run_id,
+            task_ids[task],
+            tech_id,
+            bay_id,
+            START + timedelta(hours=hour),
+            published_seq,
+            retired_seq,
+        )
+    profile = Profile(
+        id="user-1", org_id=demo_org_id, role="dispatcher", email="d@example.com", display_name=None
+    )
+    
+    async def starts(run_id: str) -> list[tuple[str, int]]:
+        items = await get_schedule_items(db_pool, profile=profile, schedule_run_id=run_id)
+        return [
+            (task_ids.index(item["task_id"]), (item["start_at"] - START) // timedelta(hours=1))
+            for item in items
+        ]
+    
+    assert await starts(legacy) == [(0, 0)]
+    assert await starts(first) == [(0, 1), (1, 2)]
+    assert await starts(second) == [(1, 2), (0, 3), (2, 4)]
+    
+    other_org = Profile(
+        id="user-2", org_id=str(uuid4()), role="admin", email="a@example.com", display_name=None
+    )
+    assert await get_schedule_items(db_pool, profile=other_org, schedule_run_id=second) == []
@@ -0,0 +1,31 @@
+"""Tests for schedule endpoint request validation."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.schedules import router
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_unknown_solver_profile_is_rejected(client: TestClient) -> None:
+    """A profile the worker does not have is a 422, before any job is queued."""
+    response = client.post(
+        "/v1/schedules",
+        json={
+            "horizon_start": "2026-01-05T08:00:00Z",
+            "horizon_end": "2026-01-06T08:00:00Z",
+            "solver_profile": "quick",
+        },
+    )
+    
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["loc"] == ["body", "solver_profile"]
+    assert "'fast', 'balanced' or 'thorough'" in error["msg"]
@@ -11,8 +11,46 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     database_url: str | None = None
+    listen_database_url: str | None = None  # Direct or session-mode connection for LISTEN; unset = no listeners
+    db_pool_max_size: int = 0  # 0 sizes the pool from JOB_CONCURRENCY
     worker_id: str | None = None
     poll_interval_seconds: float = 2
+    job_fallback_poll_seconds: float = 30  # Poll interval while the job LISTEN connection is up
+    metrics_log_interval_seconds: float = 60
+    metrics_port: int = 0  # Serve Prometheus metrics on this port; 0 disables
+    metrics_host: str = "127.0.0.1"
+    job_concurrency: str = "schedule_run=2,ai_enrich=20,retention=1"  # Per-type limits; others get 1
+    shutdown_grace_seconds: float = 30  # Wait for in-flight jobs before handing them back
+    job_timeouts: str = "schedule_run=1800,ai_enrich=120,retention=600"  # Seconds per type; 0 = none
+    job_retry_base_seconds: float = 60  # Retry n waits up to base * 2**n, with full jitter
+    job_retry_backoff_cap_seconds: float = 3600  # Longest retry delay for types not in the caps below
+    job_retry_backoff_caps: str = "schedule_run=300,ai_enrich=900"  # Seconds per type
+    job_lease_seconds: float = 60  # Extended every third of this while a job runs
+    job_reaper_interval_seconds: float = 30  # How often each worker requeues expired leases
+    job_reaper_batch_size: int = 100
+    
+    # Scheduler settings
+    scheduler_portfolio_strategies: str = ""  # Comma-separated, e.g. "cp_sat,cp_sat_hinted,heuristic"
+    scheduler_gap_target: float = 0.01
+    scheduler_lns_task_threshold: int = 2000  # Above this many unlocked tasks, use LNS
+    scheduler_risk_scenarios: int = 1000  # Duration-risk simulation scenarios; 0 disables
+    scheduler_reference_cache_ttl_seconds: float = 900  # Technician/bay cache TTL; 0 disables
+    scheduler_reference_cache_unlistened_ttl_seconds: float = 30  # TTL without a LISTEN connection; 0 bypasses
+    
+    # Retention settings
+    retention_interval_seconds: float = 86400  # How often each org gets a retention job; 0 disables
+    schedule_item_retention_days: int = 30  # Default for orgs without their own setting
+    job_retention_days: int = 14
+    retention_batch_size: int = 1000  # Rows moved per transaction
+    retention_batch_pause_seconds: float = 0.05
+    retention_max_seconds: float = 60  # Per job; leftovers wait for the next run
+    
+    # Automatic re-planning settings
+    auto_replan_quiet_seconds: float = 0  # Default wait after an org's last change; 0 = off unless the org opts in
+    auto_replan_max_delay_seconds: float = 600  # Re-plan anyway once the first change is this old
+    auto_replan_check_seconds: float = 10  # How often each worker looks for quiet orgs; 0 disables
+    auto_replan_partial_max_tasks: int = 50  # Above this many changed tasks, re-plan in full
+    auto_replan_horizon_days: int = 7  # Horizon for orgs without a published run
     
     # AI/LLM settings
     anthropic_api_key: str | None = None
@@ -11,6 +11,9 @@ from urllib.parse import quote_plus, urlparse, urlunparse
 import asyncpg
 
 
+# Pool size for scripts; the worker sizes its pool from JOB_CONCURRENCY
+DEFAULT_POOL_MAX_SIZE = 10
+
 _pool: asyncpg.Pool | None = None
 logger = logging.getLogger(__name__)
 
@@ -59,8 +62,12 @@ def test_dns_resolution(hostname: str) -> bool:
         return False
 
 
-async def get_pool() -> asyncpg.Pool:
-    """Get or create database connection pool."""
+async def get_pool(max_size: int = DEFAULT_POOL_MAX_SIZE) -> asyncpg.Pool:
+    """Get or create database connection pool.
+    
+    Args:
+        max_size: Maximum connections, used when the pool is created
+    """
     global _pool
     if _pool is None:
         database_url = os.getenv("DATABASE_URL")
@@ -86,8 +93,8 @@ async def get_pool() -> asyncpg.Pool:
                 raise RuntimeError(f"DNS resolution failed for {parsed.hostname}")
         
         try:
-            _pool = await asyncpg.create_pool(dsn=database_url, min_size=1, max_size=10)
-            logger.info("✅ Database connection pool created successfully")
+            _pool = await asyncpg.create_pool(dsn=database_url, min_size=1, max_size=max_size)
+            logger.info(f"✅ Database connection pool created successfully (max {max_size} connections)")
         except Exception as e:
             logger.error(f"❌ Failed to create database pool: {e}")
             raise
@@ -95,6 +102,24 @@ async def get_pool() -> asyncpg.Pool:
     return _pool
 
 
+async def connect_listener() -> asyncpg.Connection | None:
+    """Open a dedicated connection for LISTEN, or None when LISTEN_DATABASE_URL is unset.
+    
+    Notifications need a session that stays attached to one backend. The
+    Supabase transaction pooler (port 6543) hands each transaction to a
+    different backend, so LISTEN through `DATABASE_URL` subscribes a backend
+    that never reports back. `LISTEN_DATABASE_URL` must be a direct or
+    session-mode (port 5432) connection.
+    
+    Raises:
+        Exception: Whatever asyncpg raises when the connection fails
+    """
+    listen_url = os.getenv("LISTEN_DATABASE_URL")
+    if not listen_url:
+        return None
+    return await asyncpg.connect(dsn=fix_database_url(listen_url))
+
+
 async def close_pool() -> None:
     """Close database connection pool."""
     global _pool
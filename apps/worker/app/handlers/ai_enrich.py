@@ -7,6 +7,8 @@ from typing import Any
 
 import asyncpg
 
+from app.job_errors import NonRetryableError
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,12 +25,12 @@ async def handle_ai_enrich(pool: asyncpg.Pool, job_id: str, payload: dict[str, A
         payload: Job payload containing work_order_id and other parameters
     
     Raises:
-        ValueError: If payload is invalid
+        NonRetryableError: If payload is invalid
         RuntimeError: If job processing fails
     """
     work_order_id = payload.get("work_order_id")
     if not work_order_id:
-        raise ValueError("work_order_id is required in payload")
+        raise NonRetryableError("work_order_id is required in payload")
     
     logger.info(
         "ai_enrich_job_started",
@@ -0,0 +1,278 @@
+"""Retention job handler.
+
+Moves rows the hot tables no longer need into archive tables (migration 0013):
+
+- schedule items retired by a publish older than the org's item retention,
+  and items of pre-versioning runs older than it once the org has published
+- succeeded/failed jobs still in job_queue (finished before migration 0017)
+  into job_history, whatever their age
+- job_history rows last updated before the org's job retention into
+  job_queue_archive
+
+Rows move in small batches, each its own short transaction with a lock
+timeout, so the hot tables are never locked for long. A run stops after
+`retention_max_seconds`; whatever is left is picked up by the next run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import asyncpg
+
+from app.core.config import settings
+from app.job_errors import NonRetryableError
+from app.job_wakeup import NOTIFY_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+_ITEM_BATCHES = (
+    # Retired by a publish older than the cutoff
+    """
+    select si.id
+    from public.schedule_items si
+    join public.schedule_runs sr
+      on sr.org_id = si.org_id and sr.publish_seq = si.retired_seq
+    where si.org_id = $1::uuid
+      and si.retired_seq is not null
+      and sr.updated_at < $2
+    limit $3
+    for update of si skip locked
+    """,
+    # Full copies from before diff-based publishing, superseded by a published run
+    """
+    select si.id
+    from public.schedule_items si
+    join public.schedule_runs sr on sr.id = si.schedule_run_id
+    where si.org_id = $1::uuid
+      and si.published_seq is null
+      and sr.created_at < $2
+      and exists (
+        select 1 from public.schedule_runs p
+        where p.org_id = $1::uuid and p.publish_seq is not null
+      )
+    limit $3
+    for update of si skip locked
+    """,
+)
+
+_JOB_BATCH = """
+    select id
+    from public.job_queue
+    where org_id = $1::uuid
+      and status in ('succeeded', 'failed')
+      and updated_at < $2
+    order by updated_at
+    limit $3
+    for update skip locked
+"""
+
+_JOB_HISTORY_BATCH = """
+    select id
+    from public.job_history
+    where org_id = $1::uuid
+      and updated_at < $2
+    order by updated_at
+    limit $3
+    for update skip locked
+"""
+
+
+async def _shared_columns(conn: asyncpg.Connection, source: str, target: str) -> str:
+    """Columns shared by two tables, as a select list."""
+    rows = await conn.fetch(
+        """
+        select column_name
+        from information_schema.columns
+        where table_schema = 'public' and table_name = $2
+          and column_name in (
+            select column_name from information_schema.columns
+            where table_schema = 'public' and table_name = $1
+          )
+        order by ordinal_position
+        """,
+        source,
+        target,
+    )
+    return ", ".join(row["column_name"] for row in rows)
+
+
+async def _move_batch(
+    pool: asyncpg.Pool,
+    source: str,
+    target: str,
+    columns: str,
+    batch_sql: str,
+    org_id: str,
+    cutoff: datetime,
+) -> int:
+    """Move one batch of rows from `source` into `target`; returns rows moved."""
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            # Give way to live traffic rather than queue behind it
+            await conn.execute("set local lock_timeout = '2s'")
+            status = await conn.execute(
+                f"""
+                with batch as ({batch_sql}),
+                moved as (
+                  delete from public.{source} t
+                  using batch
+                  where t.id = batch.id
+                  returning t.*
+                )
+                insert into public.{target} ({columns})
+                select {columns} from moved
+                """,
+                org_id,
+                cutoff,
+                settings.retention_batch_size,
+            )
+    return int(status.split()[-1])
+
+
+async def handle_retention(pool: asyncpg.Pool, job_id: str, payload: dict[str, Any]) -> None:
+    """
+    Handle retention job: archive superseded schedule items and finished jobs for one org.
+
+    Args:
+        pool: Database connection pool
+        job_id: Job ID
+        payload: Job payload containing org_id
+
+    Raises:
+        NonRetryableError: If payload is invalid
+    """
+    org_id = payload.get("org_id")
+    if not org_id:
+        raise NonRetryableError("org_id is required in payload")
+
+    started = time.perf_counter()
+    deadline = started + settings.retention_max_seconds
+
+    org = await pool.fetchrow(
+        """
+        select schedule_item_retention_days, job_retention_days
+        from public.organizations
+        where id = $1::uuid
+        """,
+        org_id,
+    )
+    item_days = (org and org["schedule_item_retention_days"]) or settings.schedule_item_retention_days
+    job_days = (org and org["job_retention_days"]) or settings.job_retention_days
+    now = datetime.now(timezone.utc)
+
+    async with pool.acquire() as conn:
+        item_columns = await _shared_columns(conn, "schedule_items", "schedule_items_archive")
+        history_columns = await _shared_columns(conn, "job_queue", "job_history")
+        job_columns = await _shared_columns(conn, "job_history", "job_queue_archive")
+
+    moved = {"schedule_items_archive": 0, "job_history": 0, "job_queue_archive": 0}
+    batches = 0
+    complete = True
+    work = [
+        ("schedule_items", "schedule_items_archive", item_columns, sql, now - timedelta(days=item_days))
+        for sql in _ITEM_BATCHES
+    ] + [
+        ("job_queue", "job_history", history_columns, _JOB_BATCH, now),
+        ("job_history", "job_queue_archive", job_columns, _JOB_HISTORY_BATCH, now - timedelta(days=job_days)),
+    ]
+
+    for source, target, columns, batch_sql, cutoff in work:
+        while True:
+            if time.perf_counter() > deadline:
+                complete = False
+                break
+            count = await _move_batch(pool, source, target, columns, batch_sql, org_id, cutoff)
+            moved[target] += count
+            batches += 1
+            if count < settings.retention_batch_size:
+                break
+            await asyncio.sleep(settings.retention_batch_pause_seconds)
+
+    result = {
+        "schedule_items_archived": moved["schedule_items_archive"],
+        "jobs_moved_to_history": moved["job_history"],
+        "jobs_archived": moved["job_queue_archive"],
+        "batches": batches,
+        "complete": complete,
+        "schedule_item_retention_days": item_days,
+        "job_retention_days": job_days,
+        "wall_time_ms": int((time.perf_counter() - started) * 1000),
+    }
+    await pool.execute(
+        """
+        update public.job_queue
+        set result = $2::jsonb
+        where id = $1::uuid
+        """,
+        job_id,
+        json.dumps(result),
+    )
+
+    logger.info(
+        "retention_job_completed",
+        extra={"job_id": job_id, "org_id": org_id, **result},
+    )
+
+
+async def enqueue_retention_jobs(pool: asyncpg.Pool) -> int:
+    """
+    Enqueue a retention job for every org without one in the last interval.
+
+    Safe to call from every worker: a transaction-level advisory lock lets
+    only one of them enqueue at a time.
+
+    Args:
+        pool: Database connection pool
+
+    Returns:
+        Number of jobs enqueued
+    """
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            locked = await conn.fetchval(
+                "select pg_try_advisory_xact_lock(hashtextextended('enqueue_retention', 0))"
+            )
+            if not locked:
+                return 0
+            count = await conn.fetchval(
+                """
+                with enqueued as (
+                  insert into public.job_queue (org_id, type, payload, status)
+                  select o.id, 'retention', jsonb_build_object('org_id', o.id::text), 'queued'
+                  from public.organizations o
+                  where not exists (
+                    select 1
+                    from public.job_queue j
+                    where j.org_id = o.id
+                      and j.type = 'retention'
+                      and (
+                        j.status in ('queued', 'running')
+                        or j.created_at > now() - make_interval(secs => $1)
+                      )
+                  )
+                  and not exists (
+                    select 1
+                    from public.job_history h
+                    where h.org_id = o.id
+                      and h.type = 'retention'
+                      and h.created_at > now() - make_interval(secs => $1)
+                  )
+                  returning id
+                )
+                select count(*), pg_notify($2, json_build_object('type', 'retention')::text)
+                from enqueued
+                having count(*) > 0
+                """,
+                settings.retention_interval_seconds,
+                NOTIFY_CHANNEL,
+            ) or 0
+
+    if count:
+        logger.info("retention_jobs_enqueued", extra={"count": count})
+    return count
@@ -2,18 +2,222 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import threading
+import time
+from dataclasses import replace
 from datetime import datetime
 from typing import Any
 
 import asyncpg
 
+from app.core.config import settings
+from app.job_errors import JOB_RELEASED, JobError, NonRetryableError, RetryableError
 from app.scheduler.cp_sat_scheduler import run_scheduler
-from app.scheduler.data_loader import load_schedule_input
+from app.scheduler.data_loader import (
+    load_live_assignments,
+    load_schedule_input,
+    load_scheduler_profile,
+    summarize_deferred,
+)
+from app.scheduler.explain import explain_schedule
+from app.scheduler.lns import run_lns
+from app.scheduler.models import ScheduleInput, ScheduleItem, ScheduleResult
 from app.scheduler.persistence import save_schedule_result
+from app.scheduler.portfolio import run_portfolio
+from app.scheduler.profiles import SolverProfile, select_profile
+from app.scheduler.risk import evaluate_duration_risk
+from app.scheduler.validator import validate_schedule
 
 logger = logging.getLogger(__name__)
 
+# Time a cancelled run gives its solve to notice the stop signal; a portfolio
+# needs up to its own shutdown grace to stop its processes
+_SOLVE_STOP_GRACE_SECONDS = 10.0
+
+
+def _solve(
+    input_data: ScheduleInput,
+    payload: dict[str, Any],
+    profile: SolverProfile,
+    task_count: int,
+    schedule_run_id: str,
+    solve_input: ScheduleInput | None = None,
+    pinned: dict[str, ScheduleItem] | None = None,
+    stop_event: threading.Event | None = None,
+) -> ScheduleResult:
+    """
+    Solve, validate, explain and risk-check a schedule.
+    
+    CPU-bound and synchronous; the handler runs it in a thread so the
+    worker's other jobs keep running while it solves.
+    
+    For a partial re-plan, `solve_input` is `input_data` with the `pinned`
+    tasks locked to their live assignments. The solve uses it; the pinned
+    items are then unlocked again and everything after the solve works on
+    `input_data`, so a pinned item is validated, explained and risk-checked
+    exactly as in a full run and publishes as unchanged unless its `why`
+    really moved.
+    
+    Setting `stop_event` stops the solver early and skips the post-passes;
+    the handler sets it when the job is cancelled.
+    """
+    # Run scheduler: portfolio mode when strategies are configured,
+    # LNS for orgs too large for a single CP-SAT model
+    time_limit = payload.get("time_limit_seconds", 30)
+    strategies = payload.get("portfolio_strategies") or [
+        s.strip()
+        for s in settings.scheduler_portfolio_strategies.split(",")
+        if s.strip()
+    ]
+    if strategies:
+        result = run_portfolio(
+            solve_input or input_data,
+            time_limit_seconds=time_limit,
+            strategies=strategies,
+            gap_target=payload.get("gap_target", settings.scheduler_gap_target),
+            profile=profile,
+            stop_event=stop_event,
+        )
+    elif task_count > settings.scheduler_lns_task_threshold:
+        result = run_lns(
+            solve_input or input_data, time_limit_seconds=time_limit, stop_event=stop_event
+        )
+    else:
+        result = run_scheduler(
+            solve_input or input_data,
+            time_limit_seconds=time_limit,
+            profile=profile,
+            stop_event=stop_event,
+        )
+    
+    # Cancelled: nobody is waiting for the result
+    if stop_event is not None and stop_event.is_set():
+        return result
+    
+    # Pinned items go back to their live lock flag and solver reason
+    if pinned and result.status == "succeeded":
+        result = replace(
+            result,
+            items=[
+                replace(item, is_locked=False, why=pinned[item.task_id].why)
+                if item.task_id in pinned
+                else item
+                for item in result.items
+            ],
+        )
+    
+    # Validate before anything is written; warnings (e.g. overlapping
+    # hand-edited locks) are kept in metrics, errors fail the run
+    if result.status == "succeeded":
+        validation = validate_schedule(input_data, result.items)
+        result = replace(result, metrics={**result.metrics, "validation": validation.to_dict()})
+        if not validation.is_valid:
+            logger.error(
+                "schedule_validation_failed",
+                extra={
+                    "schedule_run_id": schedule_run_id,
+                    "strategy": result.metrics.get("strategy"),
+                    "errors": len(validation.errors),
+                },
+            )
+            first = validation.errors[0]
+            result = replace(
+                result,
+                status="failed",
+                items=[],
+                infeasible_reason=(
+                    f"Schedule failed validation ({len(validation.errors)} errors): "
+                    f"{first.message}"
+                ),
+            )
+    
+    # Per-item explanations, from the solved schedule alone
+    if result.status == "succeeded":
+        result = replace(result, items=explain_schedule(input_data, result.items))
+    
+    # Duration risk: how likely the schedule is to slip under real durations
+    scenarios = payload.get("risk_scenarios", settings.scheduler_risk_scenarios)
+    if result.status == "succeeded" and scenarios > 0:
+        risk = evaluate_duration_risk(input_data, result.items, scenarios=scenarios)
+        result = replace(
+            result,
+            items=risk.annotate(result.items),
+            metrics={**result.metrics, "risk": risk.to_dict()},
+        )
+    
+    return result
+
+
+async def _solve_in_thread(*args: Any) -> ScheduleResult:
+    """
+    Run `_solve` off the event loop.
+    
+    A thread cannot be cancelled, so when the job is cancelled the solve is
+    told to stop and given `_SOLVE_STOP_GRACE_SECONDS` to do so before the
+    cancellation goes on; otherwise it would hold its cores (and, in
+    portfolio mode, its processes) until its time limit.
+    """
+    stop_event = threading.Event()
+    solve = asyncio.ensure_future(asyncio.to_thread(_solve, *args, stop_event=stop_event))
+    try:
+        return await asyncio.shield(solve)
+    except asyncio.CancelledError:
+        stop_event.set()
+        await asyncio.wait({solve}, timeout=_SOLVE_STOP_GRACE_SECONDS)
+        raise
+
+
+def _failure_error(result: ScheduleResult) -> JobError:
+    """
+    Error for a run that did not succeed.
+    
+    Only a proven infeasible model fails the same way on every attempt; a
+    solver that found nothing in time (UNKNOWN), a crashed portfolio worker
+    or a schedule that failed validation may well succeed on a retry.
+    """
+    message = f"Schedule failed: {result.infeasible_reason or 'unknown error'}"
+    if result.status == "infeasible":
+        return NonRetryableError(message)
+    return RetryableError(message)
+
+
+def _pin_unchanged(
+    input_data: ScheduleInput,
+    live: dict[str, ScheduleItem],
+    changed_task_ids: set[str],
+) -> tuple[ScheduleInput, dict[str, ScheduleItem]]:
+    """
+    Pin every unchanged task to its live assignment for a partial re-plan.
+    
+    Tasks that changed, have no live assignment, or whose assignment is not
+    inside the horizon on a technician and bay still in the input stay free.
+    
+    Returns:
+        The input with pinned tasks locked, and the live item of each pinned task
+    """
+    technician_ids = {t.id for t in input_data.technicians}
+    bay_ids = {b.id for b in input_data.bays}
+    pinned: dict[str, ScheduleItem] = {}
+    tasks = []
+    for task in input_data.tasks:
+        item = live.get(task.id)
+        if (
+            not task.is_locked
+            and task.id not in changed_task_ids
+            and item is not None
+            and item.start_at >= input_data.horizon_start
+            and item.end_at <= input_data.horizon_end
+            and item.technician_id in technician_ids
+            and item.bay_id in bay_ids
+        ):
+            task = task.as_locked(item)
+            pinned[task.id] = item
+        tasks.append(task)
+    return replace(input_data, tasks=tasks), pinned
+
 
 async def handle_schedule_run(pool: asyncpg.Pool, job_id: str, payload: dict[str, Any]) -> None:
     """
@@ -22,29 +226,37 @@ async def handle_schedule_run(pool: asyncpg.Pool, job_id: str, payload: dict[str
     Args:
         pool: Database connection pool
         job_id: Job ID
-        payload: Job payload containing schedule_run_id and parameters
+        payload: Job payload containing schedule_run_id and parameters;
+            `mode: "partial"` re-plans only `changed_task_ids` and keeps
+            the rest of the live schedule, falling back to a full solve
     
     Raises:
-        ValueError: If payload is invalid
+        NonRetryableError: If payload is invalid, or the org has no
+            technicians or bays, or no feasible schedule exists
+        RetryableError: If the solve found no schedule for another reason
+            (time limit, crashed solver, failed validation)
         RuntimeError: If job processing fails
     """
     schedule_run_id = payload.get("schedule_run_id")
     if not schedule_run_id:
-        raise ValueError("schedule_run_id is required in payload")
+        raise NonRetryableError("schedule_run_id is required in payload")
     
     org_id = payload.get("org_id")
     if not org_id:
-        raise ValueError("org_id is required in payload")
+        raise NonRetryableError("org_id is required in payload")
     
     horizon_start_str = payload.get("horizon_start")
     horizon_end_str = payload.get("horizon_end")
     
     if not horizon_start_str or not horizon_end_str:
-        raise ValueError("horizon_start and horizon_end are required")
+        raise NonRetryableError("horizon_start and horizon_end are required")
     
     # Parse datetimes
-    horizon_start = datetime.fromisoformat(horizon_start_str.replace("Z", "+00:00"))
-    horizon_end = datetime.fromisoformat(horizon_end_str.replace("Z", "+00:00"))
+    try:
+        horizon_start = datetime.fromisoformat(horizon_start_str.replace("Z", "+00:00"))
+        horizon_end = datetime.fromisoformat(horizon_end_str.replace("Z", "+00:00"))
+    except ValueError as e:
+        raise NonRetryableError(f"Invalid horizon: {e}") from e
     
     logger.info(
         "schedule_run_job_started",
@@ -57,18 +269,21 @@ async def handle_schedule_run(pool: asyncpg.Pool, job_id: str, payload: dict[str
         },
     )
     
-    # Update status to running
-    await pool.execute(
+    # Update status to running; later status updates from this attempt only
+    # apply while the run is still this attempt's
+    started_at = await pool.fetchval(
         """
         update public.schedule_runs
         set status = 'running', updated_at = now()
         where id = $1::uuid
+        returning updated_at
         """,
         schedule_run_id,
     )
     
     try:
         # Load data
+        load_started = time.perf_counter()
         input_data = await load_schedule_input(
             pool,
             org_id=org_id,
@@ -76,12 +291,14 @@ async def handle_schedule_run(pool: asyncpg.Pool, job_id: str, payload: dict[str
             horizon_start=horizon_start,
             horizon_end=horizon_end,
         )
+        load_ms = int((time.perf_counter() - load_started) * 1000)
+        deferred = summarize_deferred(input_data.deferred_tasks)
         
         # Check if there are tasks to schedule
         if not input_data.tasks:
             logger.info(
                 "no_tasks_to_schedule",
-                extra={"schedule_run_id": schedule_run_id},
+                extra={"schedule_run_id": schedule_run_id, "deferred_tasks": deferred["count"]},
             )
             await pool.execute(
                 """
@@ -89,26 +306,78 @@ async def handle_schedule_run(pool: asyncpg.Pool, job_id: str, payload: dict[str
                 set
                   status = 'succeeded',
                   task_count = 0,
+                  metrics = $2::jsonb,
                   updated_at = now()
                 where id = $1::uuid
                 """,
                 schedule_run_id,
+                json.dumps({"load_ms": load_ms, "deferred": deferred}),
             )
             return
         
         # Check if there are resources
         if not input_data.technicians:
-            raise RuntimeError("No technicians available for scheduling")
+            raise NonRetryableError("No technicians available for scheduling")
         
         if not input_data.bays:
-            raise RuntimeError("No bays available for scheduling")
+            raise NonRetryableError("No bays available for scheduling")
+        
+        # Partial re-plan: keep unaffected tasks where they are
+        mode = payload.get("mode", "full")
+        solve_input, pinned = input_data, {}
+        if mode == "partial":
+            solve_input, pinned = _pin_unchanged(
+                input_data,
+                await load_live_assignments(pool, org_id),
+                set(payload.get("changed_task_ids") or []),
+            )
+        
+        # Solver profile: per run, then per org, then by task count
+        profile_name = payload.get("solver_profile") or await load_scheduler_profile(pool, org_id)
+        task_count = len(solve_input.get_unlocked_tasks())
+        profile = select_profile(task_count, profile_name)
+        
+        # Solve off the event loop so the worker's other jobs keep running
+        result = await _solve_in_thread(
+            input_data,
+            payload,
+            profile,
+            task_count,
+            schedule_run_id,
+            solve_input,
+            pinned,
+        )
         
-        # Run scheduler
-        time_limit = payload.get("time_limit_seconds", 30)
-        result = run_scheduler(input_data, time_limit_seconds=time_limit)
+        # The pins can make the changed tasks unplaceable; re-plan everything
+        if pinned and result.status != "succeeded":
+            logger.info(
+                "partial_replan_fell_back",
+                extra={
+                    "schedule_run_id": schedule_run_id,
+                    "pinned": len(pinned),
+                    "reason": result.infeasible_reason,
+                },
+            )
+            mode, pinned = "full", {}
+            task_count = len(input_data.get_unlocked_tasks())
+            profile = select_profile(task_count, profile_name)
+            result = await _solve_in_thread(
+                input_data, payload, profile, task_count, schedule_run_id
+            )
+        
+        result = replace(
+            result,
+            metrics={
+                **result.metrics,
+                "load_ms": load_ms,
+                "deferred": deferred,
+                "mode": mode,
+                "pinned": len(pinned),
+            },
+        )
         
         # Save result
-        await save_schedule_result(pool, schedule_run_id, result)
+        await save_schedule_result(pool, schedule_run_id, result, org_id)
         
         logger.info(
             "schedule_run_job_completed",
@@ -118,13 +387,21 @@ async def handle_schedule_run(pool: asyncpg.Pool, job_id: str, payload: dict[str
                 "status": result.status,
                 "task_count": len(result.items),
                 "wall_time_ms": result.solver_wall_time_ms,
+                "strategy": result.metrics.get("strategy"),
+                "solver_profile": profile.name,
+                "mode": mode,
             },
         )
         
         if result.status != "succeeded":
-            raise RuntimeError(
-                f"Schedule failed: {result.infeasible_reason or 'unknown error'}"
-            )
+            raise _failure_error(result)
+    
+    except asyncio.CancelledError as e:
+        # Timed out, lease lost or handed back on shutdown; the run must not
+        # stay 'running'
+        released = JOB_RELEASED in e.args
+        await _mark_cancelled(pool, schedule_run_id, started_at, released)
+        raise
     
     except Exception as e:
         # Update schedule_runs to failed
@@ -141,3 +418,41 @@ async def handle_schedule_run(pool: asyncpg.Pool, job_id: str, payload: dict[str
             str(e),
         )
         raise
+
+
+async def _mark_cancelled(
+    pool: asyncpg.Pool,
+    schedule_run_id: str,
+    started_at: datetime | None,
+    released: bool,
+) -> None:
+    """
+    Record a cancelled attempt on its schedule run.
+    
+    A released job runs again, so its run goes back to 'queued'; any other
+    cancel fails the run (the job's own retry, if any, sets it running
+    again). Skipped if the run changed since this attempt started, e.g. a
+    retry on another worker already picked it up.
+    """
+    try:
+        await pool.execute(
+            """
+            update public.schedule_runs
+            set
+              status = $3,
+              infeasible_reason = $4,
+              updated_at = now()
+            where id = $1::uuid
+              and status = 'running'
+              and updated_at = $2
+            """,
+            schedule_run_id,
+            started_at,
+            "queued" if released else "failed",
+            None if released else "Cancelled: the job timed out or lost its lease",
+        )
+    except Exception as e:
+        logger.warning(
+            "schedule_run_cancel_update_failed",
+            extra={"schedule_run_id": schedule_run_id, "error": str(e)},
+        )
@@ -0,0 +1,331 @@
+"""Concurrent job execution with per-type limits.
+
+A worker runs many jobs at once as asyncio tasks: I/O-bound `ai_enrich` jobs
+mostly wait on the network, and `schedule_run` solves run in a thread. Each
+job type has its own limit (`JOB_CONCURRENCY`), and the dispatcher only
+claims types with a free slot, so a slow solve never holds up enrichment.
+
+Free slots are filled with one batch claim, and succeeded jobs are marked in
+one statement per loop iteration, so draining a burst of short jobs costs a
+few round-trips per batch rather than two per job.
+
+Claimed jobs hold a lease (`JOB_LEASE_SECONDS`) that a heartbeat task extends
+every third of the lease while they run. A job whose lease could not be
+extended has been reaped and possibly claimed elsewhere, so it is cancelled.
+
+Each type also has a timeout (`JOB_TIMEOUTS`); `run_job` cancels a handler
+that runs past it and records the attempt as a timeout, so a hung call
+cannot hold a slot forever. Failed attempts are retried after a jittered
+backoff capped per type (`JOB_RETRY_BACKOFF_CAPS`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+import asyncpg
+
+from app import metrics
+from app.core.config import settings
+from app.job_errors import JOB_RELEASED
+from app.job_wakeup import job_wakeup
+from app.queue_processor import (
+    JOB_HANDLERS,
+    claim_jobs,
+    extend_leases,
+    mark_jobs_succeeded,
+    release_jobs,
+    run_job,
+)
+from app.scheduler.data_loader import LOAD_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Limit for handled job types missing from JOB_CONCURRENCY
+DEFAULT_TYPE_CONCURRENCY = 1
+
+# Timeout in seconds for handled job types missing from JOB_TIMEOUTS
+DEFAULT_JOB_TIMEOUT_SECONDS = 600.0
+
+# Pooled connections one job can hold at once; other types use one
+_JOB_CONNECTIONS = {"schedule_run": LOAD_CONNECTIONS}
+
+# Claims and heartbeats, the reaper and periodic checks; the LISTEN
+# connections are opened outside the pool (`connect_listener`)
+_WORKER_CONNECTIONS = 4
+
+# Largest pool sized from JOB_CONCURRENCY. Above it jobs wait briefly for a
+# connection rather than the worker opening more than a small database or
+# pooler allows; `ai_enrich` and `retention` hold one only per statement.
+DEFAULT_POOL_CAP = 15
+
+
+def _parse_per_type(
+    spec: str, setting: str, default: float, parse: Callable[[str], float]
+) -> dict[str, Any]:
+    values = {job_type: default for job_type in JOB_HANDLERS}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        job_type, sep, value = entry.partition("=")
+        job_type = job_type.strip()
+        if not sep or job_type not in JOB_HANDLERS:
+            raise ValueError(f"Invalid {setting} entry: {entry.strip()!r}")
+        values[job_type] = parse(value)
+        if values[job_type] < 0:
+            raise ValueError(f"Invalid {setting} entry: {entry.strip()!r}")
+    return values
+
+
+def parse_job_concurrency(spec: str) -> dict[str, int]:
+    """
+    Parse per-type limits like "schedule_run=2,ai_enrich=20".
+
+    Every handled job type gets a limit; types not in the spec get
+    `DEFAULT_TYPE_CONCURRENCY`. A limit of 0 stops the worker claiming that type.
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown job type
+    """
+    return _parse_per_type(spec, "JOB_CONCURRENCY", DEFAULT_TYPE_CONCURRENCY, int)
+
+
+def min_pool_size_for(limits: dict[str, int]) -> int:
+    """
+    Smallest pool that lets every job type run: the worker's own
+    connections plus the most one job holds at once.
+
+    A `schedule_run` load reserves all of its connections together, so loads
+    wait for each other rather than deadlock, but a pool smaller than one load
+    could never serve it.
+
+    Args:
+        limits: Concurrent jobs per type (`parse_job_concurrency`)
+
+    Returns:
+        Minimum pool size
+    """
+    return _WORKER_CONNECTIONS + max(
+        (_JOB_CONNECTIONS.get(job_type, 1) for job_type, limit in limits.items() if limit),
+        default=0,
+    )
+
+
+def pool_size_for(limits: dict[str, int]) -> int:
+    """
+    Default pool size: enough for every job type to run at its limit without
+    waiting for a connection, capped at `DEFAULT_POOL_CAP`.
+
+    Args:
+        limits: Concurrent jobs per type (`parse_job_concurrency`)
+
+    Returns:
+        Maximum pool size, never below `min_pool_size_for(limits)`
+    """
+    needed = _WORKER_CONNECTIONS + sum(
+        limit * _JOB_CONNECTIONS.get(job_type, 1) for job_type, limit in limits.items()
+    )
+    return max(min(needed, DEFAULT_POOL_CAP), min_pool_size_for(limits))
+
+
+def parse_job_timeouts(spec: str) -> dict[str, float | None]:
+    """
+    Parse per-type timeouts in seconds like "schedule_run=1800,ai_enrich=120".
+
+    Types not in the spec get `DEFAULT_JOB_TIMEOUT_SECONDS`. A timeout of 0
+    means no timeout (None).
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown job type
+    """
+    timeouts = _parse_per_type(spec, "JOB_TIMEOUTS", DEFAULT_JOB_TIMEOUT_SECONDS, float)
+    return {job_type: timeout or None for job_type, timeout in timeouts.items()}
+
+
+def parse_job_backoff_caps(spec: str) -> dict[str, float]:
+    """
+    Parse per-type retry backoff caps in seconds like "schedule_run=300".
+
+    Types not in the spec get `JOB_RETRY_BACKOFF_CAP_SECONDS`.
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown job type
+    """
+    return _parse_per_type(
+        spec, "JOB_RETRY_BACKOFF_CAPS", settings.job_retry_backoff_cap_seconds, float
+    )
+
+
+class JobDispatcher:
+    """Claims jobs into free per-type slots and runs them as asyncio tasks."""
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        worker_id: str,
+        limits: dict[str, int],
+        timeouts: dict[str, float | None] | None = None,
+        backoff_caps: dict[str, float] | None = None,
+    ) -> None:
+        self.pool = pool
+        self.worker_id = worker_id
+        self.limits = limits
+        self.timeouts = timeouts or {}
+        self.backoff_caps = backoff_caps or {}
+        self._in_flight: dict[str, dict[asyncio.Task[None], str]] = {
+            job_type: {} for job_type in limits
+        }  # type -> task -> job ID
+        self._succeeded: list[str] = []  # finished jobs not yet marked succeeded
+        self._heartbeat: asyncio.Task[None] | None = None
+        self._publish_counts()
+
+    def start(self) -> None:
+        """Start the lease heartbeat."""
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop(), name="job-heartbeat")
+
+    @property
+    def in_flight(self) -> dict[str, int]:
+        """Running jobs by type."""
+        return {job_type: len(tasks) for job_type, tasks in self._in_flight.items()}
+
+    def free_slots(self) -> dict[str, int]:
+        """Free slots by job type, for types with any."""
+        return {
+            job_type: self.limits[job_type] - len(tasks)
+            for job_type, tasks in self._in_flight.items()
+            if len(tasks) < self.limits[job_type]
+        }
+
+    async def fill(self) -> int:
+        """
+        Claim jobs into every free slot with one batch claim.
+
+        Returns:
+            Number of jobs started
+        """
+        slots = self.free_slots()
+        if not slots:
+            return 0
+        jobs = await claim_jobs(self.pool, self.worker_id, slots)
+        if not jobs:
+            job_wakeup.queue_empty()
+            return 0
+        job_wakeup.job_claimed()
+        for job in jobs:
+            self._start(job)
+        return len(jobs)
+
+    async def flush(self) -> int:
+        """
+        Mark finished jobs succeeded in one statement.
+
+        On failure the jobs are kept for the next flush. Jobs this worker
+        no longer holds (reaped after a lost lease) are skipped.
+
+        Returns:
+            Number of jobs marked
+        """
+        job_ids, self._succeeded = self._succeeded, []
+        try:
+            return await mark_jobs_succeeded(self.pool, job_ids, self.worker_id)
+        except Exception:
+            self._succeeded = job_ids + self._succeeded
+            raise
+
+    def _start(self, job: dict[str, Any]) -> None:
+        task = asyncio.create_task(
+            run_job(
+                self.pool,
+                job,
+                self.worker_id,
+                on_success=self._job_succeeded,
+                timeout=self.timeouts.get(job["type"]),
+                backoff_cap=self.backoff_caps.get(job["type"]),
+            ),
+            name=f"job-{job['id']}",
+        )
+        self._in_flight[job["type"]][task] = job["id"]
+        task.add_done_callback(lambda t, job_type=job["type"]: self._on_done(job_type, t))
+        self._publish_counts()
+
+    def _job_succeeded(self, job_id: str) -> None:
+        self._succeeded.append(job_id)
+
+    def _on_done(self, job_type: str, task: asyncio.Task[None]) -> None:
+        self._in_flight[job_type].pop(task, None)
+        self._publish_counts()
+        if not task.cancelled() and task.exception() is not None:
+            # run_job records handler errors itself; this is a failure to record one
+            logger.error(
+                "job_task_failed",
+                extra={"worker_id": self.worker_id, "error": str(task.exception())},
+                exc_info=task.exception(),
+            )
+        # A slot is free; let the loop claim again
+        job_wakeup.nudge()
+
+    def _jobs(self) -> dict[str, asyncio.Task[None]]:
+        """In-flight tasks by job ID."""
+        return {
+            job_id: task
+            for by_task in self._in_flight.values()
+            for task, job_id in by_task.items()
+        }
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.job_lease_seconds / 3)
+            jobs = self._jobs()
+            if not jobs:
+                continue
+            try:
+                held = await extend_leases(self.pool, list(jobs), self.worker_id)
+            except Exception as e:
+                # Leases still have two thirds left; try again next beat
+                logger.warning(
+                    "job_heartbeat_failed",
+                    extra={"worker_id": self.worker_id, "error": str(e)},
+                )
+                continue
+            for job_id, task in jobs.items():
+                if job_id not in held and not task.done():
+                    logger.warning(
+                        "job_lease_lost",
+                        extra={"worker_id": self.worker_id, "job_id": job_id},
+                    )
+                    task.cancel()
+
+    def _publish_counts(self) -> None:
+        metrics.jobs_in_flight.clear()
+        metrics.jobs_in_flight.update(self.in_flight)
+
+    async def shutdown(self, grace_seconds: float) -> None:
+        """
+        Wait up to `grace_seconds` for running jobs, then cancel the rest and
+        hand them back to the queue.
+        """
+        tasks = {task: job_id for job_id, task in self._jobs().items()}
+        pending: set[asyncio.Task[None]] = set()
+        if tasks:
+            # Leases keep being extended while jobs finish
+            logger.info(
+                "worker_draining",
+                extra={"worker_id": self.worker_id, "in_flight": self.in_flight},
+            )
+            _, pending = await asyncio.wait(tasks, timeout=grace_seconds)
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        await self.flush()
+        if not pending:
+            return
+
+        for task in pending:
+            task.cancel(JOB_RELEASED)
+        await asyncio.gather(*pending, return_exceptions=True)
+        # A cancelled solve keeps its thread until CP-SAT returns, but the job
+        # is free for another worker now
+        await release_jobs(self.pool, [tasks[task] for task in pending], self.worker_id)
@@ -0,0 +1,31 @@
+"""Errors handlers raise to say whether a failed job is worth retrying.
+
+`run_job` requeues a job that raised `RetryableError` (or any exception
+without a class here) with jittered backoff while attempts remain. A job that
+raised `NonRetryableError` is dead-lettered straight away: a bad payload,
+missing technicians or bays, or a proven infeasible schedule fails the same
+way every time.
+
+A handler can also be cancelled: by its timeout, when the worker lost its
+lease, or on shutdown. Only the shutdown cancel carries `JOB_RELEASED` as its
+message, because only then does the job go back to the queue uncounted.
+"""
+
+from __future__ import annotations
+
+
+# CancelledError message of handlers cancelled on shutdown, whose jobs are
+# handed back to the queue (`JobDispatcher.shutdown`)
+JOB_RELEASED = "job_released"
+
+
+class JobError(Exception):
+    """Base class for typed job failures."""
+
+
+class RetryableError(JobError):
+    """A transient failure (connection reset, rate limit); retry with backoff."""
+
+
+class NonRetryableError(JobError):
+    """A failure retries cannot fix (invalid payload, missing data); dead-letter now."""
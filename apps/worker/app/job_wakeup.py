@@ -0,0 +1,153 @@
+"""Wake idle workers when jobs are enqueued.
+
+`enqueue_job` and retries in `mark_job_failed` `pg_notify` the job's type and
+`run_after` (epoch seconds) on `NOTIFY_CHANNEL`. Each worker holds a LISTEN
+connection on `LISTEN_DATABASE_URL` (the transaction pooler behind
+`DATABASE_URL` cannot deliver notifications, see `connect_listener`): a
+notification for a job that is already due wakes the worker
+immediately, and one for a delayed job arms a timer for its `run_after`.
+
+Notifications are a latency optimization only. Jobs inserted without one,
+and notifications missed while the listener was reconnecting, are picked up
+by a slow fallback poll. Without `LISTEN_DATABASE_URL` the worker only polls,
+at `POLL_INTERVAL_SECONDS`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Any
+
+import asyncpg
+
+from app.db.session import connect_listener
+from app.metrics import wakeup_to_claim_ms
+
+logger = logging.getLogger(__name__)
+
+# Must match JOB_NOTIFY_CHANNEL in apps/api/app/services/job_queue_service.py
+NOTIFY_CHANNEL = "job_queue_ready"
+
+
+class JobWakeup:
+    """LISTEN connection that wakes the worker loop when jobs become due."""
+
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+        self._woken_at: float | None = None  # time.monotonic() of the pending wakeup
+        self._timers: dict[float, asyncio.TimerHandle] = {}  # run_after -> timer
+        self._conn: asyncpg.Connection | None = None
+
+    @property
+    def listening(self) -> bool:
+        """True while the LISTEN connection is up."""
+        return self._conn is not None and not self._conn.is_closed()
+
+    def wake(self) -> None:
+        """Wake the worker loop; the first wakeup since the last claim is timed."""
+        if self._woken_at is None:
+            self._woken_at = time.monotonic()
+        self._event.set()
+
+    def nudge(self) -> None:
+        """Wake the worker loop for local reasons (a freed slot, shutdown); not timed."""
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait for a wakeup or the timeout, whichever comes first.
+
+        Returns:
+            True if woken before the timeout, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+        return True
+
+    def job_claimed(self) -> None:
+        """Record wakeup-to-claim latency for the pending wakeup, if any."""
+        if self._woken_at is not None:
+            wakeup_to_claim_ms.observe((time.monotonic() - self._woken_at) * 1000)
+            self._woken_at = None
+
+    def queue_empty(self) -> None:
+        """Forget the pending wakeup; its job was claimed by another worker."""
+        self._woken_at = None
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            delay = float(json.loads(payload)["run_after"]) - time.time()
+        except (ValueError, KeyError, TypeError):
+            delay = 0.0
+        if delay <= 0:
+            self.wake()
+            return
+        # One timer per second with a delayed job; jittered retries land on
+        # arbitrary times, so they are grouped by the second they fall due
+        run_after = float(math.ceil(time.time() + delay))
+        if run_after not in self._timers:
+            self._timers[run_after] = asyncio.get_running_loop().call_later(
+                run_after - time.time(), self._on_timer, run_after
+            )
+
+    def _on_timer(self, run_after: float) -> None:
+        self._timers.pop(run_after, None)
+        self.wake()
+
+    def _on_terminate(self, conn: Any) -> None:
+        # Poll once straight away in case a notification was lost
+        logger.warning("job_wakeup_listener_lost")
+        self.wake()
+
+    async def ensure_listening(self) -> None:
+        """
+        Start (or restart) the LISTEN connection.
+
+        Holds one dedicated connection for the worker's lifetime. Does nothing
+        without `LISTEN_DATABASE_URL`; failures are logged and the worker
+        polls until the next call.
+        """
+        if self.listening:
+            return
+        await self.stop()
+        try:
+            conn = await connect_listener()
+        except Exception as e:
+            logger.warning("job_wakeup_listen_failed", extra={"error": str(e)})
+            return
+        if conn is None:
+            return
+        try:
+            await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except Exception as e:
+            logger.warning("job_wakeup_listen_failed", extra={"error": str(e)})
+            await conn.close()
+            return
+        conn.add_termination_listener(self._on_terminate)
+        self._conn = conn
+        logger.info("job_wakeup_listening", extra={"channel": NOTIFY_CHANNEL})
+
+    async def stop(self) -> None:
+        """Stop listening, cancel timers and close the connection."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        conn = self._conn
+        self._conn = None
+        if conn is None:
+            return
+        conn.remove_termination_listener(self._on_terminate)
+        if not conn.is_closed():
+            await conn.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+            await conn.close()
+
+
+job_wakeup = JobWakeup()
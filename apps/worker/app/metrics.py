@@ -0,0 +1,194 @@
+"""In-process worker metrics.
+
+Cheap counters and histograms updated on the hot path, reported in the
+periodic `worker_metrics` log line and, when `METRICS_PORT` is set, served in
+Prometheus text format by `app.metrics_server`.
+"""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Cumulative histogram with fixed upper bounds (Prometheus-style buckets)."""
+
+    name: str
+    bounds: tuple[float, ...]
+    help: str = ""
+    counts: list[int] = field(init=False)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        # One slot per bound plus +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile, or None if empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict[str, Any]:
+        """Summary for logging."""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+@dataclass(slots=True)
+class HistogramFamily:
+    """Histograms with the same buckets, one per value of one label."""
+
+    name: str
+    bounds: tuple[float, ...]
+    label: str
+    help: str = ""
+    children: dict[str, Histogram] = field(default_factory=dict)
+
+    def labels(self, label: str) -> Histogram:
+        """The histogram for one label value, created on first use."""
+        child = self.children.get(label)
+        if child is None:
+            child = self.children[label] = Histogram(self.name, self.bounds)
+        return child
+
+    def snapshot(self) -> dict[str, Any]:
+        """Summary per label value."""
+        return {label: child.snapshot() for label, child in self.children.items()}
+
+
+@dataclass(slots=True)
+class Counter:
+    """Monotonic counters keyed by a tuple of label values."""
+
+    name: str
+    labels: tuple[str, ...]
+    help: str = ""
+    values: dict[tuple[str, ...], int] = field(default_factory=dict)
+
+    def inc(self, *label_values: str, amount: int = 1) -> None:
+        """Add `amount` to the counter for these label values."""
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def snapshot(self) -> dict[str, int]:
+        """Counts keyed by joined label values, for logging."""
+        return {"/".join(key): value for key, value in self.values.items()}
+
+
+wakeup_to_claim_ms = Histogram(
+    "job_wakeup_to_claim_ms",
+    bounds=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    help="Milliseconds from a wakeup (notification or delayed-job timer) to the claim it led to",
+)
+
+queue_wait_ms = HistogramFamily(
+    "job_queue_wait_ms",
+    bounds=(10, 100, 500, 1000, 5000, 15000, 60000, 300000, 900000, 3600000),
+    label="org_id",
+    help="Milliseconds claimed jobs waited since their run_after",
+)
+
+run_duration_ms = HistogramFamily(
+    "job_run_duration_ms",
+    bounds=(10, 50, 100, 500, 1000, 5000, 15000, 60000, 300000, 1200000),
+    label="type",
+    help="Milliseconds handlers ran, whatever the outcome",
+)
+
+# lease_expired: requeued by the reaper after a worker stopped heartbeating
+job_outcomes = Counter(
+    "job_outcomes_total",
+    labels=("type", "outcome"),
+    help="Finished runs by outcome: succeeded, retried, dead_lettered or lease_expired",
+)
+
+# Also counted in job_outcomes as retried or dead_lettered
+job_timeouts = Counter(
+    "job_timeouts_total",
+    labels=("type",),
+    help="Attempts cancelled for running past their type's timeout",
+)
+
+# Jobs currently running in this worker, by type (maintained by the dispatcher)
+jobs_in_flight: dict[str, int] = {}
+
+
+def snapshot() -> dict[str, Any]:
+    """All worker metrics, keyed by name."""
+    return {
+        wakeup_to_claim_ms.name: wakeup_to_claim_ms.snapshot(),
+        queue_wait_ms.name: queue_wait_ms.snapshot(),
+        run_duration_ms.name: run_duration_ms.snapshot(),
+        job_outcomes.name: job_outcomes.snapshot(),
+        job_timeouts.name: job_timeouts.snapshot(),
+        "jobs_in_flight": dict(jobs_in_flight),
+    }
+
+
+def format_labels(pairs: dict[str, str]) -> str:
+    """Prometheus label set, values escaped; empty for no labels."""
+    if not pairs:
+        return ""
+    escaped = (
+        key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in pairs.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _histogram_lines(hist: Histogram, labels: dict[str, str]) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, n in zip(hist.bounds, hist.counts):
+        cumulative += n
+        lines.append(f"{hist.name}_bucket{format_labels({**labels, 'le': f'{bound:g}'})} {cumulative}")
+    lines.append(f"{hist.name}_bucket{format_labels({**labels, 'le': '+Inf'})} {hist.count}")
+    lines.append(f"{hist.name}_sum{format_labels(labels)} {float(hist.total)!r}")
+    lines.append(f"{hist.name}_count{format_labels(labels)} {hist.count}")
+    return lines
+
+
+def metric_header(name: str, kind: str, text: str) -> list[str]:
+    """HELP and TYPE lines that start a metric family."""
+    escaped = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return [f"# HELP {name} {escaped}", f"# TYPE {name} {kind}"]
+
+
+def render_prometheus(worker_id: str) -> str:
+    """All worker metrics in the Prometheus text exposition format."""
+    lines = metric_header(wakeup_to_claim_ms.name, "histogram", wakeup_to_claim_ms.help)
+    lines += _histogram_lines(wakeup_to_claim_ms, {})
+    for family in (queue_wait_ms, run_duration_ms):
+        lines += metric_header(family.name, "histogram", family.help)
+        for label, child in sorted(family.children.items()):
+            lines += _histogram_lines(child, {family.label: label})
+
+    for counter in (job_outcomes, job_timeouts):
+        lines += metric_header(counter.name, "counter", counter.help)
+        for key, value in sorted(counter.values.items()):
+            lines.append(f"{counter.name}{format_labels(dict(zip(counter.labels, key)))} {value}")
+
+    lines += metric_header("jobs_in_flight", "gauge", "Jobs running in this worker")
+    for job_type, n in sorted(jobs_in_flight.items()):
+        lines.append(f"jobs_in_flight{format_labels({'worker_id': worker_id, 'type': job_type})} {n}")
+    return "\n".join(lines) + "\n"
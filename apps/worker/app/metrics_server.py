@@ -0,0 +1,115 @@
+"""Local HTTP endpoint serving worker metrics to Prometheus.
+
+`GET /metrics` returns this worker's in-process metrics (`app.metrics`) plus
+queue-wide gauges read on each scrape: active jobs by org, type and status,
+and the age of the oldest due job per type. The queue gauges come from the
+partial indexes on queued and running jobs, and are the same on every
+worker; aggregate them with `max` rather than `sum`.
+
+Enabled by `METRICS_PORT`; plain asyncio, no extra dependencies.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import asyncpg
+
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+# Scrapes should not queue behind a busy pool for long
+QUEUE_STATS_TIMEOUT_SECONDS = 2.0
+
+
+async def _queue_lines(pool: asyncpg.Pool) -> list[str]:
+    rows = await pool.fetch(
+        """
+        select
+          org_id::text as org_id,
+          type,
+          status,
+          count(*) as jobs,
+          extract(epoch from now() - min(run_after) filter (where run_after <= now())) as oldest_due_seconds
+        from public.job_queue
+        where status in ('queued', 'running')
+        group by org_id, type, status
+        """,
+        timeout=QUEUE_STATS_TIMEOUT_SECONDS,
+    )
+    lines = metrics.metric_header("job_queue_jobs", "gauge", "Queued and running jobs")
+    oldest: dict[str, float] = {}
+    for row in sorted(rows, key=lambda r: (r["org_id"], r["type"], r["status"])):
+        labels = metrics.format_labels({"org_id": row["org_id"], "type": row["type"], "status": row["status"]})
+        lines.append(f"job_queue_jobs{labels} {row['jobs']}")
+        if row["status"] == "queued" and row["oldest_due_seconds"] is not None:
+            age = float(row["oldest_due_seconds"])
+            oldest[row["type"]] = max(age, oldest.get(row["type"], 0.0))
+
+    lines += metrics.metric_header(
+        "job_queue_oldest_due_seconds", "gauge", "Age of the oldest queued job that is due"
+    )
+    for job_type, age in sorted(oldest.items()):
+        lines.append(f"job_queue_oldest_due_seconds{metrics.format_labels({'type': job_type})} {age:.3f}")
+    return lines
+
+
+class MetricsServer:
+    """Serves `GET /metrics` until stopped."""
+
+    def __init__(self, pool: asyncpg.Pool, worker_id: str) -> None:
+        self.pool = pool
+        self.worker_id = worker_id
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str, port: int) -> None:
+        """Start listening; failures are logged and leave metrics off."""
+        try:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        except OSError as e:
+            logger.warning("metrics_server_failed", extra={"host": host, "port": port, "error": str(e)})
+            return
+        logger.info("metrics_server_listening", extra={"host": host, "port": port})
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def render(self) -> str:
+        """Worker metrics, then queue gauges if the database answers in time."""
+        body = metrics.render_prometheus(self.worker_id)
+        try:
+            body += "\n".join(await _queue_lines(self.pool)) + "\n"
+        except Exception as e:
+            logger.warning("metrics_queue_stats_failed", extra={"error": str(e)})
+        return body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            # Headers are not needed; drain them up to the blank line
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass
+            method, path, *_ = request_line.decode("latin-1").split() + ["", ""]
+            if method == "GET" and path.split("?")[0] == "/metrics":
+                status, body = "200 OK", await self.render()
+            else:
+                status, body = "404 Not Found", "not found\n"
+            payload = body.encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import random
+import time
 from datetime import datetime
 from typing import Any, Callable
 
 import asyncpg
 
+from app import metrics
+from app.core.config import settings
 from app.handlers.ai_enrich import handle_ai_enrich
+from app.handlers.retention import handle_retention
 from app.handlers.schedule_run import handle_schedule_run
+from app.job_errors import NonRetryableError
+from app.job_wakeup import NOTIFY_CHANNEL, job_wakeup
 
 logger = logging.getLogger(__name__)
 
@@ -19,22 +27,132 @@ logger = logging.getLogger(__name__)
 JOB_HANDLERS: dict[str, Callable[[asyncpg.Pool, str, dict[str, Any]], Any]] = {
     "ai_enrich": handle_ai_enrich,
     "schedule_run": handle_schedule_run,
+    "retention": handle_retention,
 }
 
 
+# Columns a job keeps when it moves to job_history (migration 0017); locks
+# and leases are dropped
+_HISTORY_COLUMNS = (
+    "id, org_id, type, payload, status, run_after, attempts, max_attempts, "
+    "priority, dedupe_key, result, error, error_class, created_at, updated_at"
+)
+
+
+# Jobs this worker still holds; the reaper may have requeued (and another
+# worker re-claimed) a job whose lease ran out. `worker_id` is $2.
+_HELD_BY_WORKER = "id = {ids} and status = 'running' and locked_by = $2"
+
+
+def _finish_jobs(
+    where: str,
+    status: str,
+    error: str = "error",
+    error_class: str = "error_class",
+) -> str:
+    """
+    SQL that moves the jobs matching `where` from job_queue to job_history.
+
+    `status`, `error` and `error_class` are SQL expressions over the deleted
+    row. Delete and insert are one statement, so a job is always in exactly
+    one of the tables.
+    """
+    return f"""
+        with finished as (
+          delete from public.job_queue
+          where {where}
+          returning *
+        )
+        insert into public.job_history ({_HISTORY_COLUMNS})
+        select
+          id, org_id, type, payload, {status}, run_after, attempts, max_attempts,
+          priority, dedupe_key, result, {error}, {error_class}, created_at, now()
+        from finished
+    """
+
+
+def _pick_claimable(type_filter: str, limit: str) -> str:
+    """
+    SQL selecting up to `limit` claimable job IDs, locked, in claim order.
+    
+    Highest priority first; within a priority, orgs take turns (each org's
+    oldest job, then each org's second oldest, ...), then oldest first. Each
+    org contributes at most `limit` candidates from its own index range, so
+    one org's backlog never has to be scanned to serve the others.
+    
+    Orgs with queued jobs are found by a skip scan of `job_queue_org_claim_idx`
+    (one index probe per org), so orgs with nothing queued cost nothing.
+    
+    Args:
+        type_filter: Predicate on `type` for the candidate jobs
+        limit: SQL expression for the number of jobs to pick
+    """
+    return f"""
+        with recursive queued_orgs (org_id) as (
+          (
+            select org_id
+            from public.job_queue
+            where status = 'queued' and {type_filter}
+            order by org_id
+            limit 1
+          )
+          union all
+          select (
+            select j.org_id
+            from public.job_queue j
+            where j.status = 'queued' and j.org_id > o.org_id and {type_filter}
+            order by j.org_id
+            limit 1
+          )
+          from queued_orgs o
+          where o.org_id is not null
+        )
+        select q.id
+        from (
+          select
+            c.id,
+            c.priority,
+            c.run_after,
+            c.created_at,
+            row_number() over (
+              partition by c.org_id, c.priority
+              order by c.run_after, c.created_at
+            ) as org_turn
+          from queued_orgs o
+          cross join lateral (
+            select id, org_id, priority, run_after, created_at
+            from public.job_queue
+            where org_id = o.org_id
+              and status = 'queued'
+              and run_after <= now()
+              and {type_filter}
+            order by priority desc, run_after, created_at
+            limit {limit}
+          ) c
+        ) c
+        join public.job_queue q on q.id = c.id
+        where q.status = 'queued'
+        order by c.priority desc, c.org_turn, c.run_after, c.created_at
+        limit {limit}
+        for update of q skip locked
+    """
+
+
 async def claim_next_job(
     pool: asyncpg.Pool,
     worker_id: str,
+    job_types: list[str] | None = None,
 ) -> dict[str, Any] | None:
     """
     Claim the next available job using FOR UPDATE SKIP LOCKED.
     
     This ensures multiple workers can safely process jobs concurrently
-    without conflicts.
+    without conflicts. Jobs are taken by priority, round-robin across orgs.
     
     Args:
         pool: Database connection pool
         worker_id: Worker identifier
+        job_types: Only claim jobs of these types (default: any type)
     
     Returns:
         Job record or None if no jobs available
@@ -42,107 +160,243 @@ async def claim_next_job(
     async with pool.acquire() as conn:
         async with conn.transaction():
             row = await conn.fetchrow(
-                """
+                f"""
                 update public.job_queue
                 set
                   status = 'running',
                   locked_at = now(),
                   locked_by = $1,
+                  lease_expires_at = now() + make_interval(secs => $3),
                   attempts = attempts + 1,
                   updated_at = now()
                 where id = (
-                  select id
-                  from public.job_queue
-                  where status = 'queued'
-                    and run_after <= now()
-                  order by run_after, created_at
-                  limit 1
-                  for update skip locked
+                  {_pick_claimable("($2::text[] is null or type = any($2::text[]))", "1")}
                 )
                 returning
                   id::text as id,
                   org_id::text as org_id,
                   type,
+                  priority,
                   payload,
                   attempts,
-                  max_attempts
+                  max_attempts,
+                  (extract(epoch from now() - run_after) * 1000)::bigint as queue_wait_ms
                 """,
                 worker_id,
+                job_types,
+                settings.job_lease_seconds,
             )
     
     return dict(row) if row else None
 
 
-async def mark_job_succeeded(pool: asyncpg.Pool, job_id: str) -> None:
+async def claim_jobs(
+    pool: asyncpg.Pool,
+    worker_id: str,
+    slots: dict[str, int],
+) -> list[dict[str, Any]]:
     """
-    Mark job as succeeded.
+    Claim up to `slots[type]` jobs of each type in one statement.
+    
+    Each type's jobs are picked in the same order as `claim_next_job`
+    (priority, then round-robin across orgs) with FOR UPDATE SKIP LOCKED,
+    so batch and single claims mix safely.
     
     Args:
         pool: Database connection pool
-        job_id: Job ID
+        worker_id: Worker identifier
+        slots: Maximum jobs to claim per type; types with 0 are skipped
+    
+    Returns:
+        Claimed job records (fewer than requested when the queue runs dry)
     """
-    await pool.execute(
-        """
-        update public.job_queue
+    wanted = {job_type: n for job_type, n in slots.items() if n > 0}
+    if not wanted:
+        return []
+    
+    rows = await pool.fetch(
+        f"""
+        with batch as (
+          select picked.id
+          from unnest($2::text[], $3::int[]) as w(type, n)
+          cross join lateral ({_pick_claimable("type = w.type", "w.n")}) picked
+        )
+        update public.job_queue q
         set
-          status = 'succeeded',
-          locked_at = null,
-          locked_by = null,
+          status = 'running',
+          locked_at = now(),
+          locked_by = $1,
+          lease_expires_at = now() + make_interval(secs => $4),
+          attempts = attempts + 1,
           updated_at = now()
-        where id = $1::uuid
+        from batch
+        where q.id = batch.id
+        returning
+          q.id::text as id,
+          q.org_id::text as org_id,
+          q.type,
+          q.priority,
+          q.payload,
+          q.attempts,
+          q.max_attempts,
+          (extract(epoch from now() - q.run_after) * 1000)::bigint as queue_wait_ms
         """,
-        job_id,
+        worker_id,
+        list(wanted),
+        list(wanted.values()),
+        settings.job_lease_seconds,
+    )
+    
+    return [dict(row) for row in rows]
+
+
+async def mark_job_succeeded(pool: asyncpg.Pool, job_id: str, worker_id: str) -> bool:
+    """
+    Mark job as succeeded, moving it to job_history.
+    
+    Only a job this worker still holds is moved; one the reaper took back
+    (and maybe another worker re-claimed) is left alone.
+    
+    Args:
+        pool: Database connection pool
+        job_id: Job ID
+        worker_id: Worker identifier
+    
+    Returns:
+        True if the job was marked, False if it is no longer this worker's
+    """
+    return await mark_jobs_succeeded(pool, [job_id], worker_id) == 1
+
+
+async def mark_jobs_succeeded(pool: asyncpg.Pool, job_ids: list[str], worker_id: str) -> int:
+    """
+    Mark many jobs as succeeded in one statement, moving them to job_history.
+    
+    Jobs no longer running under this worker are skipped and logged.
+    
+    Args:
+        pool: Database connection pool
+        job_ids: Job IDs
+        worker_id: Worker identifier
+    
+    Returns:
+        Number of jobs marked
+    """
+    if not job_ids:
+        return 0
+    
+    status = await pool.execute(
+        _finish_jobs(_HELD_BY_WORKER.format(ids="any($1::uuid[])"), "'succeeded'"),
+        job_ids,
+        worker_id,
     )
+    marked = int(status.split()[-1])
+    if marked < len(job_ids):
+        logger.warning(
+            "job_finish_skipped",
+            extra={
+                "worker_id": worker_id,
+                "status": "succeeded",
+                "job_ids": job_ids,
+                "skipped": len(job_ids) - marked,
+            },
+        )
+    return marked
+
+
+def retry_backoff_seconds(attempts: int, cap_seconds: float | None = None) -> float:
+    """
+    Full-jitter backoff: uniform between 0 and the exponential delay.
+    
+    The exponential delay is `JOB_RETRY_BASE_SECONDS * 2**attempts`, capped at
+    `cap_seconds` (default `JOB_RETRY_BACKOFF_CAP_SECONDS`). Jitter spreads
+    the retries of jobs that failed together (say, during a database blip)
+    instead of sending them back at the same moment.
+    """
+    if cap_seconds is None:
+        cap_seconds = settings.job_retry_backoff_cap_seconds
+    return random.uniform(0, min(cap_seconds, settings.job_retry_base_seconds * 2 ** attempts))
 
 
 async def mark_job_failed(
     pool: asyncpg.Pool,
     job_id: str,
+    worker_id: str,
     error: str,
     attempts: int,
     max_attempts: int,
-) -> None:
+    error_class: str = "error",
+    retryable: bool = True,
+    backoff_cap_seconds: float | None = None,
+) -> bool | None:
     """
     Mark job as failed or requeue for retry.
     
-    Implements retry logic with exponential backoff and dead-letter behavior.
-    If attempts < max_attempts, requeue. Otherwise, mark as permanently failed.
+    Implements retry logic with jittered exponential backoff and dead-letter
+    behavior. If the error is retryable and attempts < max_attempts, requeue.
+    Otherwise, mark as permanently failed and move the job to job_history.
+    Either way only a job this worker still holds is touched.
     
     Args:
         pool: Database connection pool
         job_id: Job ID
+        worker_id: Worker identifier
         error: Error message
         attempts: Current attempt count
         max_attempts: Maximum allowed attempts
+        error_class: Why the attempt failed ("error", "timeout" or "non_retryable")
+        retryable: False to dead-letter regardless of attempts left
+        backoff_cap_seconds: Longest retry delay for the job's type
+    
+    Returns:
+        True if the job was requeued, False if it was dead-lettered, None if
+        it is no longer this worker's
     """
-    if attempts < max_attempts:
-        # Requeue with exponential backoff: 2^attempts minutes
-        backoff_minutes = 2 ** attempts
+    requeue = retryable and attempts < max_attempts
+    if requeue:
+        backoff_seconds = retry_backoff_seconds(attempts, backoff_cap_seconds)
         logger.info(
             "job_retry_scheduled",
             extra={
                 "job_id": job_id,
                 "attempts": attempts,
                 "max_attempts": max_attempts,
-                "backoff_minutes": backoff_minutes,
+                "backoff_seconds": round(backoff_seconds, 1),
+                "error_class": error_class,
             },
         )
         
-        await pool.execute(
+        # Notify listening workers, which arm a timer for the new run_after
+        status = await pool.execute(
             """
-            update public.job_queue
-            set
-              status = 'queued',
-              run_after = now() + ($3 || ' minutes')::interval,
-              locked_at = null,
-              locked_by = null,
-              error = $2,
-              updated_at = now()
-            where id = $1::uuid
+            with job as (
+              update public.job_queue
+              set
+                status = 'queued',
+                run_after = now() + make_interval(secs => $4),
+                locked_at = null,
+                locked_by = null,
+                lease_expires_at = null,
+                error = $3,
+                error_class = $5,
+                updated_at = now()
+              where id = $1::uuid
+                and status = 'running'
+                and locked_by = $2
+              returning type, run_after
+            )
+            select pg_notify(
+              $6,
+              json_build_object('type', type, 'run_after', extract(epoch from run_after))::text
+            )
+            from job
             """,
             job_id,
+            worker_id,
             error,
-            str(backoff_minutes),
+            backoff_seconds,
+            error_class,
+            NOTIFY_CHANNEL,
         )
     else:
         # Dead letter: permanently failed
@@ -153,43 +407,244 @@ async def mark_job_failed(
                 "attempts": attempts,
                 "max_attempts": max_attempts,
                 "error": error,
+                "error_class": error_class,
             },
         )
         
-        await pool.execute(
-            """
-            update public.job_queue
-            set
-              status = 'failed',
-              locked_at = null,
-              locked_by = null,
-              error = $2,
-              updated_at = now()
-            where id = $1::uuid
-            """,
+        status = await pool.execute(
+            _finish_jobs(_HELD_BY_WORKER.format(ids="$1::uuid"), "'failed'", "$3", "$4"),
             job_id,
+            worker_id,
             error,
+            error_class,
+        )
+    
+    if status.split()[-1] == "0":
+        logger.warning(
+            "job_finish_skipped",
+            extra={
+                "worker_id": worker_id,
+                "status": "queued" if requeue else "failed",
+                "job_ids": [job_id],
+                "skipped": 1,
+            },
         )
+        return None
+    return requeue
 
 
-async def process_job(pool: asyncpg.Pool, worker_id: str) -> bool:
+async def extend_leases(pool: asyncpg.Pool, job_ids: list[str], worker_id: str) -> set[str]:
     """
-    Process a single job from the queue.
+    Extend the leases of jobs this worker is running.
     
-    Returns True if a job was processed, False if no jobs available.
+    Args:
+        pool: Database connection pool
+        job_ids: IDs of in-flight jobs
+        worker_id: Worker identifier
+    
+    Returns:
+        IDs whose lease was extended; the others are no longer held by this
+        worker (reaped after their lease expired)
+    """
+    if not job_ids:
+        return set()
+    
+    rows = await pool.fetch(
+        """
+        update public.job_queue
+        set lease_expires_at = now() + make_interval(secs => $3)
+        where id = any($1::uuid[])
+          and status = 'running'
+          and locked_by = $2
+        returning id::text as id
+        """,
+        job_ids,
+        worker_id,
+        settings.job_lease_seconds,
+    )
+    
+    return {row["id"] for row in rows}
+
+
+async def reap_expired_jobs(pool: asyncpg.Pool) -> int:
+    """
+    Requeue running jobs whose lease expired, or dead-letter them when they
+    are out of attempts.
+    
+    Works in batches of `JOB_REAPER_BATCH_SIZE`, each its own short
+    statement. Jobs without a lease (claimed before leases existed) are
+    reaped an hour after they were locked. Requeued jobs are notified;
+    dead-lettered ones move to job_history.
     
     Args:
         pool: Database connection pool
+    
+    Returns:
+        Number of jobs reaped
+    """
+    reaped = 0
+    while True:
+        rows = await pool.fetch(
+            f"""
+            with expired as (
+              select id, attempts >= max_attempts as dead
+              from public.job_queue
+              where status = 'running'
+                and (
+                  lease_expires_at < now()
+                  or (lease_expires_at is null and locked_at < now() - interval '1 hour')
+                )
+              order by lease_expires_at nulls first
+              limit $1
+              for update skip locked
+            ),
+            requeued as (
+              update public.job_queue q
+              set
+                status = 'queued',
+                run_after = now(),
+                error = 'Lease expired: worker ' || coalesce(q.locked_by, 'unknown') || ' stopped heartbeating',
+                error_class = 'lease_expired',
+                locked_at = null,
+                locked_by = null,
+                lease_expires_at = null,
+                updated_at = now()
+              from expired
+              where q.id = expired.id and not expired.dead
+              returning q.id, q.type, q.status, q.run_after
+            ),
+            dead as (
+              delete from public.job_queue q
+              using expired
+              where q.id = expired.id and expired.dead
+              returning q.*
+            ),
+            dead_lettered as (
+              insert into public.job_history ({_HISTORY_COLUMNS})
+              select
+                id, org_id, type, payload, 'failed', run_after, attempts, max_attempts,
+                priority, dedupe_key, result,
+                'Lease expired: worker ' || coalesce(locked_by, 'unknown') || ' stopped heartbeating',
+                'lease_expired', created_at, now()
+              from dead
+              returning id, type, status, run_after
+            ),
+            job as (
+              select * from requeued
+              union all
+              select * from dead_lettered
+            )
+            select
+              id::text as id,
+              type,
+              status,
+              case when status = 'queued' then pg_notify(
+                $2,
+                json_build_object('type', type, 'run_after', extract(epoch from run_after))::text
+              ) end
+            from job
+            """,
+            settings.job_reaper_batch_size,
+            NOTIFY_CHANNEL,
+        )
+        for row in rows:
+            metrics.job_outcomes.inc(
+                row["type"], "lease_expired" if row["status"] == "queued" else "dead_lettered"
+            )
+        if rows:
+            logger.warning(
+                "jobs_reaped",
+                extra={
+                    "requeued": [row["id"] for row in rows if row["status"] == "queued"],
+                    "dead_lettered": [row["id"] for row in rows if row["status"] == "failed"],
+                },
+            )
+        reaped += len(rows)
+        if len(rows) < settings.job_reaper_batch_size:
+            return reaped
+
+
+async def release_jobs(pool: asyncpg.Pool, job_ids: list[str], worker_id: str) -> int:
+    """
+    Hand claimed jobs back to the queue without counting the attempt.
+    
+    Used on shutdown for jobs that were interrupted. Listening workers are
+    notified so another one picks them up straight away.
+    
+    Args:
+        pool: Database connection pool
+        job_ids: IDs of jobs claimed by this worker
         worker_id: Worker identifier
     
     Returns:
-        True if job was processed, False if no jobs available
+        Number of jobs released
     """
-    job = await claim_next_job(pool, worker_id)
+    if not job_ids:
+        return 0
     
-    if not job:
-        return False
+    released = await pool.fetch(
+        """
+        with job as (
+          update public.job_queue
+          set
+            status = 'queued',
+            run_after = now(),
+            attempts = greatest(attempts - 1, 0),
+            locked_at = null,
+            locked_by = null,
+            lease_expires_at = null,
+            updated_at = now()
+          where id = any($1::uuid[])
+            and status = 'running'
+            and locked_by = $2
+          returning id, type, run_after
+        )
+        select
+          id::text as id,
+          pg_notify(
+            $3,
+            json_build_object('type', type, 'run_after', extract(epoch from run_after))::text
+          )
+        from job
+        """,
+        job_ids,
+        worker_id,
+        NOTIFY_CHANNEL,
+    )
+    
+    logger.info(
+        "jobs_released",
+        extra={"worker_id": worker_id, "job_ids": [row["id"] for row in released]},
+    )
+    
+    return len(released)
+
+
+async def run_job(
+    pool: asyncpg.Pool,
+    job: dict[str, Any],
+    worker_id: str,
+    on_success: Callable[[str], None] | None = None,
+    timeout: float | None = None,
+    backoff_cap: float | None = None,
+) -> None:
+    """
+    Run a claimed job's handler and record the outcome.
+    
+    Handler errors are recorded on the job (retry or dead letter) and not
+    raised. A handler still running after `timeout` seconds is cancelled and
+    the attempt recorded as a failure with error class "timeout". A
+    `NonRetryableError` dead-letters the job at once.
     
+    Args:
+        pool: Database connection pool
+        job: Job record from `claim_next_job` or `claim_jobs`
+        worker_id: Worker identifier
+        on_success: Called with the job ID instead of marking the job
+            succeeded, for callers that batch completions
+        timeout: Seconds the handler may run; None for no limit
+        backoff_cap: Longest retry delay for the job's type; None for the default
+    """
     job_id = job["id"]
     job_type = job["type"]
     payload = job["payload"]
@@ -200,26 +655,42 @@ async def process_job(pool: asyncpg.Pool, worker_id: str) -> bool:
     if isinstance(payload, str):
         payload = json.loads(payload)
     
+    queue_wait_ms = job.get("queue_wait_ms")
+    if queue_wait_ms is not None:
+        metrics.queue_wait_ms.labels(job["org_id"]).observe(queue_wait_ms)
+    
     logger.info(
         "job_processing_started",
         extra={
             "job_id": job_id,
             "job_type": job_type,
+            "org_id": job["org_id"],
+            "priority": job.get("priority"),
             "attempts": attempts,
+            "queue_wait_ms": queue_wait_ms,
             "worker_id": worker_id,
         },
     )
     
+    started = time.monotonic()
+    deadline = asyncio.timeout(timeout)
     try:
         # Dispatch to appropriate handler
         handler = JOB_HANDLERS.get(job_type)
         if not handler:
             raise ValueError(f"Unknown job type: {job_type}")
         
-        await handler(pool, job_id, payload)
+        async with deadline:
+            await handler(pool, job_id, payload)
+        metrics.run_duration_ms.labels(job_type).observe((time.monotonic() - started) * 1000)
         
         # Mark as succeeded
-        await mark_job_succeeded(pool, job_id)
+        if on_success is not None:
+            on_success(job_id)
+        else:
+            await mark_job_succeeded(pool, job_id, worker_id)
+        
+        metrics.job_outcomes.inc(job_type, "succeeded")
         
         logger.info(
             "job_processing_succeeded",
@@ -227,7 +698,19 @@ async def process_job(pool: asyncpg.Pool, worker_id: str) -> bool:
         )
         
     except Exception as e:
-        error_msg = f"{type(e).__name__}: {str(e)}"
+        metrics.run_duration_ms.labels(job_type).observe((time.monotonic() - started) * 1000)
+        # Only our own deadline counts as a timeout, not a TimeoutError the
+        # handler let escape
+        if deadline.expired():
+            error_class = "timeout"
+            error_msg = f"Timed out after {timeout:g}s"
+            metrics.job_timeouts.inc(job_type)
+        elif isinstance(e, NonRetryableError):
+            error_class = "non_retryable"
+            error_msg = f"{type(e).__name__}: {str(e)}"
+        else:
+            error_class = "error"
+            error_msg = f"{type(e).__name__}: {str(e)}"
         
         logger.error(
             "job_processing_failed",
@@ -235,13 +718,49 @@ async def process_job(pool: asyncpg.Pool, worker_id: str) -> bool:
                 "job_id": job_id,
                 "job_type": job_type,
                 "error": error_msg,
+                "error_class": error_class,
                 "attempts": attempts,
                 "worker_id": worker_id,
             },
-            exc_info=True,
+            exc_info=error_class != "timeout",
         )
         
         # Mark as failed or requeue
-        await mark_job_failed(pool, job_id, error_msg, attempts, max_attempts)
+        requeued = await mark_job_failed(
+            pool,
+            job_id,
+            worker_id,
+            error_msg,
+            attempts,
+            max_attempts,
+            error_class,
+            retryable=error_class != "non_retryable",
+            backoff_cap_seconds=backoff_cap,
+        )
+        if requeued is not None:
+            metrics.job_outcomes.inc(job_type, "retried" if requeued else "dead_lettered")
+
+
+async def process_job(pool: asyncpg.Pool, worker_id: str) -> bool:
+    """
+    Process a single job from the queue.
+    
+    Returns True if a job was processed, False if no jobs available.
+    
+    Args:
+        pool: Database connection pool
+        worker_id: Worker identifier
+    
+    Returns:
+        True if job was processed, False if no jobs available
+    """
+    job = await claim_next_job(pool, worker_id)
+    
+    if not job:
+        job_wakeup.queue_empty()
+        return False
+    
+    job_wakeup.job_claimed()
+    await run_job(pool, job, worker_id)
     
     return True
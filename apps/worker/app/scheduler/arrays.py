@@ -0,0 +1,283 @@
+"""Columnar view of a schedule input.
+
+The scheduler hot paths (model build, heuristic, decomposition) work on minute
+offsets, durations, priorities and resource eligibility rather than on the
+tz-aware datetimes held by `Task` and `WorkOrder`. `ScheduleArrays` converts
+those once per input into NumPy columns aligned with `ScheduleInput.tasks`, so
+per-task lookups inside nested loops are array reads instead of datetime
+arithmetic.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.scheduler.models import ScheduleInput
+
+# Due minute for tasks without a due date (never late)
+NO_DEADLINE = np.iinfo(np.int32).max
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceTables:
+    """Technician/bay lookup tables, the static part of an org's model."""
+
+    tech_index: dict[str, int]
+    bay_index: dict[str, int]
+    techs_by_skill: dict[str, tuple[int, ...]]
+    bays_by_type: dict[str, tuple[int, ...]]
+
+
+def build_resource_tables(input_data: ScheduleInput) -> ResourceTables:
+    """
+    Build the technician and bay lookup tables of a schedule input.
+
+    Use `ScheduleInput.resource_tables`, which builds them once per input.
+    """
+    techs_by_skill: dict[str, list[int]] = {}
+    for index, tech in enumerate(input_data.technicians):
+        for skill in tech.skills:
+            techs_by_skill.setdefault(skill, []).append(index)
+
+    bays_by_type: dict[str, list[int]] = {}
+    for index, bay in enumerate(input_data.bays):
+        bays_by_type.setdefault(bay.bay_type, []).append(index)
+
+    return ResourceTables(
+        tech_index={t.id: i for i, t in enumerate(input_data.technicians)},
+        bay_index={b.id: i for i, b in enumerate(input_data.bays)},
+        techs_by_skill={k: tuple(v) for k, v in techs_by_skill.items()},
+        bays_by_type={k: tuple(v) for k, v in bays_by_type.items()},
+    )
+
+
+def _naive(value: date | datetime) -> datetime:
+    # Same normalization as `datetime_to_minutes`: dates become midnight, tzinfo is dropped
+    if not isinstance(value, datetime):
+        return datetime.combine(value, datetime.min.time())
+    return value.replace(tzinfo=None)
+
+
+def minute_offsets(
+    values: list[date | datetime | None],
+    base: datetime,
+    default: int,
+) -> np.ndarray:
+    """
+    Convert datetimes to whole minutes from base in a single pass.
+
+    Args:
+        values: Datetimes or dates; None entries get `default`
+        base: Reference datetime (minute 0)
+        default: Value for missing entries
+
+    Returns:
+        int64 array of minute offsets, truncated toward zero like `datetime_to_minutes`
+    """
+    base_naive = _naive(base)
+    # asyncpg returns timestamptz values in UTC; those skip the tz normalization
+    base_timestamp = base.timestamp() if base.tzinfo is timezone.utc else None
+
+    minutes = [
+        default if value is None
+        else int((value.timestamp() - base_timestamp) / 60)
+        if base_timestamp is not None and getattr(value, "tzinfo", None) is timezone.utc
+        else int((_naive(value) - base_naive).total_seconds() / 60)
+        for value in values
+    ]
+    return np.array(minutes, dtype=np.int64)
+
+
+def _bitset_rows(index_sets: list[Any], size: int) -> np.ndarray:
+    """Packed bitset rows (uint8, big-endian bit order) with the given bits set."""
+    bits = np.zeros((len(index_sets), size), dtype=bool)
+    for row, indices in enumerate(index_sets):
+        bits[row, list(indices)] = True
+    return np.packbits(bits, axis=1)
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduleArrays:
+    """
+    Per-task columns aligned with `ScheduleInput.tasks`.
+
+    Resource eligibility is stored as packed bitsets (one row per task, one bit
+    per technician/bay in input order); use the `*_indices` helpers to unpack.
+    """
+
+    horizon_minutes: int
+    tech_count: int
+    bay_count: int
+
+    is_locked: np.ndarray  # bool
+    duration: np.ndarray  # int32, planned (average of low/high)
+    duration_low: np.ndarray  # int32
+    duration_high: np.ndarray  # int32
+    earliest: np.ndarray  # int32, earliest start clamped to the horizon start
+    latest: np.ndarray  # int32, latest finish clamped to the horizon end
+    priority: np.ndarray  # int8, 0 without a work order
+    has_work_order: np.ndarray  # bool
+    due: np.ndarray  # int32, NO_DEADLINE without a due date
+    parts_ready: np.ndarray  # bool, True without a work order
+
+    soft_skill: np.ndarray  # bool, required skill is soft
+    missing_hard_skill: np.ndarray  # bool, hard skill no technician has
+    missing_bay_type: np.ndarray  # bool, bay type no bay has
+    skilled_techs: np.ndarray  # uint8 bitset, techs with the required skill
+    eligible_techs: np.ndarray  # uint8 bitset
+    eligible_bays: np.ndarray  # uint8 bitset
+
+    has_lock_times: np.ndarray  # bool, locked with both start and end set
+    lock_start: np.ndarray  # int32, 0 without lock times (may be negative)
+    lock_end: np.ndarray  # int32, 0 without lock times
+    lock_tech: np.ndarray  # int32 tech index, -1 when unlocked/unknown
+    lock_bay: np.ndarray  # int32 bay index, -1 when unlocked/unknown
+
+    def eligible_tech_indices(self, row: int) -> np.ndarray:
+        """Indices of technicians task `row` may be assigned to."""
+        return np.flatnonzero(np.unpackbits(self.eligible_techs[row], count=self.tech_count))
+
+    def eligible_bay_indices(self, row: int) -> np.ndarray:
+        """Indices of bays task `row` may be assigned to."""
+        return np.flatnonzero(np.unpackbits(self.eligible_bays[row], count=self.bay_count))
+
+    def skilled_tech_indices(self, row: int) -> np.ndarray:
+        """Indices of technicians with task `row`'s required skill."""
+        return np.flatnonzero(np.unpackbits(self.skilled_techs[row], count=self.tech_count))
+
+    def urgency_order(self) -> np.ndarray:
+        """
+        Rows of unlocked tasks, earliest due date first, then highest priority,
+        then earliest start. Ties keep input order.
+        """
+        rows = np.flatnonzero(~self.is_locked)
+        due = np.where(
+            self.due[rows] == NO_DEADLINE,
+            self.horizon_minutes * 2,
+            self.due[rows],
+        ).astype(np.int64)
+        priority = np.where(self.has_work_order[rows], self.priority[rows], 1)
+        order = np.lexsort((self.earliest[rows], -priority, due))
+        return rows[order]
+
+
+def build_schedule_arrays(input_data: ScheduleInput) -> ScheduleArrays:
+    """
+    Build the columnar view of a schedule input.
+
+    Args:
+        input_data: Schedule input data
+
+    Returns:
+        ScheduleArrays aligned with `input_data.tasks`
+    """
+    tasks = input_data.tasks
+    base = input_data.horizon_start
+    horizon_minutes = int(minute_offsets([input_data.horizon_end], base, 0)[0])
+    tables = input_data.resource_tables
+    tech_count = len(input_data.technicians)
+    bay_count = len(input_data.bays)
+
+    work_orders = [input_data.work_orders.get(t.work_order_id) for t in tasks]
+    has_work_order = np.array([wo is not None for wo in work_orders], dtype=bool)
+
+    due = minute_offsets(
+        [wo.due_date if wo else None for wo in work_orders], base, NO_DEADLINE
+    )
+
+    # Eligibility: one packed bitset per distinct skill / bay type, gathered per
+    # task. Code 0 means no requirement; the last code is a skill or bay type
+    # no resource has.
+    skill_sets = [(), *tables.techs_by_skill.values(), ()]
+    skill_codes = {skill: code for code, skill in enumerate(tables.techs_by_skill, 1)}
+    bay_sets = [range(bay_count), *tables.bays_by_type.values(), ()]
+    bay_codes = {bay_type: code for code, bay_type in enumerate(tables.bays_by_type, 1)}
+
+    task_skill = np.array(
+        [
+            skill_codes.get(t.required_skill, len(skill_sets) - 1) if t.required_skill else 0
+            for t in tasks
+        ],
+        dtype=np.int32,
+    )
+    task_bay_type = np.array(
+        [
+            bay_codes.get(t.required_bay_type, len(bay_sets) - 1) if t.required_bay_type else 0
+            for t in tasks
+        ],
+        dtype=np.int32,
+    )
+    skill_bits = _bitset_rows(skill_sets, tech_count)
+    bay_bits = _bitset_rows(bay_sets, bay_count)
+    all_techs = _bitset_rows([range(tech_count)], tech_count)[0]
+
+    has_skill = task_skill > 0
+    hard_skill = has_skill & np.array([t.required_skill_is_hard for t in tasks], dtype=bool)
+    skill_exists = np.array([len(techs) > 0 for techs in skill_sets], dtype=bool)
+    bay_type_exists = np.array([len(bays) > 0 for bays in bay_sets], dtype=bool)
+    missing_hard_skill = hard_skill & ~skill_exists[task_skill]
+    missing_bay_type = ~bay_type_exists[task_bay_type]
+
+    # Requirements nobody can meet fall back to every resource, like the model
+    skilled = skill_bits[task_skill]
+    eligible_techs = np.where((hard_skill & ~missing_hard_skill)[:, None], skilled, all_techs)
+    eligible_bays = np.where(
+        missing_bay_type[:, None],
+        _bitset_rows([range(bay_count)], bay_count)[0],
+        bay_bits[task_bay_type],
+    )
+
+    is_locked = np.array([t.is_locked for t in tasks], dtype=bool)
+    has_lock_times = is_locked & np.array(
+        [t.locked_start_at is not None and t.locked_end_at is not None for t in tasks],
+        dtype=bool,
+    )
+    lock_tech = np.array(
+        [tables.tech_index.get(t.locked_tech_id, -1) if t.is_locked else -1 for t in tasks],
+        dtype=np.int32,
+    )
+    lock_bay = np.array(
+        [tables.bay_index.get(t.locked_bay_id, -1) if t.is_locked else -1 for t in tasks],
+        dtype=np.int32,
+    )
+
+    return ScheduleArrays(
+        horizon_minutes=horizon_minutes,
+        tech_count=tech_count,
+        bay_count=bay_count,
+        is_locked=is_locked,
+        duration=np.array([t.duration_minutes for t in tasks], dtype=np.int32),
+        duration_low=np.array([t.duration_minutes_low for t in tasks], dtype=np.int32),
+        duration_high=np.array([t.duration_minutes_high for t in tasks], dtype=np.int32),
+        earliest=np.maximum(
+            0, minute_offsets([t.earliest_start for t in tasks], base, 0)
+        ).astype(np.int32),
+        latest=np.minimum(
+            horizon_minutes,
+            minute_offsets([t.latest_finish for t in tasks], base, horizon_minutes),
+        ).astype(np.int32),
+        priority=np.array([wo.priority if wo else 0 for wo in work_orders], dtype=np.int8),
+        has_work_order=has_work_order,
+        due=np.minimum(due, NO_DEADLINE).astype(np.int32),
+        parts_ready=np.array([wo.parts_ready if wo else True for wo in work_orders], dtype=bool),
+        soft_skill=has_skill & ~hard_skill,
+        missing_hard_skill=missing_hard_skill,
+        missing_bay_type=missing_bay_type,
+        skilled_techs=skilled,
+        eligible_techs=eligible_techs,
+        eligible_bays=eligible_bays,
+        has_lock_times=has_lock_times,
+        lock_start=minute_offsets(
+            [t.locked_start_at if t.is_locked else None for t in tasks], base, 0
+        ).astype(np.int32),
+        lock_end=minute_offsets(
+            [t.locked_end_at if t.is_locked else None for t in tasks], base, 0
+        ).astype(np.int32),
+        lock_tech=lock_tech,
+        lock_bay=lock_bay,
+    )
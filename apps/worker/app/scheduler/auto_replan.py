@@ -0,0 +1,206 @@
+"""Debounced automatic re-planning.
+
+Triggers on tasks and work orders record schedule-relevant changes in
+`schedule_change_events` (migration 0019). Once an org has been quiet for
+its quiet period (or its oldest change has waited `auto_replan_max_delay_seconds`)
+and has no schedule run queued or running, one run is enqueued for all of
+its changes and the events it covers are deleted. A burst of edits therefore
+costs one run, not one per click.
+
+The run is partial (only the changed tasks are re-planned, the rest of the
+live schedule is pinned) when every change is local and few tasks changed;
+a priority raise or a large batch re-plans in full.
+
+Off by default: orgs opt in with `organizations.auto_replan_quiet_seconds`,
+or all orgs without their own setting through `auto_replan_quiet_seconds`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from app.core.config import settings
+from app.job_wakeup import NOTIFY_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Run trigger for a batch of changes: the most urgent one wins
+_TRIGGER_RANK = ("auto_hot_job", "auto_callout", "auto_parts", "auto_edit")
+
+# Orgs enqueued per check; the rest wait for the next one
+_BATCH_ORGS = 100
+
+# Matches JOB_PRIORITY_NORMAL in apps/api/app/services/job_queue_service.py
+_JOB_PRIORITY = 50
+
+
+async def _enqueue_org(conn: asyncpg.Connection, org_id: str, last_event_id: int) -> str:
+    """Enqueue one re-plan for the org's events up to `last_event_id` and delete them."""
+    events = await conn.fetchrow(
+        """
+        select array_agg(distinct trigger) as triggers, bool_and(local) as local
+        from public.schedule_change_events
+        where org_id = $1::uuid and id <= $2
+        """,
+        org_id,
+        last_event_id,
+    )
+    # Work order changes affect all of its open tasks
+    changed_task_ids = await conn.fetchval(
+        """
+        select coalesce(array_agg(distinct task_id::text), '{}')
+        from (
+          select e.task_id
+          from public.schedule_change_events e
+          where e.org_id = $1::uuid and e.id <= $2 and e.task_id is not null
+          union
+          select t.id
+          from public.schedule_change_events e
+          join public.tasks t on t.work_order_id = e.work_order_id
+          where e.org_id = $1::uuid and e.id <= $2 and e.task_id is null
+            and t.status in ('todo', 'scheduled')
+        ) changed
+        """,
+        org_id,
+        last_event_id,
+    )
+    trigger = next(t for t in _TRIGGER_RANK if t in events["triggers"])
+    partial = events["local"] and len(changed_task_ids) <= settings.auto_replan_partial_max_tasks
+
+    # Same horizon as the live schedule, from now
+    now = datetime.now(timezone.utc)
+    horizon_end = await conn.fetchval(
+        """
+        select horizon_end
+        from public.schedule_runs
+        where org_id = $1::uuid and publish_seq is not null
+        order by publish_seq desc
+        limit 1
+        """,
+        org_id,
+    )
+    if horizon_end is None or horizon_end <= now:
+        horizon_end = now + timedelta(days=settings.auto_replan_horizon_days)
+
+    schedule_run_id = await conn.fetchval(
+        """
+        insert into public.schedule_runs (org_id, horizon_start, horizon_end, status, trigger)
+        values ($1::uuid, $2, $3, 'queued', $4)
+        returning id::text
+        """,
+        org_id,
+        now,
+        horizon_end,
+        trigger,
+    )
+    payload = {
+        "schedule_run_id": schedule_run_id,
+        "org_id": org_id,
+        "horizon_start": now.isoformat(),
+        "horizon_end": horizon_end.isoformat(),
+        "time_limit_seconds": 30,
+        "mode": "partial" if partial else "full",
+    }
+    if partial:
+        payload["changed_task_ids"] = changed_task_ids
+    await conn.execute(
+        """
+        insert into public.job_queue (org_id, type, payload, status, max_attempts, priority)
+        values ($1::uuid, 'schedule_run', $2::jsonb, 'queued', 1, $3)
+        """,
+        org_id,
+        json.dumps(payload),
+        _JOB_PRIORITY,
+    )
+    await conn.execute(
+        """
+        delete from public.schedule_change_events
+        where org_id = $1::uuid and id <= $2
+        """,
+        org_id,
+        last_event_id,
+    )
+
+    logger.info(
+        "auto_replan_enqueued",
+        extra={
+            "org_id": org_id,
+            "schedule_run_id": schedule_run_id,
+            "trigger": trigger,
+            "mode": payload["mode"],
+            "changed_tasks": len(changed_task_ids),
+        },
+    )
+    return schedule_run_id
+
+
+async def enqueue_auto_replans(pool: asyncpg.Pool) -> int:
+    """
+    Enqueue a schedule run for every org whose changes have settled.
+
+    Safe to call from every worker: a transaction-level advisory lock lets
+    only one of them enqueue at a time. Orgs with a schedule run queued or
+    running keep their events until it finishes, so changes made while it
+    solves get a run of their own.
+
+    Args:
+        pool: Database connection pool
+
+    Returns:
+        Number of runs enqueued
+    """
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            locked = await conn.fetchval(
+                "select pg_try_advisory_xact_lock(hashtextextended('enqueue_auto_replan', 0))"
+            )
+            if not locked:
+                return 0
+
+            # Orgs with re-planning turned off collect no backlog
+            await conn.execute(
+                """
+                delete from public.schedule_change_events e
+                using public.organizations o
+                where o.id = e.org_id
+                  and coalesce(o.auto_replan_quiet_seconds, $1) = 0
+                """,
+                settings.auto_replan_quiet_seconds,
+            )
+            due = await conn.fetch(
+                """
+                select e.org_id::text as org_id, max(e.id) as last_event_id
+                from public.schedule_change_events e
+                join public.organizations o on o.id = e.org_id
+                where not exists (
+                  select 1
+                  from public.job_queue j
+                  where j.org_id = e.org_id
+                    and j.type = 'schedule_run'
+                    and j.status in ('queued', 'running')
+                )
+                group by e.org_id, o.auto_replan_quiet_seconds
+                having max(e.created_at)
+                    <= now() - make_interval(secs => coalesce(o.auto_replan_quiet_seconds, $1))
+                  or min(e.created_at) <= now() - make_interval(secs => $2)
+                order by min(e.created_at)
+                limit $3
+                """,
+                settings.auto_replan_quiet_seconds,
+                settings.auto_replan_max_delay_seconds,
+                _BATCH_ORGS,
+            )
+            for row in due:
+                await _enqueue_org(conn, row["org_id"], row["last_event_id"])
+            if due:
+                await conn.execute(
+                    "select pg_notify($1, $2)",
+                    NOTIFY_CHANNEL,
+                    json.dumps({"type": "schedule_run"}),
+                )
+
+    return len(due)
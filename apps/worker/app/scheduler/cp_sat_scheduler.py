@@ -3,18 +3,23 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
-from typing import Any
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
 
+import numpy as np
+from ortools.sat import cp_model_pb2
 from ortools.sat.python import cp_model
 
+from app.scheduler.arrays import NO_DEADLINE
 from app.scheduler.models import (
     ObjectiveBreakdown,
     ScheduleInput,
     ScheduleItem,
     ScheduleResult,
-    Task,
 )
+from app.scheduler.profiles import SolverProfile
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +27,6 @@ logger = logging.getLogger(__name__)
 def datetime_to_minutes(dt: datetime | Any, base: datetime | Any) -> int:
     """Convert datetime to minutes from base."""
     # Handle datetime.date objects by converting to datetime
-    from datetime import date
     if isinstance(dt, date) and not isinstance(dt, datetime):
         dt = datetime.combine(dt, datetime.min.time())
     if isinstance(base, date) and not isinstance(base, datetime):
@@ -42,392 +46,417 @@ def minutes_to_datetime(minutes: int, base: datetime) -> datetime:
     return base + timedelta(minutes=minutes)
 
 
+# Objective weight of each penalty component. Due date and priority penalties
+# count twice, matching the original model, which added them to the objective
+# both directly and through its penalty variables.
+OBJECTIVE_WEIGHTS = {
+    "due_date": 2,
+    "priority": 2,
+    "skill_mismatch": 1,
+    "parts_not_ready": 1,
+}
+
+# Build time budget; a 2,000-task model should build in under 200 ms.
+BUILD_MS_PER_TASK_TARGET = 0.1
+
+# Template for presence literals, copied in bulk
+_BOOL_VAR = cp_model_pb2.IntegerVariableProto(domain=(0, 1))
+
+
 class SchedulerModel:
-    """CP-SAT scheduler model."""
+    """
+    CP-SAT scheduler model.
+    
+    Variables and constraints are written straight into the underlying
+    CpModelProto rather than through one `cp_model` wrapper call each, and are
+    only named in debug mode. Each unlocked task gets a start variable whose
+    domain carries its time window, and one presence literal per eligible
+    technician and per eligible bay; hard skill and bay type requirements
+    prune those candidates instead of being posted as table constraints.
+    """
     
-    def __init__(self, input_data: ScheduleInput):
-        """Initialize scheduler model."""
+    def __init__(self, input_data: ScheduleInput, *, debug_names: bool | None = None):
+        """
+        Initialize scheduler model.
+        
+        Args:
+            input_data: Schedule input data
+            debug_names: Name variables after their tasks; defaults to whether
+                debug logging is enabled
+        """
         self.input = input_data
         self.model = cp_model.CpModel()
+        self.proto = self.model.Proto()
+        if debug_names is None:
+            debug_names = logger.isEnabledFor(logging.DEBUG)
+        self.debug_names = debug_names
         
-        # Time horizon in minutes
-        self.horizon_minutes = datetime_to_minutes(
-            input_data.horizon_end,
-            input_data.horizon_start,
-        )
-        
-        # Decision variables: task intervals
-        self.task_intervals: dict[str, Any] = {}  # task_id -> interval_var
-        self.task_starts: dict[str, Any] = {}     # task_id -> start_var
-        self.task_ends: dict[str, Any] = {}       # task_id -> end_var
+        # Columnar task data; rows index input_data.tasks
+        self.arrays = input_data.arrays
+        self.horizon_minutes = self.arrays.horizon_minutes
+        self.unlocked_rows = np.flatnonzero(~self.arrays.is_locked)
+        self.locked_rows = np.flatnonzero(self.arrays.is_locked)
         
-        # Assignment variables
-        self.task_tech_assignments: dict[str, Any] = {}  # task_id -> tech_id_var
-        self.task_bay_assignments: dict[str, Any] = {}   # task_id -> bay_id_var
+        self.unlocked_tasks = [input_data.tasks[row] for row in self.unlocked_rows]
+        self.locked_tasks = [input_data.tasks[row] for row in self.locked_rows]
+        self.task_index = {t.id: i for i, t in enumerate(self.unlocked_tasks)}
         
         # Tech/bay ID mappings
-        self.tech_id_to_index = {t.id: i for i, t in enumerate(input_data.technicians)}
-        self.bay_id_to_index = {b.id: i for i, b in enumerate(input_data.bays)}
+        tables = input_data.resource_tables
+        self.tech_id_to_index = tables.tech_index
+        self.bay_id_to_index = tables.bay_index
+        
+        # Proto variable indices, aligned with self.unlocked_tasks
+        self.start_vars: list[int] = []
+        self.start_bounds: list[tuple[int, int]] = []
+        self.tech_literals: list[list[tuple[int, int]]] = []  # [(tech_index, literal)]
+        self.bay_literals: list[list[tuple[int, int]]] = []   # [(bay_index, literal)]
         
-        # Penalty tracking for objective breakdown
-        self.penalty_vars: dict[str, Any] = {}
+        # Interval constraint indices per resource, for no-overlap
+        self.tech_intervals: list[list[int]] = [[] for _ in input_data.technicians]
+        self.bay_intervals: list[list[int]] = [[] for _ in input_data.bays]
         
+        # Penalty tracking for objective breakdown: component -> [(var, coeff)] and constant
+        self.penalty_terms: dict[str, list[tuple[int, int]]] = {k: [] for k in OBJECTIVE_WEIGHTS}
+        self.penalty_constants: dict[str, int] = {k: 0 for k in OBJECTIVE_WEIGHTS}
+        
+        self.build_ms: int | None = None
+    
+    def _new_var(self, lower: int, upper: int, name: str) -> int:
+        """Append an integer variable to the proto and return its index."""
+        index = len(self.proto.variables)
+        var = self.proto.variables.add()
+        var.domain.extend((lower, upper))
+        if self.debug_names:
+            var.name = name
+        return index
+    
+    def _new_bools(self, count: int, name: Callable[[int], str]) -> range:
+        """Append `count` 0/1 variables in one call and return their indices."""
+        first = len(self.proto.variables)
+        self.proto.variables.extend([_BOOL_VAR] * count)
+        if self.debug_names:
+            for offset in range(count):
+                self.proto.variables[first + offset].name = name(offset)
+        return range(first, first + count)
+    
+    def _new_optional_intervals(self, template: Any, literals: range) -> range:
+        """Append one copy of an interval template per enforcement literal."""
+        constraints = self.proto.constraints
+        first = len(constraints)
+        constraints.extend([template] * len(literals))
+        for offset, literal in enumerate(literals):
+            constraints[first + offset].enforcement_literal.append(literal)
+        return range(first, first + len(literals))
+    
     def build(self) -> None:
         """Build the complete CP-SAT model."""
-        logger.info("building_cp_sat_model")
+        logger.info("building_cp_sat_model", extra={"task_count": len(self.unlocked_tasks)})
+        started = time.perf_counter()
         
         self._create_task_variables()
-        self._add_locked_task_constraints()
-        self._add_tech_no_overlap_constraints()
-        self._add_bay_no_overlap_constraints()
-        self._add_skill_constraints()
-        self._add_bay_type_constraints()
-        self._add_time_window_constraints()
-        self._add_parts_constraints()
+        self._create_assignment_literals()
+        self._add_no_overlap_constraints()
+        self._add_skill_penalties()
+        self._add_due_date_penalties()
+        self._add_priority_penalties()
+        self._add_parts_penalties()
         self._create_objective()
         
-        logger.info("cp_sat_model_built")
+        self.build_ms = int((time.perf_counter() - started) * 1000)
+        
+        logger.info(
+            "cp_sat_model_built",
+            extra={
+                "build_ms": self.build_ms,
+                "variables": len(self.proto.variables),
+                "constraints": len(self.proto.constraints),
+            },
+        )
+        
+        target_ms = max(50, len(self.unlocked_tasks) * BUILD_MS_PER_TASK_TARGET)
+        if self.build_ms > target_ms:
+            logger.warning(
+                "cp_sat_model_build_slow",
+                extra={"build_ms": self.build_ms, "target_ms": target_ms},
+            )
     
     def _create_task_variables(self) -> None:
-        """Create decision variables for all tasks."""
-        for task in self.input.get_unlocked_tasks():
-            # Task duration
-            duration = task.duration_minutes
+        """Create start variables, folding time windows into their domains."""
+        rows = self.unlocked_rows
+        durations = self.arrays.duration[rows]
+        lowers = self.arrays.earliest[rows]
+        uppers = self.arrays.latest[rows] - durations
+        
+        for task, lower, upper, duration in zip(
+            self.unlocked_tasks, lowers.tolist(), uppers.tolist(), durations.tolist()
+        ):
+            if lower > upper:
+                # Task cannot fit its window: keep a valid domain but make the model infeasible
+                logger.warning("task_window_too_small", extra={"task_id": task.id})
+                self.proto.constraints.add().bool_or.SetInParent()
+                lower, upper = 0, max(0, self.horizon_minutes - duration)
             
-            # Create interval variable
-            start_var = self.model.NewIntVar(0, self.horizon_minutes, f"start_{task.id}")
-            end_var = self.model.NewIntVar(0, self.horizon_minutes, f"end_{task.id}")
-            interval_var = self.model.NewIntervalVar(
-                start_var,
-                duration,
-                end_var,
-                f"interval_{task.id}",
-            )
-            
-            self.task_starts[task.id] = start_var
-            self.task_ends[task.id] = end_var
-            self.task_intervals[task.id] = interval_var
-            
-            # Assignment variables
-            tech_var = self.model.NewIntVar(
-                0,
-                len(self.input.technicians) - 1,
-                f"tech_{task.id}",
-            )
-            bay_var = self.model.NewIntVar(
-                0,
-                len(self.input.bays) - 1,
-                f"bay_{task.id}",
-            )
-            
-            self.task_tech_assignments[task.id] = tech_var
-            self.task_bay_assignments[task.id] = bay_var
-    
-    def _add_locked_task_constraints(self) -> None:
-        """Handle locked tasks - they are fixed and block resources."""
-        locked_tasks = self.input.get_locked_tasks()
-        
-        if not locked_tasks:
-            return
-        
-        logger.info("adding_locked_task_constraints", extra={"count": len(locked_tasks)})
-        
-        for task in locked_tasks:
-            # Locked tasks are not scheduled by solver, but we need to
-            # prevent other tasks from overlapping with them
-            # We'll handle this in no-overlap constraints
-            pass
+            self.start_vars.append(self._new_var(lower, upper, f"start_{task.id}"))
+            self.start_bounds.append((lower, upper))
     
-    def _add_tech_no_overlap_constraints(self) -> None:
-        """Add no-overlap constraints for technicians."""
-        logger.info("adding_tech_no_overlap_constraints")
+    def _create_assignment_literals(self) -> None:
+        """Create presence literals and optional intervals for eligible techs/bays."""
+        arrays = self.arrays
         
-        for tech in self.input.technicians:
-            tech_index = self.tech_id_to_index[tech.id]
-            
-            # Collect intervals for this tech
-            intervals = []
-            
-            # Locked tasks assigned to this tech
-            for task in self.input.get_locked_tasks():
-                if task.locked_tech_id == tech.id:
-                    # Create fixed interval for locked task
-                    start_min = datetime_to_minutes(
-                        task.locked_start_at,
-                        self.input.horizon_start,
-                    )
-                    end_min = datetime_to_minutes(
-                        task.locked_end_at,
-                        self.input.horizon_start,
-                    )
-                    duration = end_min - start_min
-                    
-                    locked_interval = self.model.NewFixedSizeIntervalVar(
-                        start_min,
-                        duration,
-                        f"locked_{task.id}",
-                    )
-                    intervals.append(locked_interval)
-            
-            # Unlocked tasks that could be assigned to this tech
-            for task in self.input.get_unlocked_tasks():
-                # Only add to this tech's no-overlap if actually assigned
-                tech_var = self.task_tech_assignments[task.id]
-                interval_var = self.task_intervals[task.id]
-                
-                # Create optional interval that's only active when assigned to this tech
-                is_assigned = self.model.NewBoolVar(f"tech_{tech.id}_has_{task.id}")
-                self.model.Add(tech_var == tech_index).OnlyEnforceIf(is_assigned)
-                self.model.Add(tech_var != tech_index).OnlyEnforceIf(is_assigned.Not())
-                
-                optional_interval = self.model.NewOptionalIntervalVar(
-                    self.task_starts[task.id],
-                    task.duration_minutes,
-                    self.task_ends[task.id],
-                    is_assigned,
-                    f"tech_{tech.id}_interval_{task.id}",
+        for i, (task, row) in enumerate(zip(self.unlocked_tasks, self.unlocked_rows.tolist())):
+            # Requirements no resource meets are left unconstrained
+            if arrays.missing_hard_skill[row]:
+                logger.warning(
+                    "no_tech_with_required_skill",
+                    extra={"task_id": task.id, "skill": task.required_skill},
+                )
+            if arrays.missing_bay_type[row] and task.required_bay_type:
+                logger.warning(
+                    "no_bay_with_required_type",
+                    extra={"task_id": task.id, "bay_type": task.required_bay_type},
                 )
-                intervals.append(optional_interval)
+            techs = arrays.eligible_tech_indices(row).tolist()
+            bays = arrays.eligible_bay_indices(row).tolist()
             
-            # Add no-overlap constraint
-            if intervals:
-                self.model.AddNoOverlap(intervals)
-    
-    def _add_bay_no_overlap_constraints(self) -> None:
-        """Add no-overlap constraints for bays."""
-        logger.info("adding_bay_no_overlap_constraints")
-        
-        for bay in self.input.bays:
-            bay_index = self.bay_id_to_index[bay.id]
+            # Optional fixed-size interval shared by every candidate resource
+            start_var = self.start_vars[i]
+            duration = task.duration_minutes
+            template = cp_model_pb2.ConstraintProto()
+            template.interval.start.vars.append(start_var)
+            template.interval.start.coeffs.append(1)
+            template.interval.end.vars.append(start_var)
+            template.interval.end.coeffs.append(1)
+            template.interval.end.offset = duration
+            template.interval.size.offset = duration
             
-            # Collect intervals for this bay
-            intervals = []
+            tech_vars = self._new_bools(len(techs), lambda k: f"tech_{techs[k]}_has_{task.id}")
+            for tech_index, interval in zip(techs, self._new_optional_intervals(template, tech_vars)):
+                self.tech_intervals[tech_index].append(interval)
+            tech_literals = list(zip(techs, tech_vars))
             
-            # Locked tasks assigned to this bay
-            for task in self.input.get_locked_tasks():
-                if task.locked_bay_id == bay.id:
-                    start_min = datetime_to_minutes(
-                        task.locked_start_at,
-                        self.input.horizon_start,
-                    )
-                    end_min = datetime_to_minutes(
-                        task.locked_end_at,
-                        self.input.horizon_start,
-                    )
-                    duration = end_min - start_min
-                    
-                    locked_interval = self.model.NewFixedSizeIntervalVar(
-                        start_min,
-                        duration,
-                        f"locked_bay_{task.id}",
-                    )
-                    intervals.append(locked_interval)
+            bay_vars = self._new_bools(len(bays), lambda k: f"bay_{bays[k]}_has_{task.id}")
+            for bay_index, interval in zip(bays, self._new_optional_intervals(template, bay_vars)):
+                self.bay_intervals[bay_index].append(interval)
+            bay_literals = list(zip(bays, bay_vars))
             
-            # Unlocked tasks that could be assigned to this bay
-            for task in self.input.get_unlocked_tasks():
-                bay_var = self.task_bay_assignments[task.id]
-                
-                # Create optional interval
-                is_assigned = self.model.NewBoolVar(f"bay_{bay.id}_has_{task.id}")
-                self.model.Add(bay_var == bay_index).OnlyEnforceIf(is_assigned)
-                self.model.Add(bay_var != bay_index).OnlyEnforceIf(is_assigned.Not())
-                
-                optional_interval = self.model.NewOptionalIntervalVar(
-                    self.task_starts[task.id],
-                    task.duration_minutes,
-                    self.task_ends[task.id],
-                    is_assigned,
-                    f"bay_{bay.id}_interval_{task.id}",
-                )
-                intervals.append(optional_interval)
+            # Exactly one technician and one bay per task
+            constraints = self.proto.constraints
+            constraints.add().exactly_one.literals.extend(tech_vars)
+            constraints.add().exactly_one.literals.extend(bay_vars)
             
-            # Add no-overlap constraint
-            if intervals:
-                self.model.AddNoOverlap(intervals)
+            self.tech_literals.append(tech_literals)
+            self.bay_literals.append(bay_literals)
     
-    def _add_skill_constraints(self) -> None:
-        """Add skill matching constraints and penalties."""
-        logger.info("adding_skill_constraints")
-        
-        for task in self.input.get_unlocked_tasks():
-            if not task.required_skill:
+    def _add_no_overlap_constraints(self) -> None:
+        """Add tech/bay no-overlap constraints; locked tasks block their resources."""
+        if self.locked_tasks:
+            logger.info("adding_locked_task_constraints", extra={"count": len(self.locked_tasks)})
+        
+        constraints = self.proto.constraints
+        arrays = self.arrays
+        rows = self.locked_rows
+        
+        for has_times, start_min, end_min, tech_index, bay_index in zip(
+            arrays.has_lock_times[rows].tolist(),
+            arrays.lock_start[rows].tolist(),
+            arrays.lock_end[rows].tolist(),
+            arrays.lock_tech[rows].tolist(),
+            arrays.lock_bay[rows].tolist(),
+        ):
+            # Locks without times, or on unknown resources, block nothing
+            if not has_times:
+                continue
+            if tech_index < 0 and bay_index < 0:
                 continue
             
-            tech_var = self.task_tech_assignments[task.id]
-            
-            # Find techs with this skill
-            techs_with_skill = [
-                self.tech_id_to_index[tech.id]
-                for tech in self.input.technicians
-                if task.required_skill in tech.skills
-            ]
+            # Fixed interval, shared by the tech and bay no-overlap constraints
+            interval = len(constraints)
+            constraint = constraints.add()
+            constraint.interval.start.offset = start_min
+            constraint.interval.end.offset = end_min
+            constraint.interval.size.offset = end_min - start_min
             
-            if task.required_skill_is_hard:
-                # Hard constraint: must assign to tech with skill
-                if not techs_with_skill:
-                    # No tech has this skill - model will be infeasible
-                    logger.warning(
-                        "no_tech_with_required_skill",
-                        extra={"task_id": task.id, "skill": task.required_skill},
-                    )
-                else:
-                    self.model.AddAllowedAssignments(tech_var, [(t,) for t in techs_with_skill])
-            else:
-                # Soft constraint: add penalty if skill mismatch
-                has_skill = self.model.NewBoolVar(f"has_skill_{task.id}")
-                if techs_with_skill:
-                    self.model.AddAllowedAssignments(
-                        [tech_var],
-                        [(t,) for t in techs_with_skill],
-                    ).OnlyEnforceIf(has_skill)
-                else:
-                    # No one has skill, always mismatch
-                    self.model.Add(has_skill == 0)
-                
-                # Penalty for skill mismatch
-                penalty_var = self.model.NewIntVar(0, 100, f"skill_penalty_{task.id}")
-                self.model.Add(penalty_var == 50).OnlyEnforceIf(has_skill.Not())
-                self.model.Add(penalty_var == 0).OnlyEnforceIf(has_skill)
-                self.penalty_vars[f"skill_mismatch_{task.id}"] = penalty_var
-    
-    def _add_bay_type_constraints(self) -> None:
-        """Add bay type constraints."""
-        logger.info("adding_bay_type_constraints")
+            if tech_index >= 0:
+                self.tech_intervals[tech_index].append(interval)
+            if bay_index >= 0:
+                self.bay_intervals[bay_index].append(interval)
         
-        for task in self.input.get_unlocked_tasks():
-            if not task.required_bay_type:
-                continue
-            
-            bay_var = self.task_bay_assignments[task.id]
+        for intervals in self.tech_intervals + self.bay_intervals:
+            if intervals:
+                constraints.add().no_overlap.intervals.extend(intervals)
+    
+    def _add_skill_penalties(self) -> None:
+        """Penalize soft skill mismatches (50 unless a skilled tech is chosen)."""
+        arrays = self.arrays
+        soft = arrays.soft_skill[self.unlocked_rows]
+        
+        for i in np.flatnonzero(soft).tolist():
+            skilled = set(arrays.skilled_tech_indices(self.unlocked_rows[i]).tolist())
+            self.penalty_constants["skill_mismatch"] += 50
+            self.penalty_terms["skill_mismatch"].extend(
+                (literal, -50)
+                for tech_index, literal in self.tech_literals[i]
+                if tech_index in skilled
+            )
+    
+    def _add_due_date_penalties(self) -> None:
+        """Penalize finishing after the work order due date (priority * 100)."""
+        constraints = self.proto.constraints
+        rows = self.unlocked_rows
+        dues = self.arrays.due[rows]
+        weights = self.arrays.priority[rows].astype(np.int64) * 100
+        durations = self.arrays.duration[rows]
+        
+        for i in np.flatnonzero(dues != NO_DEADLINE).tolist():
+            due_minutes = int(dues[i])
+            weight = int(weights[i])
+            duration = int(durations[i])
+            lower, upper = self.start_bounds[i]
             
-            # Find bays with this type
-            bays_with_type = [
-                self.bay_id_to_index[bay.id]
-                for bay in self.input.bays
-                if bay.bay_type == task.required_bay_type
-            ]
+            if upper + duration <= due_minutes:
+                continue  # Can never be late
+            if lower + duration > due_minutes:
+                self.penalty_constants["due_date"] += weight  # Always late
+                continue
             
-            if not bays_with_type:
-                logger.warning(
-                    "no_bay_with_required_type",
-                    extra={"task_id": task.id, "bay_type": task.required_bay_type},
-                )
-            else:
-                # Hard constraint
-                self.model.AddAllowedAssignments(bay_var, [(b,) for b in bays_with_type])
+            # late = 0 forces start + duration <= due
+            is_late = self._new_var(0, 1, f"late_{self.unlocked_tasks[i].id}")
+            constraint = constraints.add()
+            constraint.enforcement_literal.append(-is_late - 1)
+            constraint.linear.vars.append(self.start_vars[i])
+            constraint.linear.coeffs.append(1)
+            constraint.linear.domain.extend((lower, due_minutes - duration))
+            self.penalty_terms["due_date"].append((is_late, weight))
     
-    def _add_time_window_constraints(self) -> None:
-        """Add time window constraints (earliest start, latest finish)."""
-        logger.info("adding_time_window_constraints")
-        
-        for task in self.input.get_unlocked_tasks():
-            # Earliest start
-            if task.earliest_start:
-                earliest_minutes = datetime_to_minutes(
-                    task.earliest_start,
-                    self.input.horizon_start,
-                )
-                if earliest_minutes > 0:
-                    self.model.Add(self.task_starts[task.id] >= earliest_minutes)
+    def _add_priority_penalties(self) -> None:
+        """Penalize late starts: start * (6 - priority) / 100, rounded down."""
+        constraints = self.proto.constraints
+        rows = self.unlocked_rows
+        # Invert priority (5->1, 1->5)
+        weights = 6 - self.arrays.priority[rows].astype(np.int64)
+        
+        for i in np.flatnonzero(self.arrays.has_work_order[rows]).tolist():
+            weight = int(weights[i])
+            lower, upper = self.start_bounds[i]
+            penalty = self._new_var(
+                (lower * weight) // 100,
+                (upper * weight) // 100,
+                f"priority_penalty_{self.unlocked_tasks[i].id}",
+            )
             
-            # Latest finish
-            if task.latest_finish:
-                latest_minutes = datetime_to_minutes(
-                    task.latest_finish,
-                    self.input.horizon_start,
-                )
-                if latest_minutes < self.horizon_minutes:
-                    self.model.Add(self.task_ends[task.id] <= latest_minutes)
+            # 0 <= start * weight - 100 * penalty <= 99, i.e. penalty = floor(start * weight / 100)
+            constraint = constraints.add()
+            constraint.linear.vars.extend((self.start_vars[i], penalty))
+            constraint.linear.coeffs.extend((weight, -100))
+            constraint.linear.domain.extend((0, 99))
+            self.penalty_terms["priority"].append((penalty, 1))
     
-    def _add_parts_constraints(self) -> None:
-        """Add parts readiness constraints (gate)."""
-        logger.info("adding_parts_constraints")
-        
-        for task in self.input.get_unlocked_tasks():
-            wo = self.input.work_orders.get(task.work_order_id)
-            if not wo:
-                continue
-            
-            if not wo.parts_ready:
-                # Add penalty for scheduling before parts ready
-                penalty_var = self.model.NewIntVar(0, 200, f"parts_penalty_{task.id}")
-                self.model.Add(penalty_var == 100)  # Fixed penalty
-                self.penalty_vars[f"parts_not_ready_{task.id}"] = penalty_var
+    def _add_parts_penalties(self) -> None:
+        """Fixed penalty (100) for tasks whose work order parts are not ready."""
+        not_ready = np.count_nonzero(~self.arrays.parts_ready[self.unlocked_rows])
+        self.penalty_constants["parts_not_ready"] += 100 * int(not_ready)
     
     def _create_objective(self) -> None:
-        """Create objective function to minimize penalties."""
-        logger.info("creating_objective")
+        """Create objective function to minimize weighted penalties."""
+        coefficients: dict[int, int] = {}
+        offset = 0
+        
+        for component, weight in OBJECTIVE_WEIGHTS.items():
+            offset += weight * self.penalty_constants[component]
+            for var, coeff in self.penalty_terms[component]:
+                coefficients[var] = coefficients.get(var, 0) + weight * coeff
+        
+        objective = self.proto.objective
+        objective.vars.extend(coefficients.keys())
+        objective.coeffs.extend(coefficients.values())
+        objective.offset = offset
+    
+    def add_solution_hint(self, items: list[ScheduleItem]) -> None:
+        """
+        Seed the search with an existing schedule (e.g. from the heuristic).
         
-        objective_terms = []
+        Args:
+            items: Schedule items; locked items and unknown tasks are ignored
+        """
+        hint = self.proto.solution_hint
+        horizon_start = self.input.horizon_start
         
-        # Due date penalties
-        for task in self.input.get_unlocked_tasks():
-            wo = self.input.work_orders.get(task.work_order_id)
-            if not wo or not wo.due_date:
+        for item in items:
+            i = self.task_index.get(item.task_id)
+            if item.is_locked or i is None:
                 continue
             
-            due_minutes = datetime_to_minutes(wo.due_date, self.input.horizon_start)
+            tech_index = self.tech_id_to_index.get(item.technician_id)
+            bay_index = self.bay_id_to_index.get(item.bay_id)
             
-            # Penalty if task finishes after due date
-            is_late = self.model.NewBoolVar(f"late_{task.id}")
-            self.model.Add(self.task_ends[task.id] > due_minutes).OnlyEnforceIf(is_late)
-            self.model.Add(self.task_ends[task.id] <= due_minutes).OnlyEnforceIf(is_late.Not())
-            
-            # Penalty scales with priority (higher priority = higher penalty)
-            penalty_weight = wo.priority * 100
-            penalty_var = self.model.NewIntVar(0, penalty_weight, f"due_penalty_{task.id}")
-            self.model.Add(penalty_var == penalty_weight).OnlyEnforceIf(is_late)
-            self.model.Add(penalty_var == 0).OnlyEnforceIf(is_late.Not())
-            
-            self.penalty_vars[f"due_date_{task.id}"] = penalty_var
-            objective_terms.append(penalty_var)
-        
-        # Priority penalties (prefer higher priority earlier)
-        for task in self.input.get_unlocked_tasks():
-            wo = self.input.work_orders.get(task.work_order_id)
-            if not wo:
-                continue
-            
-            # Small penalty based on start time, scaled inversely by priority
-            # Higher priority tasks get penalized more for late starts
-            priority_weight = (6 - wo.priority)  # Invert priority (5->1, 1->5)
-            penalty_var = self.model.NewIntVar(
-                0,
-                self.horizon_minutes * priority_weight,
-                f"priority_penalty_{task.id}",
-            )
-            # Penalty = start_time * priority_weight / 100
-            self.model.AddDivisionEquality(
-                penalty_var,
-                self.task_starts[task.id] * priority_weight,
-                100,
-            )
-            self.penalty_vars[f"priority_{task.id}"] = penalty_var
-            objective_terms.append(penalty_var)
-        
-        # Add all penalty variables from constraints
-        objective_terms.extend(self.penalty_vars.values())
-        
-        # Minimize total penalty
-        self.model.Minimize(sum(objective_terms))
+            hint.vars.append(self.start_vars[i])
+            hint.values.append(datetime_to_minutes(item.start_at, horizon_start))
+            for index, literal in self.tech_literals[i]:
+                hint.vars.append(literal)
+                hint.values.append(int(index == tech_index))
+            for index, literal in self.bay_literals[i]:
+                hint.vars.append(literal)
+                hint.values.append(int(index == bay_index))
     
-    def solve(self, time_limit_seconds: int = 30) -> ScheduleResult:
+    def solve(
+        self,
+        time_limit_seconds: float = 30,
+        *,
+        num_workers: int | None = None,
+        profile: SolverProfile | None = None,
+        solution_callback: cp_model.CpSolverSolutionCallback | None = None,
+        stop_event: Any = None,
+    ) -> ScheduleResult:
         """
         Solve the CP-SAT model.
         
         Args:
             time_limit_seconds: Maximum solve time
+            num_workers: Number of CP-SAT search workers (default: all cores,
+                or the profile's worker count); overrides the profile
+            profile: Solver parameter profile applied before the time limit
+            solution_callback: Optional callback invoked on each improving solution
+            stop_event: Optional event (threading or multiprocessing); when set,
+                the search stops and the best solution found so far is returned
         
         Returns:
             ScheduleResult with solution or infeasibility info
         """
         solver = cp_model.CpSolver()
+        if profile is not None:
+            profile.apply(solver.parameters)
         solver.parameters.max_time_in_seconds = time_limit_seconds
         solver.parameters.log_search_progress = False
+        if num_workers:
+            solver.parameters.num_workers = num_workers
         
-        logger.info("solving_cp_sat_model", extra={"time_limit": time_limit_seconds})
+        logger.info(
+            "solving_cp_sat_model",
+            extra={
+                "time_limit": time_limit_seconds,
+                "profile": profile.name if profile else None,
+            },
+        )
         
-        status = solver.Solve(self.model)
+        solve_done = threading.Event()
+        watcher = None
+        if stop_event is not None:
+            def watch_stop() -> None:
+                while not solve_done.is_set():
+                    if stop_event.wait(0.1):
+                        solver.StopSearch()
+                        return
+            
+            watcher = threading.Thread(target=watch_stop, daemon=True)
+            watcher.start()
+        
+        try:
+            status = solver.Solve(self.model, solution_callback)
+        finally:
+            solve_done.set()
+            if watcher is not None:
+                watcher.join()
         wall_time_ms = int(solver.WallTime() * 1000)
         
         logger.info(
@@ -438,6 +467,13 @@ class SchedulerModel:
             },
         )
         
+        metrics = {
+            "solver_status": solver.StatusName(status),
+            "model_build_ms": self.build_ms,
+        }
+        if profile is not None:
+            metrics["solver_profile"] = profile.name
+        
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
             # Extract solution
             items = self._extract_solution(solver)
@@ -451,6 +487,10 @@ class SchedulerModel:
                 solver_wall_time_ms=wall_time_ms,
                 objective_value=int(solver.ObjectiveValue()),
                 objective_breakdown=objective_breakdown,
+                metrics={
+                    **metrics,
+                    "best_objective_bound": int(solver.BestObjectiveBound()),
+                },
             )
         
         elif status == cp_model.INFEASIBLE:
@@ -462,6 +502,7 @@ class SchedulerModel:
                 objective_value=None,
                 objective_breakdown=None,
                 infeasible_reason=reason,
+                metrics=metrics,
             )
         
         else:
@@ -472,34 +513,33 @@ class SchedulerModel:
                 objective_value=None,
                 objective_breakdown=None,
                 infeasible_reason=f"Solver status: {solver.StatusName(status)}",
+                metrics=metrics,
             )
     
     def _extract_solution(self, solver: cp_model.CpSolver) -> list[ScheduleItem]:
         """Extract schedule items from solution."""
         items = []
+        values = solver.ResponseProto().solution
+        horizon_start = self.input.horizon_start
         
         # Add unlocked tasks
-        for task in self.input.get_unlocked_tasks():
-            start_minutes = solver.Value(self.task_starts[task.id])
-            end_minutes = solver.Value(self.task_ends[task.id])
-            tech_index = solver.Value(self.task_tech_assignments[task.id])
-            bay_index = solver.Value(self.task_bay_assignments[task.id])
-            
-            tech_id = self.input.technicians[tech_index].id
-            bay_id = self.input.bays[bay_index].id
+        for i, task in enumerate(self.unlocked_tasks):
+            start_minutes = values[self.start_vars[i]]
+            tech_index = next(t for t, lit in self.tech_literals[i] if values[lit])
+            bay_index = next(b for b, lit in self.bay_literals[i] if values[lit])
             
             items.append(ScheduleItem(
                 task_id=task.id,
-                technician_id=tech_id,
-                bay_id=bay_id,
-                start_at=minutes_to_datetime(start_minutes, self.input.horizon_start),
-                end_at=minutes_to_datetime(end_minutes, self.input.horizon_start),
+                technician_id=self.input.technicians[tech_index].id,
+                bay_id=self.input.bays[bay_index].id,
+                start_at=minutes_to_datetime(start_minutes, horizon_start),
+                end_at=minutes_to_datetime(start_minutes + task.duration_minutes, horizon_start),
                 is_locked=False,
                 why={"reason": "optimized"},
             ))
         
         # Add locked tasks
-        for task in self.input.get_locked_tasks():
+        for task in self.locked_tasks:
             items.append(ScheduleItem(
                 task_id=task.id,
                 technician_id=task.locked_tech_id,
@@ -514,31 +554,19 @@ class SchedulerModel:
     
     def _calculate_objective_breakdown(self, solver: cp_model.CpSolver) -> ObjectiveBreakdown:
         """Calculate breakdown of objective components."""
-        due_date_penalty = 0
-        priority_penalty = 0
-        skill_mismatch_penalty = 0
-        parts_not_ready_penalty = 0
-        
-        for key, var in self.penalty_vars.items():
-            value = solver.Value(var)
-            
-            if key.startswith("due_date_"):
-                due_date_penalty += value
-            elif key.startswith("priority_"):
-                priority_penalty += value
-            elif key.startswith("skill_mismatch_"):
-                skill_mismatch_penalty += value
-            elif key.startswith("parts_not_ready_"):
-                parts_not_ready_penalty += value
-        
-        total = due_date_penalty + priority_penalty + skill_mismatch_penalty + parts_not_ready_penalty
+        values = solver.ResponseProto().solution
+        totals = {
+            component: self.penalty_constants[component]
+            + sum(coeff * values[var] for var, coeff in terms)
+            for component, terms in self.penalty_terms.items()
+        }
         
         return ObjectiveBreakdown(
-            total_penalty=total,
-            due_date_penalty=due_date_penalty,
-            priority_penalty=priority_penalty,
-            skill_mismatch_penalty=skill_mismatch_penalty,
-            parts_not_ready_penalty=parts_not_ready_penalty,
+            total_penalty=sum(totals.values()),
+            due_date_penalty=totals["due_date"],
+            priority_penalty=totals["priority"],
+            skill_mismatch_penalty=totals["skill_mismatch"],
+            parts_not_ready_penalty=totals["parts_not_ready"],
         )
     
     def _analyze_infeasibility(self) -> str:
@@ -586,17 +614,25 @@ class SchedulerModel:
             return "Unable to find feasible schedule (constraint conflict)"
 
 
-def run_scheduler(input_data: ScheduleInput, time_limit_seconds: int = 30) -> ScheduleResult:
+def run_scheduler(
+    input_data: ScheduleInput,
+    time_limit_seconds: int = 30,
+    *,
+    profile: SolverProfile | None = None,
+    stop_event: Any = None,
+) -> ScheduleResult:
     """
     Run the CP-SAT scheduler.
     
     Args:
         input_data: Schedule input data
         time_limit_seconds: Maximum solve time
+        profile: Solver parameter profile (default: CP-SAT defaults)
+        stop_event: Optional event that stops the search early
     
     Returns:
         ScheduleResult with solution
     """
     model = SchedulerModel(input_data)
     model.build()
-    return model.solve(time_limit_seconds)
+    return model.solve(time_limit_seconds, profile=profile, stop_event=stop_event)
@@ -2,21 +2,180 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+import weakref
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime
+from typing import Any
 
 import asyncpg
 
 from app.scheduler.models import (
     Bay,
+    DeferredTask,
     ScheduleInput,
+    ScheduleItem,
     Task,
     Technician,
     WorkOrder,
 )
+from app.scheduler.reference_cache import reference_cache
 
 logger = logging.getLogger(__name__)
 
+# Deferred tasks listed per run in metrics; the counts always cover all of them
+MAX_REPORTED_DEFERRED = 100
+
+# Tasks that can run in the horizon ($2, $3): locked tasks whose lock window
+# overlaps it, and unlocked tasks whose time window fits their planned
+# (average) duration inside it. Only todo/scheduled tasks are planned.
+_TASK_STATUS = "status in ('todo', 'scheduled')"
+_UNLOCKED_FITS = (
+    "greatest(coalesce(earliest_start, $2), $2)"
+    " + make_interval(mins => (duration_minutes_low + duration_minutes_high) / 2)"
+    " <= least(coalesce(latest_finish, $3), $3)"
+)
+_IN_HORIZON = (
+    "case when lock_flag"
+    " then locked_start_at is null or locked_end_at is null"
+    " or (locked_start_at < $3 and locked_end_at > $2)"
+    f" else {_UNLOCKED_FITS} end"
+)
+
+_TASKS_QUERY = f"""
+    select
+      id::text as id,
+      work_order_id::text as work_order_id,
+      type,
+      status,
+      required_skill,
+      required_skill_is_hard,
+      required_bay_type,
+      earliest_start,
+      latest_finish,
+      duration_minutes_low,
+      duration_minutes_high,
+      lock_flag,
+      locked_tech_id::text as locked_tech_id,
+      locked_bay_id::text as locked_bay_id,
+      locked_start_at,
+      locked_end_at
+    from public.tasks
+    where org_id = $1::uuid
+      and {_TASK_STATUS}
+      and {_IN_HORIZON}
+    order by created_at
+"""
+
+# Unlocked tasks left out because they cannot fit the horizon
+_DEFERRED_QUERY = f"""
+    select
+      id::text as id,
+      case
+        when earliest_start >= $3 then 'starts_after_horizon'
+        when latest_finish <= $2 then 'due_before_horizon'
+        else 'window_too_short'
+      end as reason
+    from public.tasks
+    where org_id = $1::uuid
+      and {_TASK_STATUS}
+      and not lock_flag
+      and not ({_UNLOCKED_FITS})
+    order by created_at
+"""
+
+_TECHNICIANS_QUERY = """
+    select
+      id::text as id,
+      name,
+      efficiency_multiplier,
+      wip_limit
+    from public.technicians
+    where org_id = $1::uuid
+    order by name
+"""
+
+_SKILLS_QUERY = """
+    select
+      technician_id::text as technician_id,
+      skill
+    from public.technician_skills
+    where org_id = $1::uuid
+    order by technician_id, skill
+"""
+
+_BAYS_QUERY = """
+    select
+      id::text as id,
+      name,
+      bay_type,
+      capacity,
+      is_active
+    from public.bays
+    where org_id = $1::uuid
+      and is_active = true
+    order by name
+"""
+
+_WORK_ORDERS_QUERY = f"""
+    select
+      id::text as id,
+      priority,
+      due_date,
+      parts_ready
+    from public.work_orders
+    where org_id = $1::uuid
+      and id in (
+        select work_order_id
+        from public.tasks
+        where org_id = $1::uuid
+          and {_TASK_STATUS}
+          and {_IN_HORIZON}
+      )
+"""
+
+
+# Readers per load; with six queries (reference data not cached) each runs two
+LOAD_READERS = 3
+
+# Pooled connections one load holds at once: the snapshot exporter plus readers
+LOAD_CONNECTIONS = 1 + LOAD_READERS
+
+# Loads reserve their connections one load at a time. Otherwise two loads on
+# a busy pool could each hold an exporter while waiting for readers the
+# other holds, and neither would ever get them. One lock per event loop.
+_reserve_locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@asynccontextmanager
+async def _reserve_connections(
+    pool: asyncpg.Pool, count: int
+) -> AsyncIterator[list[asyncpg.Connection]]:
+    """Acquire `count` pooled connections together, released on exit."""
+    lock = _reserve_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+    async with AsyncExitStack() as stack:
+        async with lock:
+            conns = [await stack.enter_async_context(pool.acquire()) for _ in range(count)]
+        yield conns
+
+
+async def _fetch_in_snapshot(
+    conn: asyncpg.Connection,
+    snapshot_id: str,
+    queries: list[tuple[str, tuple[object, ...]]],
+) -> list[list[asyncpg.Record]]:
+    """Run queries in order on one connection, reading the exported snapshot."""
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        # Must be the first statement of the transaction; the ID comes from
+        # pg_export_snapshot() and cannot be a bind parameter
+        await conn.execute(f"set transaction snapshot '{snapshot_id}'")
+        return [await conn.fetch(query, *args) for query, args in queries]
+
 
 async def load_schedule_input(
     pool: asyncpg.Pool,
@@ -28,6 +187,17 @@ async def load_schedule_input(
     """
     Load all data needed for scheduling.
     
+    Tasks, technicians, skills, bays and work orders are fetched concurrently
+    on up to `LOAD_READERS` pooled connections, all reading one snapshot
+    exported from a repeatable-read transaction, so the run sees a consistent
+    view at the cost of one or two round-trips of latency instead of six.
+    Technicians, skills and bays are served from the reference cache when it
+    has the org. All of a load's connections are reserved together, so
+    concurrent loads wait for each other instead of deadlocking the pool.
+    
+    Only tasks relevant to the horizon are loaded (see `_IN_HORIZON`);
+    unlocked tasks that cannot fit it are returned as `deferred_tasks`.
+    
     Args:
         pool: Database connection pool
         org_id: Organization ID
@@ -48,134 +218,176 @@ async def load_schedule_input(
         },
     )
     
-    # Load tasks (only todo/scheduled status)
-    task_rows = await pool.fetch(
-        """
-        select
-          id::text as id,
-          work_order_id::text as work_order_id,
-          type,
-          status,
-          required_skill,
-          required_skill_is_hard,
-          required_bay_type,
-          earliest_start,
-          latest_finish,
-          duration_minutes_low,
-          duration_minutes_high,
-          lock_flag,
-          locked_tech_id::text as locked_tech_id,
-          locked_bay_id::text as locked_bay_id,
-          locked_start_at,
-          locked_end_at
-        from public.tasks
-        where org_id = $1::uuid
-          and status in ('todo', 'scheduled')
-        order by created_at
-        """,
-        org_id,
-    )
+    # Technicians, skills and bays come from the reference cache when possible
+    cached = reference_cache.get(org_id)
+    generation = reference_cache.generation(org_id)
+    horizon_args = (org_id, horizon_start, horizon_end)
+    queries = [
+        (_TASKS_QUERY, horizon_args),
+        (_WORK_ORDERS_QUERY, horizon_args),
+        (_DEFERRED_QUERY, horizon_args),
+    ]
+    if cached is None:
+        queries += [
+            (_TECHNICIANS_QUERY, (org_id,)),
+            (_SKILLS_QUERY, (org_id,)),
+            (_BAYS_QUERY, (org_id,)),
+        ]
+    
+    readers = min(LOAD_READERS, len(queries))
+    batches = [queries[i::readers] for i in range(readers)]
+    
+    started = time.perf_counter()
+    async with _reserve_connections(pool, 1 + readers) as (exporter, *reader_conns):
+        # The exporting transaction must stay open until every reader has started
+        async with exporter.transaction(isolation="repeatable_read", readonly=True):
+            snapshot_id = await exporter.fetchval("select pg_export_snapshot()")
+            batch_results = await asyncio.gather(*(
+                _fetch_in_snapshot(conn, snapshot_id, batch)
+                for conn, batch in zip(reader_conns, batches)
+            ))
+    # Query i ran as item i // readers of batch i % readers
+    results = [batch_results[i % readers][i // readers] for i in range(len(queries))]
+    load_ms = int((time.perf_counter() - started) * 1000)
     
+    task_rows, wo_rows, deferred_rows = results[:3]
     tasks = [Task.from_row(dict(row)) for row in task_rows]
-    logger.info("loaded_tasks", extra={"count": len(tasks)})
+    work_orders = {
+        row["id"]: WorkOrder.from_row(dict(row))
+        for row in wo_rows
+    }
+    deferred_tasks = [DeferredTask(task_id=row["id"], reason=row["reason"]) for row in deferred_rows]
     
-    # Load technicians
-    tech_rows = await pool.fetch(
-        """
-        select
-          id::text as id,
-          name,
-          efficiency_multiplier,
-          wip_limit
-        from public.technicians
-        where org_id = $1::uuid
-        order by name
-        """,
-        org_id,
+    if cached is not None:
+        technicians, bays = cached.technicians, cached.bays
+    else:
+        tech_rows, skill_rows, bay_rows = results[3:]
+        
+        # Group skills by technician
+        tech_skills: dict[str, list[str]] = {}
+        for row in skill_rows:
+            tech_id = row["technician_id"]
+            if tech_id not in tech_skills:
+                tech_skills[tech_id] = []
+            tech_skills[tech_id].append(row["skill"])
+        
+        technicians = [
+            Technician.from_row(dict(row), tech_skills.get(row["id"], []))
+            for row in tech_rows
+        ]
+        bays = [Bay.from_row(dict(row)) for row in bay_rows]
+        reference_cache.put(org_id, technicians, bays, generation)
+    
+    logger.info(
+        "loaded_schedule_data",
+        extra={
+            "schedule_run_id": schedule_run_id,
+            "tasks": len(tasks),
+            "technicians": len(technicians),
+            "bays": len(bays),
+            "work_orders": len(work_orders),
+            "deferred_tasks": len(deferred_tasks),
+            "reference_cache_hit": cached is not None,
+            "load_ms": load_ms,
+        },
     )
     
-    # Load technician skills
-    skill_rows = await pool.fetch(
+    input_data = ScheduleInput(
+        org_id=org_id,
+        schedule_run_id=schedule_run_id,
+        horizon_start=horizon_start,
+        horizon_end=horizon_end,
+        tasks=tasks,
+        technicians=technicians,
+        bays=bays,
+        work_orders=work_orders,
+        deferred_tasks=deferred_tasks,
+    )
+    
+    return input_data
+
+
+def summarize_deferred(deferred_tasks: list[DeferredTask]) -> dict[str, Any]:
+    """
+    Summarize deferred tasks for `schedule_runs.metrics`.
+    
+    Args:
+        deferred_tasks: Tasks left out of the run
+    
+    Returns:
+        Count, count per reason, and up to `MAX_REPORTED_DEFERRED` tasks
+    """
+    by_reason: dict[str, int] = {}
+    for deferred in deferred_tasks:
+        by_reason[deferred.reason] = by_reason.get(deferred.reason, 0) + 1
+    return {
+        "count": len(deferred_tasks),
+        "by_reason": by_reason,
+        "tasks": [
+            {"task_id": d.task_id, "reason": d.reason}
+            for d in deferred_tasks[:MAX_REPORTED_DEFERRED]
+        ],
+    }
+
+
+async def load_scheduler_profile(pool: asyncpg.Pool, org_id: str) -> str | None:
+    """
+    Load the org's configured solver profile.
+    
+    Args:
+        pool: Database connection pool
+        org_id: Organization ID
+    
+    Returns:
+        Profile name, or None to select one from the task count
+    """
+    return await pool.fetchval(
         """
-        select
-          technician_id::text as technician_id,
-          skill
-        from public.technician_skills
-        where org_id = $1::uuid
-        order by technician_id, skill
+        select scheduler_profile
+        from public.organizations
+        where id = $1::uuid
         """,
         org_id,
     )
+
+
+async def load_live_assignments(pool: asyncpg.Pool, org_id: str) -> dict[str, ScheduleItem]:
+    """
+    Load the org's live (published, not retired) assignments.
     
-    # Group skills by technician
-    tech_skills: dict[str, list[str]] = {}
-    for row in skill_rows:
-        tech_id = row["technician_id"]
-        if tech_id not in tech_skills:
-            tech_skills[tech_id] = []
-        tech_skills[tech_id].append(row["skill"])
-    
-    technicians = [
-        Technician.from_row(dict(row), tech_skills.get(row["id"], []))
-        for row in tech_rows
-    ]
-    logger.info("loaded_technicians", extra={"count": len(technicians)})
+    Args:
+        pool: Database connection pool
+        org_id: Organization ID
     
-    # Load bays
-    bay_rows = await pool.fetch(
+    Returns:
+        Live assignment per task ID; `why` holds only the reason
+    """
+    rows = await pool.fetch(
         """
         select
-          id::text as id,
-          name,
-          bay_type,
-          capacity,
-          is_active
-        from public.bays
+          task_id::text as task_id,
+          technician_id::text as technician_id,
+          bay_id::text as bay_id,
+          start_at,
+          end_at,
+          is_locked,
+          why->>'reason' as reason
+        from public.schedule_items
         where org_id = $1::uuid
-          and is_active = true
-        order by name
+          and published_seq is not null
+          and retired_seq is null
         """,
         org_id,
     )
-    
-    bays = [Bay.from_row(dict(row)) for row in bay_rows]
-    logger.info("loaded_bays", extra={"count": len(bays)})
-    
-    # Load work orders for the tasks
-    work_order_ids = list(set(t.work_order_id for t in tasks))
-    
-    if work_order_ids:
-        wo_rows = await pool.fetch(
-            """
-            select
-              id::text as id,
-              priority,
-              due_date,
-              parts_ready
-            from public.work_orders
-            where org_id = $1::uuid
-              and id = any($2::uuid[])
-            """,
-            org_id,
-            work_order_ids,
+    return {
+        row["task_id"]: ScheduleItem(
+            task_id=row["task_id"],
+            technician_id=row["technician_id"],
+            bay_id=row["bay_id"],
+            start_at=row["start_at"],
+            end_at=row["end_at"],
+            is_locked=row["is_locked"],
+            why={"reason": row["reason"]} if row["reason"] is not None else None,
         )
-        
-        work_orders = {
-            row["id"]: WorkOrder.from_row(dict(row))
-            for row in wo_rows
-        }
-    else:
-        work_orders = {}
-    
-    logger.info("loaded_work_orders", extra={"count": len(work_orders)})
-    
-    return ScheduleInput(
-        org_id=org_id,
-        schedule_run_id=schedule_run_id,
-        horizon_start=horizon_start,
-        horizon_end=horizon_end,
-        tasks=tasks,
-        technicians=technicians,
-        bays=bays,
-        work_orders=work_orders,
-    )
+        for row in rows
+    }
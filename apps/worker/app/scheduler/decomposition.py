@@ -0,0 +1,126 @@
+"""Time-ordered decomposition of the CP-SAT model.
+
+Splits the unlocked tasks into urgency-ordered batches and solves one batch at a
+time, pinning every earlier batch as locked tasks. Each sub-model is small, so a
+first solution is found quickly even when the full model stalls.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import replace
+from typing import Any
+
+from app.scheduler.cp_sat_scheduler import SchedulerModel
+from app.scheduler.evaluation import evaluate_schedule, objective_value
+from app.scheduler.models import ScheduleInput, ScheduleItem, ScheduleResult, Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 150
+
+
+def solve_decomposed(
+    input_data: ScheduleInput,
+    time_limit_seconds: float = 30,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    num_workers: int | None = None,
+    stop_event: Any = None,
+) -> ScheduleResult:
+    """
+    Solve the schedule batch by batch.
+
+    The time budget is split evenly over the remaining batches, so time a
+    batch does not use carries over to the next one.
+
+    Args:
+        input_data: Schedule input data
+        time_limit_seconds: Total time budget across all batches
+        batch_size: Number of unlocked tasks per sub-model
+        num_workers: Number of CP-SAT search workers per sub-solve
+        stop_event: Optional event that aborts the remaining batches
+
+    Returns:
+        ScheduleResult covering all tasks, or a failed result
+    """
+    started = time.perf_counter()
+
+    unlocked = [input_data.tasks[row] for row in input_data.arrays.urgency_order()]
+    batches = [unlocked[i:i + batch_size] for i in range(0, len(unlocked), batch_size)]
+
+    fixed: list[Task] = input_data.get_locked_tasks()
+    items: list[ScheduleItem] = []
+
+    for index, batch in enumerate(batches):
+        if stop_event is not None and stop_event.is_set():
+            break
+
+        remaining = time_limit_seconds - (time.perf_counter() - started)
+        if remaining <= 0:
+            break
+        budget = remaining / (len(batches) - index)
+
+        sub_input = replace(input_data, tasks=fixed + batch)
+        model = SchedulerModel(sub_input)
+        model.build()
+        result = model.solve(budget, num_workers=num_workers, stop_event=stop_event)
+
+        if result.status != "succeeded":
+            logger.info(
+                "decomposed_batch_failed",
+                extra={"batch": index, "batches": len(batches), "status": result.status},
+            )
+            return replace(
+                result,
+                solver_wall_time_ms=int((time.perf_counter() - started) * 1000),
+                infeasible_reason=f"Batch {index + 1}/{len(batches)}: {result.infeasible_reason}",
+            )
+
+        tasks_by_id = {t.id: t for t in batch}
+        for item in result.items:
+            task = tasks_by_id.get(item.task_id)
+            if task is not None:
+                items.append(item)
+                fixed.append(task.as_locked(item))
+
+    wall_time_ms = int((time.perf_counter() - started) * 1000)
+
+    if len(items) < len(unlocked):
+        return ScheduleResult(
+            status="failed",
+            items=[],
+            solver_wall_time_ms=wall_time_ms,
+            objective_value=None,
+            objective_breakdown=None,
+            infeasible_reason="Decomposed solve ran out of time before scheduling every batch",
+        )
+
+    # Locked items come from the original input so they keep their "locked" reason
+    for task in input_data.get_locked_tasks():
+        items.append(ScheduleItem(
+            task_id=task.id,
+            technician_id=task.locked_tech_id,
+            bay_id=task.locked_bay_id,
+            start_at=task.locked_start_at,
+            end_at=task.locked_end_at,
+            is_locked=True,
+            why={"reason": "locked"},
+        ))
+
+    breakdown = evaluate_schedule(input_data, items)
+
+    logger.info(
+        "decomposed_solve_complete",
+        extra={"batches": len(batches), "wall_time_ms": wall_time_ms},
+    )
+
+    return ScheduleResult(
+        status="succeeded",
+        items=items,
+        solver_wall_time_ms=wall_time_ms,
+        objective_value=objective_value(breakdown),
+        objective_breakdown=breakdown,
+        metrics={"batches": len(batches)},
+    )
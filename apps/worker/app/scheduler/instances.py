@@ -0,0 +1,88 @@
+"""JSON export of schedule inputs for offline replay.
+
+Exported instances are the benchmark fixtures the solver tuner replays, so real
+org data can be tuned against without a database connection.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from app.scheduler.models import Bay, ScheduleInput, Task, Technician, WorkOrder
+
+_TASK_DATETIME_FIELDS = ("earliest_start", "latest_finish", "locked_start_at", "locked_end_at")
+
+
+def _encode(value: date | datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _decode(value: str | None) -> date | datetime | None:
+    if value is None:
+        return None
+    # Work order due dates may be plain dates
+    if len(value) == 10:
+        return date.fromisoformat(value)
+    return datetime.fromisoformat(value)
+
+
+def instance_to_dict(input_data: ScheduleInput) -> dict[str, Any]:
+    """Convert a schedule input to a JSON-serializable dictionary."""
+    tasks = []
+    for task in input_data.tasks:
+        row = asdict(task)
+        for name in _TASK_DATETIME_FIELDS:
+            row[name] = _encode(row[name])
+        tasks.append(row)
+
+    return {
+        "org_id": input_data.org_id,
+        "schedule_run_id": input_data.schedule_run_id,
+        "horizon_start": _encode(input_data.horizon_start),
+        "horizon_end": _encode(input_data.horizon_end),
+        "tasks": tasks,
+        "technicians": [asdict(t) for t in input_data.technicians],
+        "bays": [asdict(b) for b in input_data.bays],
+        "work_orders": [
+            {**asdict(wo), "due_date": _encode(wo.due_date)}
+            for wo in input_data.work_orders.values()
+        ],
+    }
+
+
+def instance_from_dict(data: dict[str, Any]) -> ScheduleInput:
+    """Rebuild a schedule input from `instance_to_dict` output."""
+    tasks = []
+    for row in data["tasks"]:
+        row = dict(row)
+        for name in _TASK_DATETIME_FIELDS:
+            row[name] = _decode(row[name])
+        tasks.append(Task(**row))
+
+    return ScheduleInput(
+        org_id=data["org_id"],
+        schedule_run_id=data["schedule_run_id"],
+        horizon_start=_decode(data["horizon_start"]),
+        horizon_end=_decode(data["horizon_end"]),
+        tasks=tasks,
+        technicians=[Technician(**row) for row in data["technicians"]],
+        bays=[Bay(**row) for row in data["bays"]],
+        work_orders={
+            row["id"]: WorkOrder(**{**row, "due_date": _decode(row["due_date"])})
+            for row in data["work_orders"]
+        },
+    )
+
+
+def save_instance(input_data: ScheduleInput, path: str | Path) -> None:
+    """Write a schedule input to a JSON file."""
+    Path(path).write_text(json.dumps(instance_to_dict(input_data)))
+
+
+def load_instance(path: str | Path) -> ScheduleInput:
+    """Read a schedule input written by `save_instance`."""
+    return instance_from_dict(json.loads(Path(path).read_text()))
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+if TYPE_CHECKING:
+    from app.scheduler.arrays import ResourceTables, ScheduleArrays
 
-@dataclass
+
+@dataclass(slots=True)
 class Task:
     """A task to be scheduled."""
     
@@ -57,9 +60,20 @@ class Task:
             locked_end_at=row["locked_end_at"],
             duration_minutes=duration_avg,
         )
+    
+    def as_locked(self, item: ScheduleItem) -> Task:
+        """Return a copy of this task pinned to the given assignment."""
+        return replace(
+            self,
+            is_locked=True,
+            locked_tech_id=item.technician_id,
+            locked_bay_id=item.bay_id,
+            locked_start_at=item.start_at,
+            locked_end_at=item.end_at,
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class Technician:
     """A technician who can perform tasks."""
     
@@ -81,7 +95,7 @@ class Technician:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Bay:
     """A bay where work is performed."""
     
@@ -103,7 +117,7 @@ class Bay:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkOrder:
     """Work order information for tasks."""
     
@@ -123,7 +137,15 @@ class WorkOrder:
         )
 
 
-@dataclass
+@dataclass(slots=True)
+class DeferredTask:
+    """An unlocked task left out of a run because it cannot fit the horizon."""
+    
+    task_id: str
+    reason: str  # starts_after_horizon, due_before_horizon, window_too_short
+
+
+@dataclass(slots=True)
 class ScheduleInput:
     """Input data for scheduler."""
     
@@ -135,6 +157,30 @@ class ScheduleInput:
     technicians: list[Technician]
     bays: list[Bay]
     work_orders: dict[str, WorkOrder]  # wo_id -> WorkOrder
+    deferred_tasks: list[DeferredTask] = field(default_factory=list)
+    
+    # Columnar view and lookup tables, built on first use; `replace()` copies
+    # start without them
+    _arrays: ScheduleArrays | None = field(default=None, init=False, repr=False, compare=False)
+    _resource_tables: ResourceTables | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def arrays(self) -> ScheduleArrays:
+        """Columnar view of this input (minute offsets, eligibility bitsets)."""
+        if self._arrays is None:
+            from app.scheduler.arrays import build_schedule_arrays
+            self._arrays = build_schedule_arrays(self)
+        return self._arrays
+    
+    @property
+    def resource_tables(self) -> ResourceTables:
+        """Technician/bay index and eligibility lookups for this input."""
+        if self._resource_tables is None:
+            from app.scheduler.arrays import build_resource_tables
+            self._resource_tables = build_resource_tables(self)
+        return self._resource_tables
     
     def get_locked_tasks(self) -> list[Task]:
         """Get all locked tasks."""
@@ -145,7 +191,7 @@ class ScheduleInput:
         return [t for t in self.tasks if not t.is_locked]
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduleItem:
     """A scheduled item (task assignment)."""
     
@@ -158,7 +204,7 @@ class ScheduleItem:
     why: dict[str, Any] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ObjectiveBreakdown:
     """Breakdown of objective function components."""
     
@@ -179,7 +225,7 @@ class ObjectiveBreakdown:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduleResult:
     """Result of scheduling operation."""
     
@@ -189,3 +235,4 @@ class ScheduleResult:
     objective_value: int | None
     objective_breakdown: ObjectiveBreakdown | None
     infeasible_reason: str | None = None
+    metrics: dict[str, Any] = field(default_factory=dict)  # Stored in schedule_runs.metrics
@@ -1,29 +1,257 @@
-"""Schedule persistence service."""
+"""Schedule persistence service.
+
+Successful runs are published as a diff against the org's live schedule:
+only new or changed assignments are written, and replaced or dropped ones are
+retired rather than deleted. Each publish gets the next per-org `publish_seq`,
+so the schedule of any run is the set of items with
+`published_seq <= publish_seq < retired_seq` (see migration 0012).
+"""
 
 from __future__ import annotations
 
+import json
 import logging
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
 from typing import Any
 
 import asyncpg
 
-from app.scheduler.models import ScheduleResult
+from app.scheduler.models import ScheduleItem, ScheduleResult
 
 logger = logging.getLogger(__name__)
 
+# Column order of `item_records` rows
+ITEM_COLUMNS = (
+    "org_id",
+    "schedule_run_id",
+    "task_id",
+    "technician_id",
+    "bay_id",
+    "start_at",
+    "end_at",
+    "is_locked",
+    "why",
+    "published_seq",
+)
+
+
+@dataclass(slots=True)
+class ChangeSet:
+    """How a published schedule differs from the one it replaced."""
+    
+    publish_seq: int
+    new: int = 0  # task was not in the live schedule
+    reassigned: int = 0  # different technician or bay
+    moved: int = 0  # same technician and bay, different times
+    lock_changed: int = 0  # only the lock flag changed
+    why_changed: int = 0  # same assignment, different explanation or risk
+    unchanged: int = 0  # kept by reference, not rewritten
+    dropped: int = 0  # live task no longer in the schedule
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        return {
+            "publish_seq": self.publish_seq,
+            "new": self.new,
+            "reassigned": self.reassigned,
+            "moved": self.moved,
+            "lock_changed": self.lock_changed,
+            "why_changed": self.why_changed,
+            "unchanged": self.unchanged,
+            "dropped": self.dropped,
+        }
+
+
+def diff_schedule(
+    live: list[Mapping[str, Any]],
+    items: list[ScheduleItem],
+    publish_seq: int,
+) -> tuple[ChangeSet, list[ScheduleItem], list[str]]:
+    """
+    Diff new schedule items against the live schedule.
+    
+    Items are matched by task. An item is unchanged when technician, bay,
+    times, lock flag and `why` all match; its live row is kept.
+    
+    Args:
+        live: Live schedule_items rows (id, task_id, technician_id, bay_id,
+            start_at, end_at, is_locked, why), `why` decoded
+        items: New schedule items
+        publish_seq: Sequence number of this publish
+    
+    Returns:
+        (change set, items to insert, IDs of live rows to retire)
+    """
+    changes = ChangeSet(publish_seq=publish_seq)
+    live_by_task = {row["task_id"]: row for row in live}
+    inserts: list[ScheduleItem] = []
+    retire_ids: list[str] = []
+    
+    for item in items:
+        row = live_by_task.pop(item.task_id, None)
+        if row is None:
+            changes.new += 1
+        elif (row["technician_id"], row["bay_id"]) != (item.technician_id, item.bay_id):
+            changes.reassigned += 1
+        elif (row["start_at"], row["end_at"]) != (item.start_at, item.end_at):
+            changes.moved += 1
+        elif row["is_locked"] != item.is_locked:
+            changes.lock_changed += 1
+        elif row["why"] != item.why:
+            changes.why_changed += 1
+        else:
+            changes.unchanged += 1
+            continue
+        inserts.append(item)
+        if row is not None:
+            retire_ids.append(row["id"])
+    
+    # Whatever is left is no longer scheduled
+    changes.dropped = len(live_by_task)
+    retire_ids.extend(row["id"] for row in live_by_task.values())
+    
+    return changes, inserts, retire_ids
+
+
+def item_records(
+    org_id: str,
+    schedule_run_id: str,
+    items: list[ScheduleItem],
+    published_seq: int | None = None,
+) -> list[tuple[Any, ...]]:
+    """
+    Build `schedule_items` rows in `ITEM_COLUMNS` order.
+    
+    `why` is JSON-encoded text, which COPY's binary jsonb format expects.
+    """
+    return [
+        (
+            org_id,
+            schedule_run_id,
+            item.task_id,
+            item.technician_id,
+            item.bay_id,
+            item.start_at,
+            item.end_at,
+            item.is_locked,
+            json.dumps(item.why) if item.why is not None else None,
+            published_seq,
+        )
+        for item in items
+    ]
+
+
+async def _publish_items(
+    conn: asyncpg.Connection,
+    org_id: str,
+    schedule_run_id: str,
+    items: list[ScheduleItem],
+) -> ChangeSet:
+    """Publish items as the org's live schedule, writing only the changes."""
+    # Serializes publishes per org; released at commit
+    await conn.execute(
+        "select pg_advisory_xact_lock(hashtextextended('schedule_publish:' || $1::text, 0))",
+        org_id,
+    )
+    publish_seq = await conn.fetchval(
+        """
+        select coalesce(max(publish_seq), 0) + 1
+        from public.schedule_runs
+        where org_id = $1::uuid
+        """,
+        org_id,
+    )
+    rows = await conn.fetch(
+        """
+        select
+          id::text as id,
+          task_id::text as task_id,
+          technician_id::text as technician_id,
+          bay_id::text as bay_id,
+          start_at,
+          end_at,
+          is_locked,
+          why::text as why
+        from public.schedule_items
+        where org_id = $1::uuid
+          and published_seq is not null
+          and retired_seq is null
+        """,
+        org_id,
+    )
+    live = [
+        {**dict(row), "why": json.loads(row["why"]) if row["why"] is not None else None}
+        for row in rows
+    ]
+    
+    changes, inserts, retire_ids = diff_schedule(live, items, publish_seq)
+    
+    if retire_ids:
+        await conn.execute(
+            """
+            update public.schedule_items
+            set retired_seq = $2
+            where id = any($1::uuid[])
+            """,
+            retire_ids,
+            publish_seq,
+        )
+    
+    if inserts:
+        await conn.copy_records_to_table(
+            "schedule_items",
+            schema_name="public",
+            columns=ITEM_COLUMNS,
+            records=item_records(org_id, schedule_run_id, inserts, publish_seq),
+        )
+    
+    # Only tasks new to the live schedule can still be 'todo'
+    new_task_ids = [item.task_id for item in inserts]
+    if new_task_ids:
+        await conn.execute(
+            """
+            update public.tasks
+            set status = 'scheduled', updated_at = now()
+            where id = any($1::uuid[])
+              and status = 'todo'
+            """,
+            new_task_ids,
+        )
+    
+    logger.info(
+        "schedule_published",
+        extra={
+            "schedule_run_id": schedule_run_id,
+            **changes.to_dict(),
+            "inserted": len(inserts),
+            "retired": len(retire_ids),
+        },
+    )
+    
+    return changes
+
 
 async def save_schedule_result(
     pool: asyncpg.Pool,
     schedule_run_id: str,
     result: ScheduleResult,
+    org_id: str,
 ) -> None:
     """
     Save schedule result to database.
     
+    Successful results are published as a diff against the live schedule
+    (`metrics.changes`); changed items are written with a single COPY. The
+    schedule run row is updated last, so its `metrics.persist_lock_ms` covers
+    the time the transaction held locks on items and tasks.
+    
     Args:
         pool: Database connection pool
         schedule_run_id: Schedule run ID
         result: Schedule result to save
+        org_id: Organization ID of the run
     """
     logger.info(
         "saving_schedule_result",
@@ -36,6 +264,19 @@ async def save_schedule_result(
     
     async with pool.acquire() as conn:
         async with conn.transaction():
+            started = time.perf_counter()
+            
+            changes = None
+            if result.status == "succeeded":
+                changes = await _publish_items(conn, org_id, schedule_run_id, result.items)
+            
+            metrics = {
+                **result.metrics,
+                "persist_lock_ms": int((time.perf_counter() - started) * 1000),
+            }
+            if changes is not None:
+                metrics["changes"] = changes.to_dict()
+            
             # Update schedule_runs
             if result.status == "succeeded":
                 await conn.execute(
@@ -47,14 +288,20 @@ async def save_schedule_result(
                       objective_value = $3,
                       objective_breakdown = $4::jsonb,
                       task_count = $5,
+                      solver_status = $6,
+                      metrics = $7::jsonb,
+                      publish_seq = $8,
                       updated_at = now()
                     where id = $1::uuid
                     """,
                     schedule_run_id,
                     result.solver_wall_time_ms,
                     result.objective_value,
-                    result.objective_breakdown.to_dict() if result.objective_breakdown else None,
+                    json.dumps(result.objective_breakdown.to_dict()) if result.objective_breakdown else None,
                     len(result.items),
+                    result.metrics.get("solver_status"),
+                    json.dumps(metrics),
+                    changes.publish_seq,
                 )
             elif result.status == "infeasible":
                 await conn.execute(
@@ -65,12 +312,14 @@ async def save_schedule_result(
                       solver_status = 'INFEASIBLE',
                       solver_wall_time_ms = $2,
                       infeasible_reason = $3,
+                      metrics = $4::jsonb,
                       updated_at = now()
                     where id = $1::uuid
                     """,
                     schedule_run_id,
                     result.solver_wall_time_ms,
                     result.infeasible_reason,
+                    json.dumps(metrics),
                 )
             else:
                 await conn.execute(
@@ -80,77 +329,20 @@ async def save_schedule_result(
                       status = 'failed',
                       solver_wall_time_ms = $2,
                       infeasible_reason = $3,
+                      metrics = $4::jsonb,
                       updated_at = now()
                     where id = $1::uuid
                     """,
                     schedule_run_id,
                     result.solver_wall_time_ms,
                     result.infeasible_reason,
-                )
-            
-            # Delete old schedule items for this run
-            await conn.execute(
-                """
-                delete from public.schedule_items
-                where schedule_run_id = $1::uuid
-                """,
-                schedule_run_id,
-            )
-            
-            # Insert new schedule items
-            if result.items:
-                # Get org_id from schedule_run
-                org_id = await conn.fetchval(
-                    """
-                    select org_id::text from public.schedule_runs
-                    where id = $1::uuid
-                    """,
-                    schedule_run_id,
-                )
-                
-                # Prepare values for bulk insert
-                values = [
-                    (
-                        org_id,
-                        schedule_run_id,
-                        item.task_id,
-                        item.technician_id,
-                        item.bay_id,
-                        item.start_at,
-                        item.end_at,
-                        item.is_locked,
-                        item.why,
-                    )
-                    for item in result.items
-                ]
-                
-                await conn.executemany(
-                    """
-                    insert into public.schedule_items (
-                      org_id, schedule_run_id, task_id, technician_id, bay_id,
-                      start_at, end_at, is_locked, why
-                    )
-                    values ($1::uuid, $2::uuid, $3::uuid, $4::uuid, $5::uuid, $6, $7, $8, $9::jsonb)
-                    """,
-                    values,
-                )
-                
-                logger.info(
-                    "schedule_items_saved",
-                    extra={"schedule_run_id": schedule_run_id, "count": len(values)},
-                )
-            
-            # Update task statuses to 'scheduled'
-            if result.items:
-                task_ids = [item.task_id for item in result.items]
-                await conn.execute(
-                    """
-                    update public.tasks
-                    set status = 'scheduled', updated_at = now()
-                    where id = any($1::uuid[])
-                      and status = 'todo'
-                    """,
-                    task_ids,
+                    json.dumps(metrics),
                 )
     
-    logger.info("schedule_result_saved", extra={"schedule_run_id": schedule_run_id})
+    logger.info(
+        "schedule_result_saved",
+        extra={
+            "schedule_run_id": schedule_run_id,
+            "persist_lock_ms": metrics["persist_lock_ms"],
+        },
+    )
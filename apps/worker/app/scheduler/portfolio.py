@@ -0,0 +1,313 @@
+"""Portfolio runner racing several scheduling strategies in parallel.
+
+Each strategy runs in its own process under the same wall-clock budget. The
+best objective found so far is shared through a process-safe value; as soon as
+one strategy proves optimality, or a CP-SAT bound shows the shared incumbent is
+within the gap target, the others are told to stop. The winning strategy is
+recorded in the result metrics so defaults can be tuned from run history.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from dataclasses import replace
+from typing import Any
+
+from ortools.sat.python import cp_model
+
+from app.scheduler.cp_sat_scheduler import SchedulerModel
+from app.scheduler.decomposition import solve_decomposed
+from app.scheduler.heuristic import run_heuristic
+from app.scheduler.lns import run_lns
+from app.scheduler.models import ScheduleInput, ScheduleResult
+from app.scheduler.profiles import SolverProfile
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("cp_sat", "cp_sat_hinted", "decomposed", "heuristic", "lns")
+DEFAULT_STRATEGIES = ("cp_sat", "cp_sat_hinted", "decomposed", "heuristic")
+DEFAULT_GAP_TARGET = 0.01
+
+# Extra time allowed past the budget for strategies to stop and report back
+SHUTDOWN_GRACE_SECONDS = 5.0
+
+
+def relative_gap(objective: float, bound: float) -> float:
+    """Relative optimality gap of an objective against a lower bound."""
+    return max(0.0, objective - bound) / max(1.0, abs(objective))
+
+
+class _IncumbentCallback(cp_model.CpSolverSolutionCallback):
+    """Publishes improving solutions and stops once the gap target is met."""
+
+    def __init__(self, best_objective: Any, stop_event: Any, gap_target: float) -> None:
+        super().__init__()
+        self._best_objective = best_objective
+        self._stop_event = stop_event
+        self._gap_target = gap_target
+
+    def on_solution_callback(self) -> None:
+        objective = self.ObjectiveValue()
+        with self._best_objective.get_lock():
+            if objective < self._best_objective.value:
+                self._best_objective.value = objective
+            best = self._best_objective.value
+
+        # Our bound is a valid lower bound for the full problem, so it also
+        # certifies incumbents found by the other strategies.
+        if relative_gap(best, self.BestObjectiveBound()) <= self._gap_target:
+            self._stop_event.set()
+            self.StopSearch()
+
+
+def _run_strategy(
+    name: str,
+    input_data: ScheduleInput,
+    deadline: float,
+    num_workers: int,
+    gap_target: float,
+    profile: SolverProfile | None,
+    best_objective: Any,
+    stop_event: Any,
+    results: Any,
+) -> None:
+    """Process entry point: run one strategy and report its result."""
+    from app.core.logging import configure_logging
+
+    configure_logging()
+    started = time.perf_counter()
+    time_limit = max(1.0, deadline - time.time())
+
+    try:
+        if name == "heuristic":
+            result = run_heuristic(input_data)
+        elif name == "decomposed":
+            result = solve_decomposed(
+                input_data,
+                time_limit,
+                num_workers=num_workers,
+                stop_event=stop_event,
+            )
+        elif name == "lns":
+            result = run_lns(
+                input_data,
+                time_limit,
+                num_workers=num_workers,
+                stop_event=stop_event,
+            )
+        elif name in ("cp_sat", "cp_sat_hinted"):
+            model = SchedulerModel(input_data)
+            model.build()
+            if name == "cp_sat_hinted":
+                seed = run_heuristic(input_data)
+                if seed.status == "succeeded":
+                    model.add_solution_hint(seed.items)
+            result = model.solve(
+                max(1.0, deadline - time.time()),
+                num_workers=num_workers,
+                profile=profile,
+                solution_callback=_IncumbentCallback(best_objective, stop_event, gap_target),
+                stop_event=stop_event,
+            )
+        else:
+            raise ValueError(f"Unknown portfolio strategy: {name}")
+
+        if result.status == "succeeded" and result.objective_value is not None:
+            with best_objective.get_lock():
+                if result.objective_value < best_objective.value:
+                    best_objective.value = result.objective_value
+
+    except Exception as e:
+        logger.error(
+            "portfolio_strategy_error",
+            extra={"strategy": name, "error": str(e)},
+            exc_info=True,
+        )
+        result = ScheduleResult(
+            status="failed",
+            items=[],
+            solver_wall_time_ms=int((time.perf_counter() - started) * 1000),
+            objective_value=None,
+            objective_breakdown=None,
+            infeasible_reason=f"{type(e).__name__}: {str(e)}",
+        )
+
+    results.put((name, result))
+
+
+def _is_conclusive(name: str, result: ScheduleResult, gap_target: float) -> bool:
+    """Whether a strategy result makes the rest of the race pointless."""
+    if name not in ("cp_sat", "cp_sat_hinted"):
+        return False
+    solver_status = result.metrics.get("solver_status")
+    if solver_status in ("OPTIMAL", "INFEASIBLE"):
+        return True
+    bound = result.metrics.get("best_objective_bound")
+    if result.status == "succeeded" and bound is not None:
+        return relative_gap(result.objective_value, bound) <= gap_target
+    return False
+
+
+def run_portfolio(
+    input_data: ScheduleInput,
+    time_limit_seconds: float = 30,
+    *,
+    strategies: list[str] | tuple[str, ...] = DEFAULT_STRATEGIES,
+    gap_target: float = DEFAULT_GAP_TARGET,
+    profile: SolverProfile | None = None,
+    stop_event: Any = None,
+) -> ScheduleResult:
+    """
+    Race several strategies and return the best schedule.
+
+    Args:
+        input_data: Schedule input data
+        time_limit_seconds: Wall-clock budget shared by all strategies
+        strategies: Strategy names to launch (subset of STRATEGIES)
+        gap_target: Relative gap at which a solution is good enough to stop
+        profile: Solver parameter profile for the full CP-SAT strategies; the
+            worker count is still split between strategies
+        stop_event: Optional threading event; when set, the strategies are
+            stopped as if the budget had run out
+
+    Returns:
+        ScheduleResult of the winning strategy, with per-strategy stats in
+        `metrics["portfolio"]`
+    """
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown portfolio strategies: {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    deadline = time.time() + time_limit_seconds
+
+    # Split cores between the CP-SAT based strategies instead of oversubscribing
+    solver_count = sum(1 for s in strategies if s != "heuristic") or 1
+    num_workers = max(1, (os.cpu_count() or 1) // solver_count)
+
+    ctx = multiprocessing.get_context("spawn")
+    best_objective = ctx.Value("d", float("inf"))
+    stop_all = ctx.Event()
+    results = ctx.Queue()
+
+    logger.info(
+        "portfolio_started",
+        extra={
+            "strategies": list(strategies),
+            "time_limit": time_limit_seconds,
+            "num_workers": num_workers,
+        },
+    )
+
+    processes = {
+        name: ctx.Process(
+            target=_run_strategy,
+            args=(
+                name,
+                input_data,
+                deadline,
+                num_workers,
+                gap_target,
+                profile,
+                best_objective,
+                stop_all,
+                results,
+            ),
+            daemon=True,
+        )
+        for name in strategies
+    }
+    for process in processes.values():
+        process.start()
+
+    finished: dict[str, ScheduleResult] = {}
+    finish_order: list[str] = []
+    conclusive: str | None = None
+
+    while len(finished) < len(processes):
+        now = time.time()
+        if stop_event is not None and stop_event.is_set() and now < deadline:
+            deadline = now
+        if now >= deadline:
+            stop_all.set()
+        if now >= deadline + SHUTDOWN_GRACE_SECONDS:
+            break
+        try:
+            name, result = results.get(timeout=0.2)
+        except queue.Empty:
+            continue
+
+        finished[name] = result
+        finish_order.append(name)
+        if conclusive is None and _is_conclusive(name, result, gap_target):
+            conclusive = name
+            stop_all.set()
+
+    for name, process in processes.items():
+        process.join(timeout=0.5)
+        if process.is_alive():
+            logger.warning("portfolio_strategy_terminated", extra={"strategy": name})
+            process.terminate()
+            process.join()
+
+    wall_time_ms = int((time.perf_counter() - started) * 1000)
+
+    stats = {
+        name: {
+            "status": finished[name].status if name in finished else "terminated",
+            "objective_value": finished[name].objective_value if name in finished else None,
+            "wall_time_ms": finished[name].solver_wall_time_ms if name in finished else None,
+            "solver_status": finished[name].metrics.get("solver_status") if name in finished else None,
+        }
+        for name in strategies
+    }
+
+    succeeded = [
+        (result.objective_value, finish_order.index(name), name)
+        for name, result in finished.items()
+        if result.status == "succeeded" and result.objective_value is not None
+    ]
+
+    if succeeded:
+        winner = min(succeeded)[2]
+    elif conclusive is not None:
+        # A full CP-SAT model proved infeasibility
+        winner = conclusive
+    elif finish_order:
+        winner = finish_order[0]
+    else:
+        winner = None
+
+    portfolio_metrics = {
+        "winner": winner,
+        "conclusive": conclusive,
+        "gap_target": gap_target,
+        "strategies": stats,
+    }
+
+    logger.info(
+        "portfolio_complete",
+        extra={"winner": winner, "conclusive": conclusive, "wall_time_ms": wall_time_ms},
+    )
+
+    if winner is None:
+        return ScheduleResult(
+            status="failed",
+            items=[],
+            solver_wall_time_ms=wall_time_ms,
+            objective_value=None,
+            objective_breakdown=None,
+            infeasible_reason="No portfolio strategy reported a result",
+            metrics={"portfolio": portfolio_metrics},
+        )
+
+    result = finished[winner]
+    return replace(
+        result,
+        solver_wall_time_ms=wall_time_ms,
+        metrics={**result.metrics, "strategy": winner, "portfolio": portfolio_metrics},
+    )
@@ -0,0 +1,120 @@
+"""Named CP-SAT parameter profiles.
+
+A profile bundles the solver parameters beyond the time limit: worker count,
+linearization level, search branching, presolve and the relative gap at which
+CP-SAT may stop early. Runs pick a profile explicitly (job payload), through
+their org's `organizations.scheduler_profile`, or automatically from the task
+count. The size buckets are tuned offline with `benchmarks/tune_profiles.py`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from ortools.sat import sat_parameters_pb2
+
+
+@dataclass(frozen=True)
+class SolverProfile:
+    """CP-SAT parameters applied on top of the time limit."""
+
+    name: str
+    num_workers: int | None  # None: one worker per core
+    linearization_level: int
+    search_branching: str  # SatParameters.SearchBranching value name
+    cp_model_presolve: bool
+    relative_gap_limit: float
+
+    def apply(self, parameters: sat_parameters_pb2.SatParameters) -> None:
+        """Write this profile into solver parameters."""
+        if self.num_workers:
+            parameters.num_workers = self.num_workers
+        parameters.linearization_level = self.linearization_level
+        parameters.search_branching = sat_parameters_pb2.SatParameters.SearchBranching.Value(
+            self.search_branching
+        )
+        parameters.cp_model_presolve = self.cp_model_presolve
+        parameters.relative_gap_limit = self.relative_gap_limit
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        return asdict(self)
+
+
+PROFILES: dict[str, SolverProfile] = {
+    # Few workers, no LP relaxation: first good solution as fast as possible
+    "fast": SolverProfile(
+        name="fast",
+        num_workers=4,
+        linearization_level=0,
+        search_branching="AUTOMATIC_SEARCH",
+        cp_model_presolve=True,
+        relative_gap_limit=0.05,
+    ),
+    # CP-SAT defaults, stopping at a 1% gap
+    "balanced": SolverProfile(
+        name="balanced",
+        num_workers=8,
+        linearization_level=1,
+        search_branching="AUTOMATIC_SEARCH",
+        cp_model_presolve=True,
+        relative_gap_limit=0.01,
+    ),
+    # Every core and the full LP relaxation, searching until proven optimal
+    "thorough": SolverProfile(
+        name="thorough",
+        num_workers=None,
+        linearization_level=2,
+        search_branching="AUTOMATIC_SEARCH",
+        cp_model_presolve=True,
+        relative_gap_limit=0.0,
+    ),
+}
+
+# (max unlocked tasks, profile) in ascending order; larger runs use the last profile
+SIZE_BUCKETS: tuple[tuple[int | None, str], ...] = (
+    (100, "thorough"),
+    (1000, "balanced"),
+    (None, "fast"),
+)
+
+
+def size_bucket(task_count: int) -> int | None:
+    """Upper bound of the size bucket a task count falls into (None: unbounded)."""
+    for max_tasks, _ in SIZE_BUCKETS:
+        if max_tasks is None or task_count <= max_tasks:
+            return max_tasks
+    return None
+
+
+def get_profile(name: str) -> SolverProfile:
+    """
+    Look up a profile by name.
+
+    Raises:
+        ValueError: If no profile has that name
+    """
+    profile = PROFILES.get(name)
+    if profile is None:
+        raise ValueError(
+            f"Unknown solver profile: {name} (expected one of {', '.join(PROFILES)})"
+        )
+    return profile
+
+
+def select_profile(task_count: int, name: str | None = None) -> SolverProfile:
+    """
+    Resolve the profile for a run.
+
+    Args:
+        task_count: Number of unlocked tasks in the run
+        name: Explicitly requested profile (per run or per org), if any
+
+    Returns:
+        The named profile, or the one configured for the task count's size bucket
+    """
+    if name:
+        return get_profile(name)
+    bucket = size_bucket(task_count)
+    return get_profile(next(p for max_tasks, p in SIZE_BUCKETS if max_tasks == bucket))
@@ -0,0 +1,187 @@
+"""Per-org cache of scheduler reference data.
+
+Technicians, skills and bays change a few times a week but were reloaded on
+every schedule run. The worker keeps them in memory per org and only fetches
+volatile data (tasks, locks, work orders) per run.
+
+Entries are evicted by Postgres notifications: triggers on the reference
+tables (migration 0010) `pg_notify` the org and table on every change, and a
+LISTEN connection drops the org's entry. Entries also expire after a TTL, as a
+safety net for notifications missed while the listener was reconnecting.
+
+LISTEN needs its own direct or session-mode connection (`LISTEN_DATABASE_URL`,
+see `connect_listener`). Without one, or while it is down, entries expire
+after a short TTL instead, so a change is picked up within seconds rather
+than after the full TTL.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+
+from app.core.config import settings
+from app.db.session import connect_listener
+from app.scheduler.models import Bay, Technician
+
+logger = logging.getLogger(__name__)
+
+# Channel the 0010 triggers notify on; payload is {"org_id": ..., "table": ...}
+NOTIFY_CHANNEL = "scheduler_reference_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceData:
+    """Cached reference data for one org."""
+
+    technicians: list[Technician]
+    bays: list[Bay]
+    loaded_at: float  # time.monotonic()
+
+
+class ReferenceCache:
+    """In-memory reference data per org, invalidated by LISTEN/NOTIFY."""
+
+    def __init__(self, ttl_seconds: float, unlistened_ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.unlistened_ttl_seconds = unlistened_ttl_seconds
+        self._entries: dict[str, ReferenceData] = {}
+        # Bumped on every invalidation, so a load that raced a change is not cached
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self._conn: asyncpg.Connection | None = None
+
+    @property
+    def listening(self) -> bool:
+        """True while the LISTEN connection is up."""
+        return self._conn is not None and not self._conn.is_closed()
+
+    @property
+    def current_ttl(self) -> float:
+        """Entry lifetime: the full TTL while listening, the short one otherwise."""
+        if self.listening:
+            return self.ttl_seconds
+        return min(self.ttl_seconds, self.unlistened_ttl_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        """True when entries are cached at all."""
+        return self.current_ttl > 0
+
+    def generation(self, org_id: str) -> int:
+        """Invalidation counter for an org; pass it back to `put`."""
+        return self._epoch + self._generations.get(org_id, 0)
+
+    def get(self, org_id: str) -> ReferenceData | None:
+        """Cached reference data for an org, or None on a miss."""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(org_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > self.current_ttl:
+            del self._entries[org_id]
+            return None
+        return entry
+
+    def put(
+        self,
+        org_id: str,
+        technicians: list[Technician],
+        bays: list[Bay],
+        generation: int,
+    ) -> None:
+        """
+        Cache an org's reference data.
+
+        Args:
+            org_id: Organization ID
+            technicians: Technicians with skills
+            bays: Active bays
+            generation: `generation(org_id)` read before the data was loaded;
+                the data is dropped if the org was invalidated since
+        """
+        if not self.enabled or generation != self.generation(org_id):
+            return
+        self._entries[org_id] = ReferenceData(
+            technicians=technicians,
+            bays=bays,
+            loaded_at=time.monotonic(),
+        )
+
+    def invalidate(self, org_id: str | None = None) -> None:
+        """Drop one org's entry, or every entry when org_id is None."""
+        if org_id is None:
+            self._entries.clear()
+            self._epoch += 1
+        else:
+            self._entries.pop(org_id, None)
+            self._generations[org_id] = self._generations.get(org_id, 0) + 1
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            org_id = json.loads(payload)["org_id"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("reference_cache_bad_payload", extra={"payload": payload})
+            self.invalidate()
+            return
+        self.invalidate(org_id)
+        logger.info("reference_cache_invalidated", extra={"org_id": org_id, "payload": payload})
+
+    def _on_terminate(self, conn: Any) -> None:
+        # Notifications may have been missed; start over once reconnected
+        logger.warning("reference_cache_listener_lost")
+        self.invalidate()
+
+    async def ensure_listening(self) -> None:
+        """
+        Start (or restart) the LISTEN connection.
+
+        Holds one dedicated connection for the worker's lifetime. Does nothing
+        without `LISTEN_DATABASE_URL`; failures are logged and leave the cache
+        on its short TTL until the next call.
+        """
+        if self.ttl_seconds <= 0 or self.listening:
+            return
+        await self.stop()
+        try:
+            conn = await connect_listener()
+        except Exception as e:
+            logger.warning("reference_cache_listen_failed", extra={"error": str(e)})
+            return
+        if conn is None:
+            return
+        try:
+            await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except Exception as e:
+            logger.warning("reference_cache_listen_failed", extra={"error": str(e)})
+            await conn.close()
+            return
+        conn.add_termination_listener(self._on_terminate)
+        self._conn = conn
+        # Entries cached before the listener may be stale by up to the short TTL
+        self.invalidate()
+        logger.info("reference_cache_listening", extra={"channel": NOTIFY_CHANNEL})
+
+    async def stop(self) -> None:
+        """Stop listening and close the connection."""
+        conn = self._conn
+        self._conn = None
+        self.invalidate()
+        if conn is None:
+            return
+        conn.remove_termination_listener(self._on_terminate)
+        if not conn.is_closed():
+            await conn.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+            await conn.close()
+
+
+reference_cache = ReferenceCache(
+    ttl_seconds=settings.scheduler_reference_cache_ttl_seconds,
+    unlistened_ttl_seconds=settings.scheduler_reference_cache_unlistened_ttl_seconds,
+)
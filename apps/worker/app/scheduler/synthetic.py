@@ -0,0 +1,134 @@
+"""Synthetic schedule instances for benchmarks and solver tuning.
+
+Generates inputs shaped like real shop data (work orders of a few tasks, mixed
+skills and bay types, some locked tasks) at arbitrary scale, sized so the
+horizon has enough technician and bay capacity for every task.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.scheduler.models import Bay, ScheduleInput, Task, Technician, WorkOrder
+
+SKILLS = ("engine", "electrical", "brakes", "hydraulics", "diesel_diagnosis")
+BAY_TYPES = ("standard", "heavy_lift")
+TASK_TYPES = ("diagnose", "repair", "qa_test", "road_test", "cleanup", "paperwork")
+
+
+def generate_instance(
+    task_count: int,
+    *,
+    seed: int = 0,
+    horizon_days: int = 14,
+    utilization: float = 0.7,
+    locked_fraction: float = 0.02,
+    horizon_start: datetime | None = None,
+) -> ScheduleInput:
+    """
+    Generate a synthetic schedule input.
+
+    Args:
+        task_count: Number of tasks to generate
+        seed: Random seed (same seed, same instance)
+        horizon_days: Length of the scheduling horizon
+        utilization: Target share of technician/bay capacity used by tasks
+        locked_fraction: Share of tasks that are locked in place
+        horizon_start: Start of the horizon (defaults to a fixed Monday)
+
+    Returns:
+        ScheduleInput with generated tasks, technicians, bays and work orders
+    """
+    rng = random.Random(seed)
+    if horizon_start is None:
+        horizon_start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    horizon_end = horizon_start + timedelta(days=horizon_days)
+    horizon_minutes = horizon_days * 24 * 60
+
+    durations = []
+    for _ in range(task_count):
+        low = rng.randrange(30, 180, 15)
+        durations.append((low, low + rng.randrange(0, 90, 15)))
+    total_minutes = sum((low + high) // 2 for low, high in durations)
+    resource_count = max(2, int(total_minutes / (horizon_minutes * utilization)) + 1)
+
+    technicians = [
+        Technician(
+            id=f"tech-{i}",
+            name=f"Technician {i}",
+            skills=rng.sample(SKILLS, rng.randint(2, 4)),
+            efficiency_multiplier=1.0,
+            wip_limit=3,
+        )
+        for i in range(resource_count)
+    ]
+    bays = [
+        Bay(
+            id=f"bay-{i}",
+            name=f"Bay {i}",
+            bay_type=BAY_TYPES[i % len(BAY_TYPES)],
+            capacity=1,
+            is_active=True,
+        )
+        for i in range(resource_count)
+    ]
+
+    work_orders: dict[str, WorkOrder] = {}
+    tasks: list[Task] = []
+    locked_count = int(task_count * locked_fraction)
+    # Locked tasks are laid out round-robin over resources so they never collide
+    locked_slot = horizon_minutes // max(1, -(-locked_count // resource_count))
+
+    index = 0
+    while index < task_count:
+        wo_id = f"wo-{len(work_orders)}"
+        work_orders[wo_id] = WorkOrder(
+            id=wo_id,
+            priority=rng.randint(1, 5),
+            due_date=horizon_start + timedelta(minutes=rng.randrange(horizon_minutes // 4, horizon_minutes)),
+            parts_ready=rng.random() < 0.85,
+        )
+
+        for _ in range(min(rng.randint(1, 5), task_count - index)):
+            low, high = durations[index]
+            is_locked = index < locked_count
+            locked_start = None
+            locked_end = None
+            if is_locked:
+                locked_start = horizon_start + timedelta(
+                    minutes=(index // resource_count) * locked_slot
+                )
+                locked_end = locked_start + timedelta(minutes=(low + high) // 2)
+
+            tasks.append(Task(
+                id=f"task-{index}",
+                work_order_id=wo_id,
+                type=rng.choice(TASK_TYPES),
+                status="todo",
+                required_skill=rng.choice(SKILLS) if rng.random() < 0.6 else None,
+                required_skill_is_hard=rng.random() < 0.3,
+                required_bay_type=rng.choice(BAY_TYPES) if rng.random() < 0.4 else None,
+                earliest_start=None,
+                latest_finish=None,
+                duration_minutes_low=low,
+                duration_minutes_high=high,
+                is_locked=is_locked,
+                locked_tech_id=technicians[index % resource_count].id if is_locked else None,
+                locked_bay_id=bays[index % resource_count].id if is_locked else None,
+                locked_start_at=locked_start,
+                locked_end_at=locked_end,
+                duration_minutes=(low + high) // 2,
+            ))
+            index += 1
+
+    return ScheduleInput(
+        org_id="synthetic-org",
+        schedule_run_id=f"synthetic-{task_count}-{seed}",
+        horizon_start=horizon_start,
+        horizon_end=horizon_end,
+        tasks=tasks,
+        technicians=technicians,
+        bays=bays,
+        work_orders=work_orders,
+    )
@@ -0,0 +1,301 @@
+"""Schedule validation before persistence.
+
+Checks any engine's output (CP-SAT, heuristic, LNS, decomposition) against the
+input it was built from, independently of how it was produced:
+
+- no technician or bay runs two tasks at once (sweep line per resource)
+- hard skill and bay type requirements
+- time windows, horizon bounds and task durations
+- locked tasks keep their technician, bay and times
+- every unlocked task is scheduled exactly once, on known resources
+
+Overlaps between two locked tasks come from hand-edited locks rather than from
+the engine, so they are reported as warnings; everything else is an error.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from app.scheduler.arrays import minute_offsets
+from app.scheduler.models import ScheduleInput, ScheduleItem
+
+logger = logging.getLogger(__name__)
+
+# Violations stored per report; the counts always cover all of them
+MAX_REPORTED_VIOLATIONS = 50
+
+
+@dataclass(slots=True)
+class Violation:
+    """A single constraint violation."""
+
+    kind: str
+    severity: str  # error, warning
+    task_ids: list[str]
+    message: str
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        return {
+            "kind": self.kind,
+            "severity": self.severity,
+            "task_ids": self.task_ids,
+            "message": self.message,
+        }
+
+
+@dataclass(slots=True)
+class ValidationReport:
+    """Outcome of validating one schedule."""
+
+    checked_items: int
+    wall_time_ms: float
+    violations: list[Violation] = field(default_factory=list)
+
+    @property
+    def errors(self) -> list[Violation]:
+        return [v for v in self.violations if v.severity == "error"]
+
+    @property
+    def warnings(self) -> list[Violation]:
+        return [v for v in self.violations if v.severity == "warning"]
+
+    @property
+    def is_valid(self) -> bool:
+        """True when there are no errors (warnings allowed)."""
+        return not self.errors
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        counts: dict[str, int] = {}
+        for violation in self.violations:
+            counts[violation.kind] = counts.get(violation.kind, 0) + 1
+        return {
+            "valid": self.is_valid,
+            "checked_items": self.checked_items,
+            "wall_time_ms": round(self.wall_time_ms, 2),
+            "error_count": len(self.errors),
+            "warning_count": len(self.warnings),
+            "counts": counts,
+            "violations": [
+                v.to_dict() for v in self.violations[:MAX_REPORTED_VIOLATIONS]
+            ],
+        }
+
+
+def _overlapping_pairs(
+    resource: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+) -> list[tuple[int, int]]:
+    """
+    Sweep line over intervals grouped by resource.
+
+    Sorts by (resource, start) and compares each interval with the running
+    maximum end of the earlier intervals on the same resource.
+
+    Returns:
+        (earlier, later) item index pairs that overlap; each overlapping
+        interval is reported once, against the interval ending latest before it
+    """
+    candidates = np.flatnonzero(resource >= 0)
+    if len(candidates) < 2:
+        return []
+
+    order = candidates[np.lexsort((start[candidates], resource[candidates]))]
+    res = resource[order].astype(np.int64)
+    starts = start[order].astype(np.int64)
+    ends = end[order].astype(np.int64)
+    count = len(order)
+
+    # Encode (resource, end, position) in one int64 so a single running max
+    # yields both the latest end so far and the interval it belongs to
+    end_min = int(ends.min())
+    span = int(ends.max()) - end_min + 1
+    group_size = span * count
+    keys = res * group_size + (ends - end_min) * count + np.arange(count)
+    running = np.maximum.accumulate(keys)
+
+    prev = running[:-1]
+    prev_group = prev // group_size
+    prev_end = (prev % group_size) // count + end_min
+    prev_pos = prev % count
+
+    hits = np.flatnonzero((prev_group == res[1:]) & (starts[1:] < prev_end))
+    return [(int(order[prev_pos[i]]), int(order[i + 1])) for i in hits]
+
+
+def validate_schedule(
+    input_data: ScheduleInput,
+    items: list[ScheduleItem],
+) -> ValidationReport:
+    """
+    Validate a schedule against its input.
+
+    Args:
+        input_data: Schedule input the items were produced from
+        items: Schedule items (unlocked and locked)
+
+    Returns:
+        ValidationReport with structured violations
+    """
+    started = time.perf_counter()
+    violations: list[Violation] = []
+    arrays = input_data.arrays
+    tables = input_data.resource_tables
+    task_row = {t.id: row for row, t in enumerate(input_data.tasks)}
+    count = len(items)
+
+    task_ids = [item.task_id for item in items]
+    rows = np.array([task_row.get(task_id, -1) for task_id in task_ids], dtype=np.int64)
+    techs = np.array(
+        [tables.tech_index.get(item.technician_id, -1) for item in items], dtype=np.int64
+    )
+    bays = np.array([tables.bay_index.get(item.bay_id, -1) for item in items], dtype=np.int64)
+    base = input_data.horizon_start
+    starts = minute_offsets([item.start_at for item in items], base, 0)
+    ends = minute_offsets([item.end_at for item in items], base, 0)
+
+    def report(kind: str, indices: np.ndarray, message: str, severity: str = "error") -> None:
+        for i in indices.tolist():
+            violations.append(Violation(
+                kind=kind,
+                severity=severity,
+                task_ids=[task_ids[i]],
+                message=message.format(task_id=task_ids[i]),
+            ))
+
+    # Coverage: known tasks, each scheduled once, every unlocked task present
+    known = rows >= 0
+    report("unknown_task", np.flatnonzero(~known), "Task {task_id} is not in the schedule input")
+    scheduled = np.zeros(len(input_data.tasks), dtype=np.int64)
+    np.add.at(scheduled, rows[known], 1)
+    for row in np.flatnonzero(scheduled > 1).tolist():
+        task_id = input_data.tasks[row].id
+        violations.append(Violation(
+            kind="duplicate_task",
+            severity="error",
+            task_ids=[task_id],
+            message=f"Task {task_id} is scheduled {scheduled[row]} times",
+        ))
+    for row in np.flatnonzero((scheduled == 0) & ~arrays.is_locked).tolist():
+        task_id = input_data.tasks[row].id
+        violations.append(Violation(
+            kind="missing_task",
+            severity="error",
+            task_ids=[task_id],
+            message=f"Task {task_id} is not scheduled",
+        ))
+
+    # Per-item checks on tasks from the input
+    known_rows = np.where(known, rows, 0)
+    locked = known & arrays.is_locked[known_rows]
+    unlocked = known & ~locked
+
+    report(
+        "unknown_resource",
+        np.flatnonzero(unlocked & ((techs < 0) | (bays < 0))),
+        "Task {task_id} is assigned to an unknown technician or bay",
+    )
+    report(
+        "invalid_interval",
+        np.flatnonzero(known & (ends < starts)),
+        "Task {task_id} ends before it starts",
+    )
+    report(
+        "duration",
+        np.flatnonzero(unlocked & (ends - starts != arrays.duration[known_rows])),
+        "Task {task_id} is not scheduled for its planned duration",
+    )
+    report(
+        "horizon",
+        np.flatnonzero(unlocked & ((starts < 0) | (ends > arrays.horizon_minutes))),
+        "Task {task_id} is scheduled outside the horizon",
+    )
+    report(
+        "time_window",
+        np.flatnonzero(
+            unlocked
+            & ((starts < arrays.earliest[known_rows]) | (ends > arrays.latest[known_rows]))
+        ),
+        "Task {task_id} is scheduled outside its earliest start / latest finish window",
+    )
+
+    # Eligibility bitsets already encode hard skills and bay types (with the
+    # same "no resource qualifies" fallback as the model)
+    def has_bit(bitsets: np.ndarray, resource: np.ndarray) -> np.ndarray:
+        safe = np.maximum(resource, 0)
+        byte = bitsets[known_rows, safe >> 3] if bitsets.shape[1] else np.zeros(count, np.uint8)
+        return ((byte >> (7 - (safe & 7))) & 1).astype(bool)
+
+    if count:
+        report(
+            "skill",
+            np.flatnonzero(unlocked & (techs >= 0) & ~has_bit(arrays.eligible_techs, techs)),
+            "Task {task_id} is assigned to a technician without its required skill",
+        )
+        report(
+            "bay_type",
+            np.flatnonzero(unlocked & (bays >= 0) & ~has_bit(arrays.eligible_bays, bays)),
+            "Task {task_id} is assigned to a bay of the wrong type",
+        )
+
+    # Locked tasks must come back exactly as locked
+    times_changed = arrays.has_lock_times[known_rows] & (
+        (starts != arrays.lock_start[known_rows]) | (ends != arrays.lock_end[known_rows])
+    )
+    lock_changed = locked & (
+        (techs != arrays.lock_tech[known_rows])
+        | (bays != arrays.lock_bay[known_rows])
+        | times_changed
+    )
+    # Locks on technicians/bays outside the input can only be compared by ID
+    for i in np.flatnonzero(locked & ((techs < 0) | (bays < 0))).tolist():
+        task = input_data.tasks[rows[i]]
+        lock_changed[i] = bool(times_changed[i]) or (
+            (items[i].technician_id, items[i].bay_id)
+            != (task.locked_tech_id, task.locked_bay_id)
+        )
+    report("lock_changed", np.flatnonzero(lock_changed), "Locked task {task_id} was moved")
+
+    # Overlaps per technician and per bay
+    for kind, resource in (("technician_overlap", techs), ("bay_overlap", bays)):
+        for earlier, later in _overlapping_pairs(resource, starts, ends):
+            both_locked = bool(locked[earlier] and locked[later])
+            resource_id = (
+                items[later].technician_id if kind == "technician_overlap" else items[later].bay_id
+            )
+            violations.append(Violation(
+                kind=kind,
+                severity="warning" if both_locked else "error",
+                task_ids=[task_ids[earlier], task_ids[later]],
+                message=(
+                    f"Tasks {task_ids[earlier]} and {task_ids[later]} overlap on "
+                    f"{'technician' if kind == 'technician_overlap' else 'bay'} {resource_id}"
+                    + (" (both locked)" if both_locked else "")
+                ),
+            ))
+
+    validation = ValidationReport(
+        checked_items=count,
+        wall_time_ms=(time.perf_counter() - started) * 1000,
+        violations=violations,
+    )
+
+    logger.info(
+        "schedule_validated",
+        extra={
+            "items": count,
+            "errors": len(validation.errors),
+            "warnings": len(validation.warnings),
+            "wall_time_ms": round(validation.wall_time_ms, 2),
+        },
+    )
+
+    return validation
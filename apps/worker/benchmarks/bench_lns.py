@@ -0,0 +1,79 @@
+"""Benchmark LNS on synthetic instances against a relaxation lower bound.
+
+The bound relaxes the instance to min(technicians, bays) identical machines
+without eligibility, locks or due dates: the priority delay term is then at
+least the single-machine WSPT start times spread over the machines (one
+minute is lost per task to integer rounding), and the parts term is fixed.
+It ignores skills, bay types and fragmentation, so the real gap is smaller
+than the reported one.
+
+Usage (from apps/worker):
+    python -m benchmarks.bench_lns --tasks 2000 10000 --seconds 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from app.scheduler.cp_sat_scheduler import OBJECTIVE_WEIGHTS
+from app.scheduler.heuristic import run_heuristic
+from app.scheduler.lns import run_lns
+from app.scheduler.models import ScheduleInput
+from app.scheduler.synthetic import generate_instance
+
+
+def lower_bound(input_data: ScheduleInput) -> int:
+    """Relaxation lower bound on the objective (see module docstring)."""
+    machines = max(1, min(len(input_data.technicians), len(input_data.bays)))
+    jobs = []
+    parts = 0
+    for task in input_data.get_unlocked_tasks():
+        wo = input_data.work_orders.get(task.work_order_id)
+        if wo is None:
+            continue
+        if not wo.parts_ready:
+            parts += 100
+        jobs.append(((6 - wo.priority) / 100, max(1, task.duration_minutes)))
+    jobs.sort(key=lambda job: job[0] / job[1], reverse=True)
+
+    elapsed = 0
+    weighted_starts = 0.0
+    for weight, duration in jobs:
+        weighted_starts += weight * elapsed
+        elapsed += duration
+    priority = max(0.0, weighted_starts / machines - len(jobs))
+    return int(
+        OBJECTIVE_WEIGHTS["priority"] * priority
+        + OBJECTIVE_WEIGHTS["parts_not_ready"] * parts
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=2)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(
+        f"{'tasks':>6} {'heuristic':>10} {'start':>10} {'lns':>10} "
+        f"{'bound':>10} {'gap':>6} {'iters':>6} {'start from':>10}"
+    )
+    for task_count in args.tasks:
+        input_data = generate_instance(task_count, seed=args.seed)
+        heuristic = run_heuristic(input_data)
+        result = run_lns(input_data, args.seconds)
+        stats = result.metrics["lns"]
+        bound = lower_bound(input_data)
+        gap = (result.objective_value - bound) / result.objective_value
+        print(
+            f"{task_count:>6} {heuristic.objective_value:>10} {stats['initial_objective']:>10} "
+            f"{result.objective_value:>10} {bound:>10} {gap:>6.1%} "
+            f"{stats['iterations']:>6} {stats['construction']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark CP-SAT model build time on synthetic instances.
+
+Usage (from apps/worker):
+    python -m benchmarks.bench_model_build --tasks 500 2000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.scheduler.cp_sat_scheduler import BUILD_MS_PER_TASK_TARGET, SchedulerModel
+from app.scheduler.synthetic import generate_instance
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>7} {'vars':>8} {'constraints':>12} {'median ms':>10} {'target ms':>10}")
+    for task_count in args.tasks:
+        input_data = generate_instance(task_count, seed=args.seed)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            model = SchedulerModel(input_data)
+            model.build()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        proto = model.model.Proto()
+        target = max(50, task_count * BUILD_MS_PER_TASK_TARGET)
+        print(
+            f"{task_count:>7} {len(proto.variables):>8} {len(proto.constraints):>12} "
+            f"{statistics.median(timings):>10.1f} {target:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
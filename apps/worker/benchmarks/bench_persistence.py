@@ -0,0 +1,95 @@
+"""Benchmark writing schedule items: executemany INSERT vs COPY.
+
+Writes into a temporary copy of `public.schedule_items` (same columns, no
+foreign keys), so no org, tasks or resources are needed and nothing persists.
+
+Usage (from apps/worker, with DATABASE_URL set):
+    python -m benchmarks.bench_persistence --items 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.db.session import close_pool, get_pool
+from app.scheduler.models import ScheduleItem
+from app.scheduler.persistence import ITEM_COLUMNS, item_records
+
+TABLE = "bench_schedule_items"
+
+
+def make_items(count: int) -> list[ScheduleItem]:
+    start = datetime(2026, 1, 5, 8, tzinfo=timezone.utc)
+    techs = [str(uuid.uuid4()) for _ in range(50)]
+    bays = [str(uuid.uuid4()) for _ in range(20)]
+    return [
+        ScheduleItem(
+            task_id=str(uuid.uuid4()),
+            technician_id=techs[i % len(techs)],
+            bay_id=bays[i % len(bays)],
+            start_at=start + timedelta(minutes=30 * i),
+            end_at=start + timedelta(minutes=30 * i + 25),
+            is_locked=False,
+            why={
+                "reason": "optimized",
+                "penalty_contributions": {
+                    "due_date": 0, "priority": i % 40, "skill_mismatch": 0, "parts_not_ready": 0,
+                },
+                "binding": [{"type": "technician", "task_id": str(uuid.uuid4()), "locked": False}],
+            },
+        )
+        for i in range(count)
+    ]
+
+
+async def insert_executemany(conn, records) -> None:
+    await conn.executemany(
+        f"""
+        insert into {TABLE} ({", ".join(ITEM_COLUMNS)})
+        values ($1::uuid, $2::uuid, $3::uuid, $4::uuid, $5::uuid, $6, $7, $8, $9::jsonb, $10)
+        """,
+        records,
+    )
+
+
+async def insert_copy(conn, records) -> None:
+    await conn.copy_records_to_table(TABLE, columns=ITEM_COLUMNS, records=records)
+
+
+async def run(count: int, repeat: int) -> None:
+    pool = await get_pool()
+    records = item_records(str(uuid.uuid4()), str(uuid.uuid4()), make_items(count))
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute(
+                f"create temp table {TABLE} (like public.schedule_items including defaults)"
+            )
+            print(f"{'method':>12} {'items':>7} {'median ms':>10} {'min ms':>8}")
+            for name, insert in (("executemany", insert_executemany), ("copy", insert_copy)):
+                timings = []
+                for _ in range(repeat):
+                    await conn.execute(f"truncate {TABLE}")
+                    started = time.perf_counter()
+                    async with conn.transaction():
+                        await insert(conn, records)
+                    timings.append((time.perf_counter() - started) * 1000)
+                print(f"{name:>12} {count:>7} {statistics.median(timings):>10.1f} {min(timings):>8.1f}")
+    finally:
+        await close_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark draining the job queue: single claims vs batch claims.
+
+Enqueues `--jobs` no-op `ai_enrich` jobs for a throwaway org, then drains
+them with `claim_next_job` + `mark_job_succeeded` per job, and with
+`claim_jobs` + `mark_jobs_succeeded` per batch. Only queue overhead is
+measured; no handler runs. The org (and its jobs) is deleted afterwards.
+
+Run it against a local database with no worker running; it refuses to start
+while other jobs are queued, since the claims would take them.
+
+Usage (from apps/worker, with DATABASE_URL set):
+    python -m benchmarks.bench_queue_drain --jobs 2000 --batch 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.db.session import close_pool, get_pool
+from app.queue_processor import (
+    claim_jobs,
+    claim_next_job,
+    mark_job_succeeded,
+    mark_jobs_succeeded,
+)
+
+WORKER_ID = "bench-queue-drain"
+
+
+async def drain_single(pool, batch: int) -> int:
+    drained = 0
+    while (job := await claim_next_job(pool, WORKER_ID, ["ai_enrich"])) is not None:
+        await mark_job_succeeded(pool, job["id"], WORKER_ID)
+        drained += 1
+    return drained
+
+
+async def drain_batch(pool, batch: int) -> int:
+    drained = 0
+    while jobs := await claim_jobs(pool, WORKER_ID, {"ai_enrich": batch}):
+        await mark_jobs_succeeded(pool, [job["id"] for job in jobs], WORKER_ID)
+        drained += len(jobs)
+    return drained
+
+
+async def run(count: int, batch: int, repeat: int) -> None:
+    pool = await get_pool()
+    org_id = None
+    try:
+        others = await pool.fetchval(
+            "select count(*) from public.job_queue where status = 'queued'"
+        )
+        if others:
+            raise SystemExit(f"{others} jobs already queued; run against an idle database")
+
+        org_id = await pool.fetchval(
+            """
+            insert into public.organizations (name, timezone)
+            values ('queue-drain-benchmark', 'UTC')
+            returning id::text
+            """
+        )
+
+        print(f"{'method':>8} {'jobs':>6} {'median ms':>10} {'jobs/s':>8}")
+        for name, drain in (("single", drain_single), (f"batch {batch}", drain_batch)):
+            timings = []
+            for _ in range(repeat):
+                # Drained jobs are in job_history; start each round from fresh ones
+                await pool.execute("delete from public.job_history where org_id = $1::uuid", org_id)
+                await pool.execute(
+                    """
+                    insert into public.job_queue (org_id, type, payload, status)
+                    select $1::uuid, 'ai_enrich', jsonb_build_object('work_order_id', i::text), 'queued'
+                    from generate_series(1, $2) as i
+                    """,
+                    org_id,
+                    count,
+                )
+                started = time.perf_counter()
+                drained = await drain(pool, batch)
+                timings.append((time.perf_counter() - started) * 1000)
+                assert drained == count, (name, drained)
+            median = statistics.median(timings)
+            print(f"{name:>8} {count:>6} {median:>10.1f} {count / median * 1000:>8.0f}")
+    finally:
+        if org_id is not None:
+            await pool.execute("delete from public.organizations where id = $1::uuid", org_id)
+        await close_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.jobs, args.batch, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
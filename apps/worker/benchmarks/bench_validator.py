@@ -0,0 +1,42 @@
+"""Benchmark schedule validation on heuristic schedules of synthetic instances.
+
+Usage (from apps/worker):
+    python -m benchmarks.bench_validator --tasks 2000 10000 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.scheduler.heuristic import run_heuristic
+from app.scheduler.synthetic import generate_instance
+from app.scheduler.validator import validate_schedule
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'items':>7} {'median ms':>10} {'errors':>7} {'warnings':>9}")
+    for task_count in args.tasks:
+        input_data = generate_instance(task_count, seed=args.seed)
+        items = run_heuristic(input_data).items
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            report = validate_schedule(input_data, items)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        print(
+            f"{len(items):>7} {statistics.median(timings):>10.1f} "
+            f"{len(report.errors):>7} {len(report.warnings):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
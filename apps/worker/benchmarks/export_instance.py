@@ -0,0 +1,63 @@
+"""Export a schedule run's input as a JSON benchmark fixture.
+
+Loads the same data the worker would for the run and writes it with
+`save_instance`, for replay by `tune_profiles.py`.
+
+Usage (from apps/worker, with DATABASE_URL set):
+    python -m benchmarks.export_instance <schedule_run_id> [--output PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from app.db.session import close_pool, get_pool
+from app.scheduler.data_loader import load_schedule_input
+from app.scheduler.instances import save_instance
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+async def export(schedule_run_id: str, output: Path) -> None:
+    pool = await get_pool()
+    try:
+        run = await pool.fetchrow(
+            """
+            select org_id::text as org_id, horizon_start, horizon_end
+            from public.schedule_runs
+            where id = $1::uuid
+            """,
+            schedule_run_id,
+        )
+        if run is None:
+            raise SystemExit(f"Schedule run not found: {schedule_run_id}")
+
+        input_data = await load_schedule_input(
+            pool,
+            org_id=run["org_id"],
+            schedule_run_id=schedule_run_id,
+            horizon_start=run["horizon_start"],
+            horizon_end=run["horizon_end"],
+        )
+    finally:
+        await close_pool()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    save_instance(input_data, output)
+    print(f"Wrote {len(input_data.tasks)} tasks to {output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("schedule_run_id")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    output = args.output or FIXTURES_DIR / f"{args.schedule_run_id}.json"
+    asyncio.run(export(args.schedule_run_id, output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Offline tuner for solver profiles.
+
+Replays benchmark instances against the named profiles (and optionally a grid
+of parameter variants) and recommends, for each size bucket in
+`SIZE_BUCKETS`, the profile with the lowest mean time-to-target-gap.
+
+Time-to-target is the solve time until the incumbent is within `--gap` of the
+best objective any candidate found on that instance. Candidates that never get
+there score twice the time limit.
+
+Usage (from apps/worker):
+    python -m benchmarks.tune_profiles --fixtures benchmarks/fixtures
+    python -m benchmarks.tune_profiles --synthetic 50 300 1500 --grid --output tuning.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import statistics
+from pathlib import Path
+from typing import Any
+
+from ortools.sat.python import cp_model
+
+from app.scheduler.cp_sat_scheduler import SchedulerModel
+from app.scheduler.instances import load_instance
+from app.scheduler.models import ScheduleInput
+from app.scheduler.profiles import PROFILES, SIZE_BUCKETS, SolverProfile, size_bucket
+from app.scheduler.synthetic import generate_instance
+
+GRID = {
+    "linearization_level": (0, 1, 2),
+    "search_branching": ("AUTOMATIC_SEARCH", "PORTFOLIO_SEARCH", "FIXED_SEARCH"),
+    "cp_model_presolve": (True, False),
+}
+
+
+class _Trace(cp_model.CpSolverSolutionCallback):
+    """Records (seconds, objective) for every improving solution."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.points: list[tuple[float, float]] = []
+
+    def on_solution_callback(self) -> None:
+        self.points.append((self.WallTime(), self.ObjectiveValue()))
+
+
+def grid_candidates(num_workers: int) -> list[SolverProfile]:
+    """Parameter grid variants, searching until the time limit."""
+    return [
+        SolverProfile(
+            name=f"grid-l{lin}-{branching.split('_')[0].lower()}-{'p' if presolve else 'np'}",
+            num_workers=num_workers,
+            linearization_level=lin,
+            search_branching=branching,
+            cp_model_presolve=presolve,
+            relative_gap_limit=0.0,
+        )
+        for lin, branching, presolve in itertools.product(*GRID.values())
+    ]
+
+
+def load_instances(args: argparse.Namespace) -> list[tuple[str, ScheduleInput]]:
+    instances = []
+    if args.fixtures:
+        for path in sorted(Path(args.fixtures).glob("*.json")):
+            instances.append((path.stem, load_instance(path)))
+    for task_count in args.synthetic or ():
+        for seed in range(args.seeds):
+            instances.append(
+                (f"synthetic-{task_count}-{seed}", generate_instance(task_count, seed=seed))
+            )
+    return instances
+
+
+def time_to_target(points: list[tuple[float, float]], target: float) -> float | None:
+    for seconds, objective in points:
+        if objective <= target:
+            return seconds
+    return None
+
+
+def tune(
+    instances: list[tuple[str, ScheduleInput]],
+    candidates: list[SolverProfile],
+    time_limit: float,
+    gap: float,
+) -> dict[str, Any]:
+    runs = []
+    for name, input_data in instances:
+        task_count = len(input_data.get_unlocked_tasks())
+        traces = {}
+        for candidate in candidates:
+            model = SchedulerModel(input_data)
+            model.build()
+            trace = _Trace()
+            model.solve(time_limit, profile=candidate, solution_callback=trace)
+            traces[candidate.name] = trace.points
+            print(f"  {name}: {candidate.name} -> {len(trace.points)} solutions", flush=True)
+
+        finals = [points[-1][1] for points in traces.values() if points]
+        if not finals:
+            print(f"  {name}: no candidate found a solution, skipped", flush=True)
+            continue
+        best = min(finals)
+        target = best + gap * max(1.0, abs(best))
+
+        for candidate_name, points in traces.items():
+            reached = time_to_target(points, target)
+            runs.append({
+                "instance": name,
+                "task_count": task_count,
+                "bucket": size_bucket(task_count),
+                "candidate": candidate_name,
+                "time_to_target": reached,
+                "score": reached if reached is not None else 2 * time_limit,
+            })
+
+    buckets = {}
+    for max_tasks, configured in SIZE_BUCKETS:
+        bucket_runs = [r for r in runs if r["bucket"] == max_tasks]
+        if not bucket_runs:
+            continue
+        scores = {
+            candidate.name: statistics.mean(
+                r["score"] for r in bucket_runs if r["candidate"] == candidate.name
+            )
+            for candidate in candidates
+        }
+        named = {k: v for k, v in scores.items() if k in PROFILES}
+        buckets[str(max_tasks)] = {
+            "configured": configured,
+            "recommended": min(named, key=named.get) if named else None,
+            "best_candidate": min(scores, key=scores.get),
+            "mean_scores": scores,
+        }
+
+    return {"time_limit": time_limit, "gap": gap, "buckets": buckets, "runs": runs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, help="Directory of exported instance JSON files")
+    parser.add_argument("--synthetic", type=int, nargs="*", help="Synthetic instance task counts")
+    parser.add_argument("--seeds", type=int, default=2, help="Synthetic instances per task count")
+    parser.add_argument("--time-limit", type=float, default=20.0)
+    parser.add_argument("--gap", type=float, default=0.01, help="Target gap to the best known objective")
+    parser.add_argument("--grid", action="store_true", help="Also try the parameter grid")
+    parser.add_argument("--grid-workers", type=int, default=8)
+    parser.add_argument("--output", type=Path, help="Write full results as JSON")
+    args = parser.parse_args()
+
+    if not args.fixtures and not args.synthetic:
+        args.synthetic = [50, 300, 1500]
+
+    candidates = list(PROFILES.values())
+    if args.grid:
+        candidates += grid_candidates(args.grid_workers)
+
+    instances = load_instances(args)
+    print(f"Tuning {len(candidates)} candidates on {len(instances)} instances")
+    results = tune(instances, candidates, args.time_limit, args.gap)
+
+    print(f"\n{'bucket':>8} {'configured':>11} {'recommended':>12} {'best candidate':>28}")
+    for bucket, summary in results["buckets"].items():
+        print(
+            f"{bucket:>8} {summary['configured']:>11} {summary['recommended']:>12} "
+            f"{summary['best_candidate']:>28}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import asyncpg
+import pytest
+
+
+# Ensure the worker root is on sys.path so `import app...` works in tests.
+WORKER_ROOT = Path(__file__).resolve().parents[1]
+if str(WORKER_ROOT) not in sys.path:
+    sys.path.insert(0, str(WORKER_ROOT))
+
+
+@pytest.fixture
+async def db_pool() -> AsyncIterator[asyncpg.Pool]:
+    """Pool on TEST_DATABASE_URL (a throwaway database with all migrations applied)."""
+    dsn = os.getenv("TEST_DATABASE_URL")
+    if not dsn:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    pool = await asyncpg.create_pool(dsn, min_size=1, max_size=10)
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+@pytest.fixture
+async def org_id(db_pool: asyncpg.Pool) -> AsyncIterator[str]:
+    """A fresh organization, deleted (with everything it owns) afterwards."""
+    org = await db_pool.fetchval(
+        """
+        insert into public.organizations (name, timezone)
+        values ('Test Org', 'UTC')
+        returning id::text
+        """
+    )
+    try:
+        yield org
+    finally:
+        await db_pool.execute("delete from public.organizations where id = $1::uuid", org)
+
+
+@pytest.fixture
+async def other_org_id(db_pool: asyncpg.Pool) -> AsyncIterator[str]:
+    """A second fresh organization, for tests across orgs."""
+    org = await db_pool.fetchval(
+        """
+        insert into public.organizations (name, timezone)
+        values ('Test Org', 'UTC')
+        returning id::text
+        """
+    )
+    try:
+        yield org
+    finally:
+        await db_pool.execute("delete from public.organizations where id = $1::uuid", org)
+
+
+@pytest.fixture
+async def idle_queue(db_pool: asyncpg.Pool) -> None:
+    """Skip unless no other jobs are queued; claims take jobs from every org."""
+    others = await db_pool.fetchval(
+        "select count(*) from public.job_queue where status = 'queued'"
+    )
+    if others:
+        pytest.skip(f"{others} jobs already queued in the test database")
@@ -0,0 +1,231 @@
+"""Small hand-built scheduler inputs and database rows for tests."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import asyncpg
+
+from app.scheduler.models import (
+    Bay,
+    ScheduleInput,
+    ScheduleItem,
+    Task,
+    Technician,
+    WorkOrder,
+)
+
+HORIZON_START = datetime(2026, 1, 5, 8, tzinfo=timezone.utc)
+
+
+def at(minutes: int) -> datetime:
+    """Time `minutes` after the horizon start."""
+    return HORIZON_START + timedelta(minutes=minutes)
+
+
+def make_task(task_id: str, work_order_id: str = "wo1", duration: int = 60, **fields: Any) -> Task:
+    """Unlocked task with no requirements unless overridden."""
+    values: dict[str, Any] = {
+        "id": task_id,
+        "work_order_id": work_order_id,
+        "type": "repair",
+        "status": "todo",
+        "required_skill": None,
+        "required_skill_is_hard": False,
+        "required_bay_type": None,
+        "earliest_start": None,
+        "latest_finish": None,
+        "duration_minutes_low": duration,
+        "duration_minutes_high": duration,
+        "is_locked": False,
+        "locked_tech_id": None,
+        "locked_bay_id": None,
+        "locked_start_at": None,
+        "locked_end_at": None,
+        "duration_minutes": duration,
+    }
+    values.update(fields)
+    return Task(**values)
+
+
+def make_locked_task(task_id: str, tech_id: str, bay_id: str, start: int, end: int) -> Task:
+    """Task locked to a technician, bay and time (minutes from the horizon start)."""
+    return make_task(
+        task_id,
+        duration=end - start,
+        is_locked=True,
+        locked_tech_id=tech_id,
+        locked_bay_id=bay_id,
+        locked_start_at=at(start),
+        locked_end_at=at(end),
+    )
+
+
+def make_input(
+    tasks: list[Task],
+    *,
+    technicians: list[Technician] | None = None,
+    bays: list[Bay] | None = None,
+    work_orders: dict[str, WorkOrder] | None = None,
+    horizon_minutes: int = 24 * 60,
+) -> ScheduleInput:
+    """Schedule input with two technicians (t1 has "engine") and two bays (b2 is "paint")."""
+    if technicians is None:
+        technicians = [
+            Technician(id="t1", name="Tech 1", skills=["engine"], efficiency_multiplier=1.0, wip_limit=1),
+            Technician(id="t2", name="Tech 2", skills=[], efficiency_multiplier=1.0, wip_limit=1),
+        ]
+    if bays is None:
+        bays = [
+            Bay(id="b1", name="Bay 1", bay_type="general", capacity=1, is_active=True),
+            Bay(id="b2", name="Bay 2", bay_type="paint", capacity=1, is_active=True),
+        ]
+    if work_orders is None:
+        work_orders = {
+            wo_id: WorkOrder(id=wo_id, priority=3, due_date=None, parts_ready=True)
+            for wo_id in {t.work_order_id for t in tasks}
+        }
+    return ScheduleInput(
+        org_id="org",
+        schedule_run_id="run",
+        horizon_start=HORIZON_START,
+        horizon_end=at(horizon_minutes),
+        tasks=tasks,
+        technicians=technicians,
+        bays=bays,
+        work_orders=work_orders,
+    )
+
+
+def make_item(
+    task_id: str,
+    tech_id: str,
+    bay_id: str,
+    start: int,
+    end: int,
+    is_locked: bool = False,
+    why: dict[str, Any] | None = None,
+) -> ScheduleItem:
+    """Schedule item at minutes from the horizon start."""
+    return ScheduleItem(
+        task_id=task_id,
+        technician_id=tech_id,
+        bay_id=bay_id,
+        start_at=at(start),
+        end_at=at(end),
+        is_locked=is_locked,
+        why=why,
+    )
+
+
+async def insert_work_order(pool: asyncpg.Pool, org_id: str, priority: int = 3) -> str:
+    """Work order (and its unit) in the database; returns its ID."""
+    unit_id = await pool.fetchval(
+        """
+        insert into public.units (org_id, unit_number, asset_type)
+        values ($1::uuid, 'U-1', 'truck')
+        returning id
+        """,
+        org_id,
+    )
+    return await pool.fetchval(
+        """
+        insert into public.work_orders (org_id, unit_id, asset_type, priority, location, status)
+        values ($1::uuid, $2, 'truck', $3, 'shop', 'scheduled')
+        returning id::text
+        """,
+        org_id,
+        unit_id,
+        priority,
+    )
+
+
+async def insert_task(
+    pool: asyncpg.Pool,
+    org_id: str,
+    work_order_id: str,
+    duration: int = 60,
+    **fields: Any,
+) -> str:
+    """Task in the database, `todo` and unlocked unless overridden; returns its ID."""
+    values: dict[str, Any] = {
+        "type": "repair",
+        "status": "todo",
+        "duration_minutes_low": duration,
+        "duration_minutes_high": duration,
+        **fields,
+    }
+    columns = ", ".join(values)
+    params = ", ".join(f"${i}" for i in range(3, len(values) + 3))
+    return await pool.fetchval(
+        f"""
+        insert into public.tasks (org_id, work_order_id, {columns})
+        values ($1::uuid, $2::uuid, {params})
+        returning id::text
+        """,
+        org_id,
+        work_order_id,
+        *values.values(),
+    )
+
+
+async def insert_job(
+    pool: asyncpg.Pool,
+    org_id: str,
+    job_type: str = "ai_enrich",
+    **fields: Any,
+) -> str:
+    """Queued job in the database unless overridden; returns its ID."""
+    values: dict[str, Any] = {"status": "queued", "payload": "{}", **fields}
+    columns = ", ".join(values)
+    params = ", ".join(f"${i}" for i in range(3, len(values) + 3))
+    return await pool.fetchval(
+        f"""
+        insert into public.job_queue (org_id, type, {columns})
+        values ($1::uuid, $2, {params})
+        returning id::text
+        """,
+        org_id,
+        job_type,
+        *values.values(),
+    )
+
+
+async def insert_resources(pool: asyncpg.Pool, org_id: str) -> tuple[str, str]:
+    """A technician and a bay in the database; returns their IDs."""
+    tech_id = await pool.fetchval(
+        "insert into public.technicians (org_id, name) values ($1::uuid, 'Tech') returning id::text",
+        org_id,
+    )
+    bay_id = await pool.fetchval(
+        """
+        insert into public.bays (org_id, name, bay_type)
+        values ($1::uuid, 'Bay', 'general')
+        returning id::text
+        """,
+        org_id,
+    )
+    return tech_id, bay_id
+
+
+async def insert_schedule_run(pool: asyncpg.Pool, org_id: str, **fields: Any) -> str:
+    """Queued schedule run over the test horizon unless overridden; returns its ID."""
+    values: dict[str, Any] = {
+        "horizon_start": HORIZON_START,
+        "horizon_end": HORIZON_START + timedelta(days=1),
+        "status": "queued",
+        "trigger": "manual",
+        **fields,
+    }
+    columns = ", ".join(values)
+    params = ", ".join(f"${i}" for i in range(2, len(values) + 2))
+    return await pool.fetchval(
+        f"""
+        insert into public.schedule_runs (org_id, {columns})
+        values ($1::uuid, {params})
+        returning id::text
+        """,
+        org_id,
+        *values.values(),
+    )
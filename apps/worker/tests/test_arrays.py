@@ -0,0 +1,100 @@
+"""Tests for the columnar view of a schedule input."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from app.scheduler.arrays import NO_DEADLINE, minute_offsets
+from app.scheduler.cp_sat_scheduler import datetime_to_minutes
+from app.scheduler.models import Technician, WorkOrder
+
+from tests.factories import HORIZON_START, at, make_input, make_task
+
+
+def test_eligibility_bitsets_past_64_technicians() -> None:
+    """Bits for technicians 64 and up land in later bytes and unpack to the right indices."""
+    skilled = {0, 7, 8, 63, 64, 69}
+    technicians = [
+        Technician(
+            id=f"t{i}",
+            name=f"Tech {i}",
+            skills=["engine"] if i in skilled else [],
+            efficiency_multiplier=1.0,
+            wip_limit=1,
+        )
+        for i in range(70)
+    ]
+    input_data = make_input(
+        [
+            make_task("hard", required_skill="engine", required_skill_is_hard=True),
+            make_task("soft", required_skill="engine"),
+            make_task("any"),
+            make_task("nobody", required_skill="welding", required_skill_is_hard=True),
+        ],
+        technicians=technicians,
+    )
+    arrays = input_data.arrays
+    
+    assert arrays.tech_count == 70
+    assert arrays.eligible_techs.shape == (4, 9)
+    assert arrays.eligible_tech_indices(0).tolist() == sorted(skilled)
+    assert arrays.skilled_tech_indices(0).tolist() == sorted(skilled)
+    # Soft skills and no skill allow every technician; soft still knows who is skilled
+    assert arrays.eligible_tech_indices(1).tolist() == list(range(70))
+    assert arrays.skilled_tech_indices(1).tolist() == sorted(skilled)
+    assert arrays.soft_skill.tolist() == [False, True, False, False]
+    assert arrays.eligible_tech_indices(2).tolist() == list(range(70))
+    # A hard skill nobody has is flagged and falls back to every technician
+    assert arrays.missing_hard_skill.tolist() == [False, False, False, True]
+    assert arrays.eligible_tech_indices(3).tolist() == list(range(70))
+
+
+def test_tasks_without_a_due_date_get_no_deadline() -> None:
+    """No work order or no due date means NO_DEADLINE, sorted after every due date."""
+    input_data = make_input(
+        [
+            make_task("undated", work_order_id="undated"),
+            make_task("orphan", work_order_id="missing"),
+            make_task("dated", work_order_id="dated"),
+        ],
+        work_orders={
+            "undated": WorkOrder(id="undated", priority=1, due_date=None, parts_ready=True),
+            "dated": WorkOrder(id="dated", priority=5, due_date=at(600), parts_ready=False),
+        },
+    )
+    arrays = input_data.arrays
+    
+    assert arrays.due.tolist() == [NO_DEADLINE, NO_DEADLINE, 600]
+    assert arrays.has_work_order.tolist() == [True, False, True]
+    assert arrays.priority.tolist() == [1, 0, 5]
+    assert arrays.parts_ready.tolist() == [True, True, False]
+    # Earliest due first, then highest priority (an orphan counts as 1)
+    assert arrays.urgency_order().tolist() == [2, 0, 1]
+
+
+def test_minute_offsets_match_datetime_to_minutes() -> None:
+    """Aware UTC, other offsets, naive datetimes and dates convert like the model does."""
+    plus_two = timezone(timedelta(hours=2))
+    values = [
+        HORIZON_START + timedelta(minutes=90, seconds=59),
+        HORIZON_START - timedelta(seconds=90),
+        HORIZON_START - timedelta(seconds=30),
+        datetime(2026, 1, 5, 10, 30, tzinfo=plus_two),
+        datetime(2026, 1, 5, 9, 15),
+        date(2026, 1, 6),
+    ]
+    
+    offsets = minute_offsets([*values, None], HORIZON_START, -7)
+    
+    assert offsets.dtype == np.int64
+    assert offsets.tolist() == [datetime_to_minutes(v, HORIZON_START) for v in values] + [-7]
+    # Truncated toward zero; tzinfo is dropped, not converted, as in datetime_to_minutes
+    assert offsets.tolist() == [90, -1, 0, 150, 75, 960, -7]
+
+
+def test_minute_offsets_from_a_naive_base() -> None:
+    """A naive base skips the UTC fast path and still matches datetime_to_minutes."""
+    base = datetime(2026, 1, 5, 8)
+    values = [datetime(2026, 1, 5, 9, tzinfo=timezone.utc), datetime(2026, 1, 5, 7, 59, 30)]
+    
+    assert minute_offsets(values, base, 0).tolist() == [60, 0]
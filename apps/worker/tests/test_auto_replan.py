@@ -0,0 +1,108 @@
+"""Tests for debounced automatic re-planning (needs TEST_DATABASE_URL)."""
+
+import json
+
+import asyncpg
+
+from app.scheduler.auto_replan import enqueue_auto_replans
+
+from tests.factories import insert_task, insert_work_order
+
+
+async def opt_in(pool: asyncpg.Pool, org_id: str) -> None:
+    """Turn on re-planning for the org with a one-minute quiet period."""
+    await pool.execute(
+        "update public.organizations set auto_replan_quiet_seconds = 60 where id = $1::uuid",
+        org_id,
+    )
+
+
+async def test_settled_changes_enqueue_one_partial_run(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """Edits older than the quiet period become one partial run."""
+    await opt_in(db_pool, org_id)
+    wo_id = await insert_work_order(db_pool, org_id)
+    first = await insert_task(db_pool, org_id, wo_id)
+    second = await insert_task(db_pool, org_id, wo_id)
+    await db_pool.execute(
+        """
+        update public.schedule_change_events
+        set created_at = now() - interval '1 hour'
+        where org_id = $1::uuid
+        """,
+        org_id,
+    )
+    
+    # Other orgs in the database may have settled changes too
+    assert await enqueue_auto_replans(db_pool) >= 1
+    
+    job = await db_pool.fetchrow(
+        "select type, payload from public.job_queue where org_id = $1::uuid", org_id
+    )
+    payload = json.loads(job["payload"])
+    assert job["type"] == "schedule_run"
+    assert payload["mode"] == "partial"
+    assert sorted(payload["changed_task_ids"]) == sorted([first, second])
+    assert await db_pool.fetchval(
+        "select count(*) from public.schedule_change_events where org_id = $1::uuid", org_id
+    ) == 0
+    
+    # Nothing new to re-plan
+    await enqueue_auto_replans(db_pool)
+    assert await db_pool.fetchval(
+        "select count(*) from public.job_queue where org_id = $1::uuid", org_id
+    ) == 1
+
+
+async def test_recent_changes_wait(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """Changes inside the quiet period are left for a later check."""
+    await opt_in(db_pool, org_id)
+    wo_id = await insert_work_order(db_pool, org_id)
+    await insert_task(db_pool, org_id, wo_id)
+    
+    await enqueue_auto_replans(db_pool)
+    
+    assert await db_pool.fetchval(
+        "select count(*) from public.job_queue where org_id = $1::uuid", org_id
+    ) == 0
+    assert await db_pool.fetchval(
+        "select count(*) from public.schedule_change_events where org_id = $1::uuid", org_id
+    ) == 1
+
+
+async def test_orgs_are_not_replanned_unless_they_opt_in(
+    db_pool: asyncpg.Pool, org_id: str
+) -> None:
+    """Without a quiet period of its own, an org's settled changes are dropped."""
+    wo_id = await insert_work_order(db_pool, org_id)
+    await insert_task(db_pool, org_id, wo_id)
+    await db_pool.execute(
+        """
+        update public.schedule_change_events
+        set created_at = now() - interval '1 day'
+        where org_id = $1::uuid
+        """,
+        org_id,
+    )
+    
+    await enqueue_auto_replans(db_pool)
+    
+    assert await db_pool.fetchval(
+        "select count(*) from public.job_queue where org_id = $1::uuid", org_id
+    ) == 0
+    assert await db_pool.fetchval(
+        "select count(*) from public.schedule_change_events where org_id = $1::uuid", org_id
+    ) == 0
+
+
+async def test_org_with_open_tasks_can_be_deleted(db_pool: asyncpg.Pool) -> None:
+    """Cascaded task deletes do not record events for the deleted org."""
+    org_id = await db_pool.fetchval(
+        "insert into public.organizations (name, timezone) values ('Doomed', 'UTC') returning id::text"
+    )
+    await insert_task(db_pool, org_id, await insert_work_order(db_pool, org_id))
+    
+    await db_pool.execute("delete from public.organizations where id = $1::uuid", org_id)
+    
+    assert await db_pool.fetchval(
+        "select count(*) from public.schedule_change_events where org_id = $1::uuid", org_id
+    ) == 0
@@ -0,0 +1,154 @@
+"""Tests for the CP-SAT model on small fixed instances."""
+
+import pytest
+
+from app.scheduler.cp_sat_scheduler import OBJECTIVE_WEIGHTS, run_scheduler
+from app.scheduler.evaluation import evaluate_schedule, objective_value
+from app.scheduler.models import Bay, ScheduleInput, ScheduleResult, WorkOrder
+from app.scheduler.validator import validate_schedule
+
+from tests.factories import HORIZON_START, at, make_input, make_locked_task, make_task
+
+ONE_BAY = [Bay(id="b1", name="Bay 1", bay_type="general", capacity=1, is_active=True)]
+
+
+def starts(result: ScheduleResult) -> dict[str, int]:
+    """Start minute per task ID."""
+    return {
+        item.task_id: int((item.start_at - HORIZON_START).total_seconds() // 60)
+        for item in result.items
+    }
+
+
+def makespan(result: ScheduleResult) -> int:
+    """Minutes from the first start to the last end."""
+    first = min(item.start_at for item in result.items)
+    last = max(item.end_at for item in result.items)
+    return int((last - first).total_seconds() // 60)
+
+
+def work_order(wo_id: str, priority: int = 3, due: int | None = None) -> WorkOrder:
+    """Work order with parts ready, due `due` minutes after the horizon start."""
+    due_date = at(due) if due is not None else None
+    return WorkOrder(id=wo_id, priority=priority, due_date=due_date, parts_ready=True)
+
+
+def solve(input_data: ScheduleInput) -> ScheduleResult:
+    """Solve to optimality and check the schedule is valid and scored consistently."""
+    result = run_scheduler(input_data, time_limit_seconds=10)
+    
+    assert result.status == "succeeded"
+    assert result.metrics["solver_status"] == "OPTIMAL"
+    assert validate_schedule(input_data, result.items).violations == []
+    assert result.objective_value == objective_value(result.objective_breakdown)
+    assert result.objective_breakdown == evaluate_schedule(input_data, result.items)
+    return result
+
+
+def test_tasks_sharing_one_bay_run_back_to_back() -> None:
+    """Three one-hour tasks on a single bay take three hours, without gaps."""
+    tasks = [make_task(task_id, work_order_id=task_id) for task_id in ("a", "b", "c")]
+    input_data = make_input(
+        tasks, bays=ONE_BAY, work_orders={t.id: work_order(t.id) for t in tasks}
+    )
+    
+    result = solve(input_data)
+    
+    assert makespan(result) == 180
+    assert sorted(starts(result).values()) == [0, 60, 120]
+    # Priority 3 weighs 3 per 100 minutes of delay: floor(180 / 100) + floor(360 / 100)
+    assert result.objective_breakdown.priority_penalty == 4
+    assert result.objective_value == OBJECTIVE_WEIGHTS["priority"] * 4
+
+
+def test_most_urgent_work_order_starts_first() -> None:
+    """Priority 1 weighs 5 per 100 minutes of delay, priority 5 only 1."""
+    input_data = make_input(
+        [
+            make_task("low", work_order_id="low", duration=100),
+            make_task("high", work_order_id="high", duration=100),
+        ],
+        bays=ONE_BAY,
+        work_orders={"low": work_order("low", priority=5), "high": work_order("high", priority=1)},
+    )
+    
+    result = solve(input_data)
+    
+    assert starts(result) == {"high": 0, "low": 100}
+    assert result.objective_breakdown.priority_penalty == 1
+    assert result.objective_value == 2
+
+
+def test_due_date_decides_the_order() -> None:
+    """A task that can still make its due date goes first; one that cannot costs a constant."""
+    input_data = make_input(
+        [
+            make_task("due", work_order_id="due"),
+            make_task("free", work_order_id="free"),
+            make_task("hopeless", work_order_id="hopeless", earliest_start=at(120)),
+        ],
+        bays=ONE_BAY,
+        work_orders={
+            "due": work_order("due", due=60),
+            "free": work_order("free"),
+            "hopeless": work_order("hopeless", priority=2, due=150),
+        },
+    )
+    
+    result = solve(input_data)
+    
+    assert starts(result) == {"due": 0, "free": 60, "hopeless": 120}
+    # Only the task that can never finish by 150 is late, at priority * 100
+    assert result.objective_breakdown.due_date_penalty == 200
+    assert result.objective_breakdown.priority_penalty == 0 + 1 + 4
+    assert result.objective_value == 2 * 200 + 2 * 5
+
+
+def test_locked_task_blocks_its_technician_and_bay() -> None:
+    """A hard-skill task waits for the only skilled technician's locked work."""
+    input_data = make_input([
+        make_locked_task("locked", "t1", "b1", 0, 90),
+        make_task("engine", required_skill="engine", required_skill_is_hard=True),
+    ])
+    
+    result = solve(input_data)
+    
+    engine = next(item for item in result.items if item.task_id == "engine")
+    assert engine.technician_id == "t1"
+    assert starts(result)["engine"] == 90
+    assert makespan(result) == 150
+
+
+def test_soft_skill_prefers_a_skilled_technician() -> None:
+    """A soft skill requirement costs 50 only when no skilled technician is used."""
+    input_data = make_input([make_task("engine", required_skill="engine")])
+    
+    result = solve(input_data)
+    
+    assert result.items[0].technician_id == "t1"
+    assert result.objective_breakdown.skill_mismatch_penalty == 0
+
+
+@pytest.mark.parametrize(
+    ("start", "priority", "penalty"),
+    [
+        (0, 3, 0),
+        (99, 3, 2),  # 297 / 100
+        (100, 3, 3),  # 300 / 100, exactly divisible
+        (100, 5, 1),  # 100 / 100, exactly divisible
+        (200, 1, 10),  # 1000 / 100, exactly divisible
+        (201, 1, 10),  # 1005 / 100
+    ],
+)
+def test_priority_penalty_rounds_down(start: int, priority: int, penalty: int) -> None:
+    """The priority penalty is floor(start * (6 - priority) / 100), also at exact multiples."""
+    input_data = make_input(
+        [make_task("a", earliest_start=at(start), latest_finish=at(start + 60))],
+        work_orders={"wo1": work_order("wo1", priority=priority)},
+    )
+    
+    result = solve(input_data)
+    
+    assert starts(result) == {"a": start}
+    assert result.objective_breakdown.priority_penalty == penalty
+    assert result.objective_value == OBJECTIVE_WEIGHTS["priority"] * penalty
@@ -0,0 +1,81 @@
+"""Tests for loading scheduler input (needs TEST_DATABASE_URL)."""
+
+import asyncio
+import os
+from datetime import timedelta
+
+import asyncpg
+
+from app.scheduler.data_loader import LOAD_CONNECTIONS, load_schedule_input
+
+from tests.factories import HORIZON_START, insert_task, insert_work_order
+
+HORIZON_END = HORIZON_START + timedelta(days=1)
+
+
+async def test_horizon_filter_edge_cases(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """Boundaries of `_IN_HORIZON` and the deferred reasons."""
+    wo_id = await insert_work_order(db_pool, org_id)
+    other_wo_id = await insert_work_order(db_pool, org_id)
+    h0, h1 = HORIZON_START, HORIZON_END
+    minutes = lambda n: timedelta(minutes=n)  # noqa: E731
+    
+    async def task(**fields: object) -> str:
+        return await insert_task(db_pool, org_id, wo_id, **fields)
+    
+    included = {
+        "no_window": await task(),
+        "fits_at_end": await task(earliest_start=h1 - minutes(60)),
+        "fits_at_start": await task(latest_finish=h0 + minutes(60)),
+        # Planned at the average duration: (50 + 71) // 2 = 60
+        "average_fits": await task(
+            latest_finish=h0 + minutes(60), duration_minutes_low=50, duration_minutes_high=71
+        ),
+        "wide_window": await task(earliest_start=h0 - minutes(600), latest_finish=h1 + minutes(600)),
+        "lock_across_start": await task(
+            lock_flag=True, locked_start_at=h0 - minutes(30), locked_end_at=h0 + minutes(30)
+        ),
+        "lock_without_times": await task(lock_flag=True),
+        "scheduled": await task(status="scheduled"),
+    }
+    deferred = {
+        await task(earliest_start=h1): "starts_after_horizon",
+        await task(latest_finish=h0): "due_before_horizon",
+        await task(earliest_start=h1 - minutes(30)): "window_too_short",
+        await task(latest_finish=h0 + minutes(59)): "window_too_short",
+    }
+    # Neither loaded nor deferred
+    await task(lock_flag=True, locked_start_at=h0 - minutes(60), locked_end_at=h0)
+    await task(lock_flag=True, locked_start_at=h1, locked_end_at=h1 + minutes(60))
+    await task(status="done")
+    await task(status="in_progress")
+    await insert_task(db_pool, org_id, other_wo_id, status="done")
+    
+    input_data = await load_schedule_input(db_pool, org_id, "run", h0, h1)
+    
+    assert {t.id for t in input_data.tasks} == set(included.values())
+    assert {d.task_id: d.reason for d in input_data.deferred_tasks} == deferred
+    # Work orders come only from loaded tasks
+    assert set(input_data.work_orders) == {wo_id}
+
+
+async def test_concurrent_loads_share_a_small_pool(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """More loads than connections finish one after another instead of deadlocking."""
+    wo_id = await insert_work_order(db_pool, org_id)
+    task_ids = {await insert_task(db_pool, org_id, wo_id) for _ in range(3)}
+    pool = await asyncpg.create_pool(
+        os.environ["TEST_DATABASE_URL"], min_size=1, max_size=LOAD_CONNECTIONS
+    )
+    try:
+        loads = await asyncio.wait_for(
+            asyncio.gather(*(
+                load_schedule_input(pool, org_id, "run", HORIZON_START, HORIZON_END)
+                for _ in range(LOAD_CONNECTIONS + 1)
+            )),
+            timeout=30,
+        )
+    finally:
+        await pool.close()
+    
+    assert all({t.id for t in input_data.tasks} == task_ids for input_data in loads)
+    assert all(set(input_data.work_orders) == {wo_id} for input_data in loads)
@@ -0,0 +1,94 @@
+"""Tests for per-item schedule explanations."""
+
+from app.scheduler.evaluation import evaluate_schedule
+from app.scheduler.explain import explain_schedule
+from app.scheduler.heuristic import run_heuristic
+from app.scheduler.models import WorkOrder
+from app.scheduler.synthetic import generate_instance
+
+from tests.factories import at, make_input, make_item, make_locked_task, make_task
+
+
+def test_contributions_sum_to_breakdown() -> None:
+    """Per-item penalty contributions add up to the run's objective breakdown."""
+    input_data = generate_instance(300, seed=2)
+    items = run_heuristic(input_data).items
+    breakdown = evaluate_schedule(input_data, items)
+    
+    totals = {"due_date": 0, "priority": 0, "skill_mismatch": 0, "parts_not_ready": 0}
+    for item in explain_schedule(input_data, items):
+        if item.is_locked:
+            continue
+        for name, value in item.why["penalty_contributions"].items():
+            totals[name] += value
+    
+    assert totals == {
+        "due_date": breakdown.due_date_penalty,
+        "priority": breakdown.priority_penalty,
+        "skill_mismatch": breakdown.skill_mismatch_penalty,
+        "parts_not_ready": breakdown.parts_not_ready_penalty,
+    }
+
+
+def test_binding_constraints() -> None:
+    """Each item names what kept it from starting earlier."""
+    input_data = make_input([
+        make_locked_task("lock", "t1", "b1", 0, 60),
+        make_task("after_lock"),
+        make_task("first"),
+        make_task("after_first"),
+        make_task("windowed", earliest_start=at(300)),
+        make_task("slack"),
+    ])
+    explained = {
+        item.task_id: item.why
+        for item in explain_schedule(input_data, [
+            make_item("lock", "t1", "b1", 0, 60, is_locked=True),
+            make_item("after_lock", "t1", "b1", 60, 120),
+            make_item("first", "t2", "b2", 0, 60),
+            make_item("after_first", "t2", "b2", 60, 120),
+            make_item("windowed", "t2", "b2", 300, 360),
+            make_item("slack", "t2", "b2", 500, 560),
+        ])
+    }
+    
+    assert explained["lock"] is None
+    assert explained["after_lock"]["binding"] == [
+        {"type": "technician", "task_id": "lock", "locked": True},
+        {"type": "bay", "task_id": "lock", "locked": True},
+    ]
+    assert explained["first"]["binding"] == [{"type": "horizon_start"}]
+    assert explained["after_first"]["binding"] == [
+        {"type": "technician", "task_id": "first", "locked": False},
+        {"type": "bay", "task_id": "first", "locked": False},
+    ]
+    assert explained["windowed"]["binding"] == [{"type": "earliest_start"}]
+    assert explained["slack"]["binding"] == []
+
+
+def test_late_item() -> None:
+    """A late item carries the due date penalty and how late it is."""
+    input_data = make_input(
+        [make_task("late")],
+        work_orders={"wo1": WorkOrder(id="wo1", priority=4, due_date=at(100), parts_ready=False)},
+    )
+    (item,) = explain_schedule(input_data, [
+        make_item("late", "t1", "b1", 60, 120, why={"reason": "scheduled"}),
+    ])
+    
+    assert item.why["reason"] == "scheduled"
+    assert item.why["late_by_minutes"] == 20
+    assert item.why["penalty_contributions"] == {
+        "due_date": 400,
+        "priority": 60 * (6 - 4) // 100,
+        "skill_mismatch": 0,
+        "parts_not_ready": 100,
+    }
+
+
+def test_unknown_items_are_left_unchanged() -> None:
+    """Items for tasks outside the input pass through as they are."""
+    input_data = make_input([make_task("a")])
+    ghost = make_item("ghost", "t1", "b1", 0, 60)
+    
+    assert explain_schedule(input_data, [ghost]) == [ghost]
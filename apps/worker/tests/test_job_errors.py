@@ -0,0 +1,40 @@
+"""Tests for retry classification and backoff."""
+
+import pytest
+
+from app import queue_processor
+from app.handlers.schedule_run import _failure_error
+from app.job_errors import NonRetryableError, RetryableError
+from app.queue_processor import retry_backoff_seconds
+from app.scheduler.models import ScheduleResult
+
+
+def failed_result(status: str) -> ScheduleResult:
+    return ScheduleResult(
+        status=status,
+        items=[],
+        solver_wall_time_ms=0,
+        objective_value=None,
+        objective_breakdown=None,
+        infeasible_reason="reason",
+    )
+
+
+def test_only_infeasible_schedules_are_final() -> None:
+    """Infeasibility dead-letters; time limits, crashes and validation failures retry."""
+    assert isinstance(_failure_error(failed_result("infeasible")), NonRetryableError)
+    assert isinstance(_failure_error(failed_result("failed")), RetryableError)
+    assert str(_failure_error(failed_result("failed"))) == "Schedule failed: reason"
+
+
+def test_backoff_is_jittered_up_to_the_capped_exponential(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Delays fall in [0, min(cap, base * 2**attempts)] and actually vary."""
+    monkeypatch.setattr(queue_processor.settings, "job_retry_base_seconds", 60)
+    monkeypatch.setattr(queue_processor.settings, "job_retry_backoff_cap_seconds", 3600)
+    
+    for attempts, ceiling in ((1, 120), (3, 480), (10, 3600)):
+        delays = [retry_backoff_seconds(attempts) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) > ceiling / 2 and min(delays) < ceiling / 2
+    
+    assert all(retry_backoff_seconds(10, cap_seconds=300) <= 300 for _ in range(200))
@@ -0,0 +1,50 @@
+"""Tests for job notification wakeups."""
+
+import json
+import os
+import time
+
+import asyncpg
+import pytest
+
+from app.job_wakeup import NOTIFY_CHANNEL, JobWakeup
+
+
+async def test_no_listener_without_listen_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without LISTEN_DATABASE_URL the worker stays on polling."""
+    monkeypatch.delenv("LISTEN_DATABASE_URL", raising=False)
+    wakeup = JobWakeup()
+    await wakeup.ensure_listening()
+    
+    assert not wakeup.listening
+    assert not await wakeup.wait(0.01)
+
+
+async def test_notification_wakes_worker(
+    db_pool: asyncpg.Pool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A notification for a due job wakes at once; a delayed one when it falls due."""
+    monkeypatch.setenv("LISTEN_DATABASE_URL", os.environ["TEST_DATABASE_URL"])
+    wakeup = JobWakeup()
+    await wakeup.ensure_listening()
+    try:
+        assert wakeup.listening
+        
+        await db_pool.execute(
+            "select pg_notify($1, $2)",
+            NOTIFY_CHANNEL,
+            json.dumps({"type": "ai_enrich", "run_after": time.time()}),
+        )
+        assert await wakeup.wait(2)
+        
+        await db_pool.execute(
+            "select pg_notify($1, $2)",
+            NOTIFY_CHANNEL,
+            json.dumps({"type": "ai_enrich", "run_after": time.time() + 0.5}),
+        )
+        assert not await wakeup.wait(0.2)
+        assert await wakeup.wait(2)
+    finally:
+        await wakeup.stop()
+    
+    assert not wakeup.listening
@@ -0,0 +1,74 @@
+"""Tests for large neighborhood search."""
+
+import threading
+
+import numpy as np
+
+from app.scheduler.heuristic import run_heuristic
+from app.scheduler.lns import LNSDriver, run_lns, weighted_order
+from app.scheduler.synthetic import generate_instance
+from app.scheduler.validator import validate_schedule
+
+
+def test_weighted_order_is_a_permutation_of_unlocked_rows() -> None:
+    """Every unlocked task is placed exactly once; locked tasks are not."""
+    arrays = generate_instance(300, seed=1, locked_fraction=0.1).arrays
+    order = weighted_order(arrays)
+    
+    assert sorted(order.tolist()) == np.flatnonzero(~arrays.is_locked).tolist()
+
+
+def test_weighted_start_beats_urgency_order_on_loose_due_dates() -> None:
+    """With loose due dates the weighted order wins on priority delay."""
+    input_data = generate_instance(1000, seed=2)
+    urgency = run_heuristic(input_data)
+    weighted = run_heuristic(input_data, weighted_order(input_data.arrays))
+    
+    assert weighted.status == "succeeded"
+    assert weighted.objective_value < urgency.objective_value
+
+
+def test_sub_input_pins_neighbours_on_the_freed_resources() -> None:
+    """Only the freed tasks stay free, on the technicians and bays they use now."""
+    input_data = generate_instance(500, seed=4)
+    driver = LNSDriver(input_data)
+    for item in run_heuristic(input_data).items:
+        driver._set_item(item)
+    
+    freed = driver._pick_neighborhood("tech_day") or driver._pick_neighborhood("work_order")
+    sub_input = driver._build_sub_input(freed)
+    
+    tech_ids = {driver.items[tid].technician_id for tid in freed}
+    bay_ids = {driver.items[tid].bay_id for tid in freed}
+    assert {t.id for t in sub_input.technicians} == tech_ids
+    assert {b.id for b in sub_input.bays} == bay_ids
+    assert {t.id for t in sub_input.get_unlocked_tasks()} == set(freed)
+    for task in sub_input.get_locked_tasks():
+        assert task.locked_tech_id in tech_ids or task.locked_bay_id in bay_ids
+
+
+def test_lns_returns_valid_schedule_no_worse_than_its_start() -> None:
+    """LNS keeps every task placed and never makes the schedule worse."""
+    input_data = generate_instance(300, seed=5)
+    result = run_lns(input_data, 5)
+    stats = result.metrics["lns"]
+    
+    assert result.status == "succeeded"
+    assert len(result.items) == len(input_data.tasks)
+    assert validate_schedule(input_data, result.items).is_valid
+    assert stats["construction"] in ("urgency", "weighted")
+    assert stats["iterations"] > 0
+    assert result.objective_value == stats["final_objective"]
+    assert stats["final_objective"] <= stats["initial_objective"]
+    assert result.objective_value <= run_heuristic(input_data).objective_value
+
+
+def test_stop_event_ends_search() -> None:
+    """A set stop event returns the starting schedule without iterating."""
+    stop_event = threading.Event()
+    stop_event.set()
+    result = run_lns(generate_instance(200, seed=6), 30, stop_event=stop_event)
+    
+    assert result.status == "succeeded"
+    assert result.metrics["lns"]["iterations"] == 0
+    assert result.solver_wall_time_ms < 30_000
@@ -0,0 +1,156 @@
+"""Tests for worker metrics and the Prometheus endpoint."""
+
+import asyncio
+import logging
+import re
+
+import asyncpg
+import pytest
+
+from app import metrics, metrics_server
+from app.metrics import Counter, Histogram, HistogramFamily
+from app.metrics_server import MetricsServer
+
+from tests.factories import insert_job
+
+# A sample line: name, optional label set, value
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z_]+="(?:[^"\\]|\\.)*"(,[a-z_]+="(?:[^"\\]|\\.)*")*\})? \S+$')
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Empty metrics with the real names and buckets."""
+    for name in ("wakeup_to_claim_ms", "queue_wait_ms", "run_duration_ms", "job_outcomes", "job_timeouts"):
+        old = getattr(metrics, name)
+        if isinstance(old, Histogram):
+            new = Histogram(old.name, old.bounds, old.help)
+        elif isinstance(old, HistogramFamily):
+            new = HistogramFamily(old.name, old.bounds, old.label, old.help)
+        else:
+            new = Counter(old.name, old.labels, old.help)
+        monkeypatch.setattr(metrics, name, new)
+    monkeypatch.setattr(metrics, "jobs_in_flight", {})
+
+
+def families(text: str) -> dict[str, list[str]]:
+    """Lines per metric family, keyed by the name in its HELP line."""
+    result: dict[str, list[str]] = {}
+    name = None
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name = line.split()[2]
+            result[name] = []
+        result[name].append(line)
+    return result
+
+
+@pytest.mark.usefixtures("fresh_metrics")
+def test_every_family_has_help_and_type_before_its_samples() -> None:
+    """Each family opens with HELP then TYPE, and every other line is a valid sample."""
+    metrics.job_outcomes.inc("ai_enrich", "succeeded")
+    metrics.jobs_in_flight["schedule_run"] = 2
+    
+    text = metrics.render_prometheus("w1")
+    
+    assert text.endswith("\n")
+    found = families(text)
+    assert list(found) == [
+        "job_wakeup_to_claim_ms",
+        "job_queue_wait_ms",
+        "job_run_duration_ms",
+        "job_outcomes_total",
+        "job_timeouts_total",
+        "jobs_in_flight",
+    ]
+    for name, lines in found.items():
+        assert lines[0].startswith(f"# HELP {name} ") and len(lines[0]) > len(f"# HELP {name} ")
+        assert re.fullmatch(rf"# TYPE {name} (histogram|counter|gauge)", lines[1])
+        for line in lines[2:]:
+            assert line.startswith(name) and SAMPLE.match(line), line
+    assert 'job_outcomes_total{type="ai_enrich",outcome="succeeded"} 1' in found["job_outcomes_total"]
+    assert 'jobs_in_flight{worker_id="w1",type="schedule_run"} 2' in found["jobs_in_flight"]
+
+
+@pytest.mark.usefixtures("fresh_metrics")
+def test_histogram_buckets_are_cumulative() -> None:
+    """`le` buckets count every observation at or below the bound; +Inf equals the count."""
+    for value in (3, 10, 11, 2_000_000):
+        metrics.run_duration_ms.labels("schedule_run").observe(value)
+    
+    lines = families(metrics.render_prometheus("w1"))["job_run_duration_ms"]
+    
+    buckets = {
+        re.search(r'le="([^"]+)"', line).group(1): int(line.split()[-1])
+        for line in lines
+        if "_bucket" in line
+    }
+    assert buckets["10"] == 2  # 10 falls in its own bucket
+    assert buckets["50"] == 3
+    assert buckets["1.2e+06"] == 3
+    assert buckets["+Inf"] == 4
+    assert list(buckets.values()) == sorted(buckets.values())
+    assert 'job_run_duration_ms_sum{type="schedule_run"} 2000024.0' in lines
+    assert 'job_run_duration_ms_count{type="schedule_run"} 4' in lines
+
+
+def test_label_values_are_escaped() -> None:
+    """Backslashes, quotes and newlines in label values are escaped."""
+    assert metrics.format_labels({"org_id": 'a\\b"c\nd'}) == '{org_id="a\\\\b\\"c\\nd"}'
+    assert metrics.format_labels({}) == ""
+
+
+class SlowPool:
+    """Pool whose queries time out, recording the timeout they were given."""
+    
+    def __init__(self) -> None:
+        self.timeouts: list[float] = []
+    
+    async def fetch(self, query: str, *args: object, timeout: float | None = None) -> list:
+        self.timeouts.append(timeout)
+        raise asyncio.TimeoutError
+    
+
+@pytest.mark.usefixtures("fresh_metrics")
+async def test_scrape_without_queue_gauges_when_the_database_is_slow(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """A slow queue query still serves the worker's own metrics."""
+    pool = SlowPool()
+    
+    with caplog.at_level(logging.WARNING, logger="app.metrics_server"):
+        body = await MetricsServer(pool, "w1").render()  # type: ignore[arg-type]
+    
+    assert pool.timeouts == [metrics_server.QUEUE_STATS_TIMEOUT_SECONDS]
+    assert body == metrics.render_prometheus("w1")
+    assert "job_queue_jobs" not in body
+    assert [r.message for r in caplog.records] == ["metrics_queue_stats_failed"]
+
+
+async def test_metrics_endpoint_serves_queue_gauges(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """GET /metrics answers with worker metrics and this org's queue gauges; other paths 404."""
+    await insert_job(db_pool, org_id, "ai_enrich")
+    await insert_job(db_pool, org_id, "ai_enrich")
+    server = MetricsServer(db_pool, "w1")
+    await server.start("127.0.0.1", 0)
+    port = server._server.sockets[0].getsockname()[1]
+    
+    async def get(path: str) -> str:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+        return response
+    
+    try:
+        ok = await get("/metrics")
+        missing = await get("/other")
+    finally:
+        await server.stop()
+    
+    assert ok.startswith("HTTP/1.1 200 OK\r\n")
+    assert "Content-Type: text/plain; version=0.0.4" in ok
+    assert f'job_queue_jobs{{org_id="{org_id}",type="ai_enrich",status="queued"}} 2' in ok
+    assert re.search(r'^job_queue_oldest_due_seconds\{type="ai_enrich"\} \d+\.\d{3}$', ok, re.M)
+    assert "# HELP job_queue_jobs " in ok and "# TYPE job_queue_jobs gauge" in ok
+    assert missing.startswith("HTTP/1.1 404 Not Found\r\n")
@@ -0,0 +1,136 @@
+"""Tests for diff-based schedule publishing."""
+
+import json
+from typing import Any
+
+import asyncpg
+
+from app.scheduler.models import ScheduleItem, ScheduleResult
+from app.scheduler.persistence import diff_schedule, save_schedule_result
+
+from tests.factories import (
+    insert_resources,
+    insert_schedule_run,
+    insert_task,
+    insert_work_order,
+    make_item,
+)
+
+
+def live_row(row_id: str, item: ScheduleItem) -> dict[str, Any]:
+    """Live schedule_items row for an item, as `_publish_items` reads it."""
+    return {
+        "id": row_id,
+        "task_id": item.task_id,
+        "technician_id": item.technician_id,
+        "bay_id": item.bay_id,
+        "start_at": item.start_at,
+        "end_at": item.end_at,
+        "is_locked": item.is_locked,
+        "why": item.why,
+    }
+
+
+def test_diff_counts_each_kind_of_change() -> None:
+    """Every item lands in exactly one bucket, checked in order."""
+    why = {"reason": "optimized"}
+    live = [
+        live_row("r-same", make_item("same", "t1", "b1", 0, 60, why=why)),
+        live_row("r-tech", make_item("tech", "t1", "b1", 60, 120, why=why)),
+        live_row("r-bay", make_item("bay", "t2", "b1", 0, 60, why=why)),
+        live_row("r-moved", make_item("moved", "t2", "b2", 60, 120, why=why)),
+        live_row("r-lock", make_item("lock", "t1", "b2", 120, 180, why=why)),
+        live_row("r-why", make_item("why", "t2", "b2", 180, 240, why=why)),
+        live_row("r-gone", make_item("gone", "t1", "b1", 300, 360, why=why)),
+    ]
+    items = [
+        make_item("same", "t1", "b1", 0, 60, why=why),
+        make_item("tech", "t2", "b1", 60, 120, why=why),
+        make_item("bay", "t2", "b2", 0, 60, why=why),
+        make_item("moved", "t2", "b2", 90, 150, why=why),
+        make_item("lock", "t1", "b2", 120, 180, is_locked=True, why=why),
+        make_item("why", "t2", "b2", 180, 240, why={**why, "late_by_minutes": 5}),
+        make_item("added", "t1", "b1", 360, 420, why=why),
+    ]
+    
+    changes, inserts, retire_ids = diff_schedule(live, items, publish_seq=4)
+    
+    assert changes.to_dict() == {
+        "publish_seq": 4,
+        "new": 1,
+        "reassigned": 2,
+        "moved": 1,
+        "lock_changed": 1,
+        "why_changed": 1,
+        "unchanged": 1,
+        "dropped": 1,
+    }
+    assert [item.task_id for item in inserts] == ["tech", "bay", "moved", "lock", "why", "added"]
+    assert sorted(retire_ids) == ["r-bay", "r-gone", "r-lock", "r-moved", "r-tech", "r-why"]
+
+
+def test_diff_of_identical_schedule_writes_nothing() -> None:
+    """Republishing the live schedule keeps every row."""
+    items = [
+        make_item("a", "t1", "b1", 0, 60, why={"reason": "optimized", "risk": {"p": 0.1}}),
+        make_item("b", "t1", "b1", 60, 120, is_locked=True, why={"reason": "locked"}),
+    ]
+    live = [live_row(f"r-{item.task_id}", item) for item in items]
+    
+    changes, inserts, retire_ids = diff_schedule(live, items, publish_seq=2)
+    
+    assert (changes.unchanged, inserts, retire_ids) == (2, [], [])
+
+
+async def test_publish_rewrites_items_whose_why_changed(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """`why` round-trips through jsonb, and only an item whose `why` changed is rewritten."""
+    tech_id, bay_id = await insert_resources(db_pool, org_id)
+    wo_id = await insert_work_order(db_pool, org_id)
+    first = await insert_task(db_pool, org_id, wo_id)
+    second = await insert_task(db_pool, org_id, wo_id)
+    
+    for late_by in (5, 5, 10):
+        items = [
+            make_item(first, tech_id, bay_id, 0, 60, why={
+                "reason": "optimized",
+                "risk": {"p_work_order_late": 0.125, "expected_start_delay_minutes": 2.5},
+            }),
+            make_item(second, tech_id, bay_id, 60, 120, why={
+                "reason": "optimized",
+                "late_by_minutes": late_by,
+            }),
+        ]
+        run_id = await insert_schedule_run(db_pool, org_id, status="running")
+        await save_schedule_result(db_pool, run_id, ScheduleResult(
+            status="succeeded",
+            items=items,
+            solver_wall_time_ms=1,
+            objective_value=0,
+            objective_breakdown=None,
+        ), org_id)
+    
+    rows = await db_pool.fetch(
+        """
+        select metrics->'changes' as changes
+        from public.schedule_runs
+        where org_id = $1::uuid
+        order by publish_seq
+        """,
+        org_id,
+    )
+    live_why = await db_pool.fetchval(
+        """
+        select why::text
+        from public.schedule_items
+        where task_id = $1::uuid and retired_seq is null
+        """,
+        second,
+    )
+    
+    counts = [json.loads(row["changes"]) for row in rows]
+    assert [(c["new"], c["why_changed"], c["unchanged"]) for c in counts] == [
+        (2, 0, 0),
+        (0, 0, 2),
+        (0, 1, 1),
+    ]
+    assert json.loads(live_why) == {"reason": "optimized", "late_by_minutes": 10}
@@ -0,0 +1,63 @@
+"""Tests for the portfolio runner."""
+
+import pytest
+
+from app.scheduler.models import ScheduleResult
+from app.scheduler.portfolio import _is_conclusive, relative_gap, run_portfolio
+from app.scheduler.synthetic import generate_instance
+from app.scheduler.validator import validate_schedule
+
+
+def _result(solver_status: str, objective: float | None = 100.0, bound: float | None = None) -> ScheduleResult:
+    return ScheduleResult(
+        status="succeeded" if objective is not None else "failed",
+        items=[],
+        solver_wall_time_ms=0,
+        objective_value=objective,
+        objective_breakdown=None,
+        metrics={"solver_status": solver_status, "best_objective_bound": bound},
+    )
+
+
+def test_relative_gap() -> None:
+    """Gap is relative to the objective and never negative."""
+    assert relative_gap(100, 90) == pytest.approx(0.1)
+    assert relative_gap(100, 100) == 0
+    assert relative_gap(100, 120) == 0
+    # Objectives near zero are not blown up
+    assert relative_gap(0.5, 0) == pytest.approx(0.5)
+
+
+def test_is_conclusive() -> None:
+    """Only full CP-SAT results can end the race."""
+    assert _is_conclusive("cp_sat", _result("OPTIMAL"), 0.01)
+    assert _is_conclusive("cp_sat_hinted", _result("INFEASIBLE", objective=None), 0.01)
+    assert _is_conclusive("cp_sat", _result("FEASIBLE", 100.0, bound=99.5), 0.01)
+    assert not _is_conclusive("cp_sat", _result("FEASIBLE", 100.0, bound=50.0), 0.01)
+    # A decomposed or heuristic optimum is only optimal for its sub-problems
+    assert not _is_conclusive("decomposed", _result("OPTIMAL"), 0.01)
+    assert not _is_conclusive("heuristic", _result("OPTIMAL"), 0.01)
+
+
+def test_unknown_strategy_rejected() -> None:
+    """Unknown strategy names fail before any process starts."""
+    with pytest.raises(ValueError, match="nope"):
+        run_portfolio(generate_instance(5), 1, strategies=["cp_sat", "nope"])
+
+
+def test_portfolio_returns_best_valid_schedule() -> None:
+    """The winner is a valid schedule with per-strategy stats."""
+    input_data = generate_instance(40, seed=3)
+    result = run_portfolio(input_data, 10, strategies=["cp_sat", "heuristic"])
+    
+    assert result.status == "succeeded"
+    assert len(result.items) == len(input_data.tasks)
+    assert validate_schedule(input_data, result.items).is_valid
+    
+    portfolio = result.metrics["portfolio"]
+    assert result.metrics["strategy"] == portfolio["winner"]
+    assert set(portfolio["strategies"]) == {"cp_sat", "heuristic"}
+    winner_objective = portfolio["strategies"][portfolio["winner"]]["objective_value"]
+    for stats in portfolio["strategies"].values():
+        if stats["status"] == "succeeded":
+            assert winner_objective <= stats["objective_value"]
@@ -0,0 +1,49 @@
+"""Tests for solver profile selection."""
+
+import pytest
+from ortools.sat import sat_parameters_pb2
+
+from app.scheduler.profiles import PROFILES, select_profile, size_bucket
+
+
+def test_named_profile_wins_over_task_count() -> None:
+    """An explicit name (per run or per org) is used whatever the run's size."""
+    assert select_profile(5000, "thorough") is PROFILES["thorough"]
+    assert select_profile(10, "fast") is PROFILES["fast"]
+
+
+@pytest.mark.parametrize(
+    ("task_count", "name"),
+    [(0, "thorough"), (100, "thorough"), (101, "balanced"), (1000, "balanced"), (1001, "fast")],
+)
+def test_size_bucket_picks_the_profile(task_count: int, name: str) -> None:
+    """Without a name the task count's bucket decides; bucket bounds are inclusive."""
+    assert select_profile(task_count).name == name
+
+
+def test_empty_name_falls_back_to_the_size_bucket() -> None:
+    """An org without `scheduler_profile` (None or empty) gets the size default."""
+    assert select_profile(50, None) is select_profile(50, "") is PROFILES["thorough"]
+    assert size_bucket(10**6) is None
+
+
+def test_unknown_name_is_rejected() -> None:
+    """A typo in a payload or org setting fails loudly instead of using a default."""
+    with pytest.raises(ValueError, match="Unknown solver profile: quick .*fast, balanced, thorough"):
+        select_profile(50, "quick")
+
+
+def test_profile_applies_its_parameters() -> None:
+    """Profiles write their fields into SatParameters; None workers leaves the default."""
+    parameters = sat_parameters_pb2.SatParameters()
+    PROFILES["fast"].apply(parameters)
+    
+    assert parameters.num_workers == 4
+    assert parameters.linearization_level == 0
+    assert parameters.relative_gap_limit == pytest.approx(0.05)
+    
+    parameters = sat_parameters_pb2.SatParameters()
+    PROFILES["thorough"].apply(parameters)
+    
+    assert not parameters.HasField("num_workers")
+    assert parameters.linearization_level == 2
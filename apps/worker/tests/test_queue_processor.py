@@ -0,0 +1,242 @@
+"""Tests for the job queue SQL (needs TEST_DATABASE_URL)."""
+
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+import pytest
+
+from app.job_errors import NonRetryableError, RetryableError
+from app.queue_processor import (
+    JOB_HANDLERS,
+    claim_jobs,
+    claim_next_job,
+    extend_leases,
+    mark_job_failed,
+    mark_job_succeeded,
+    mark_jobs_succeeded,
+    reap_expired_jobs,
+    release_jobs,
+    run_job,
+)
+
+from tests.factories import insert_job
+
+WORKER_ID = "test-worker"
+
+pytestmark = pytest.mark.usefixtures("idle_queue")
+
+
+async def test_claim_and_complete_batch(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """claim_jobs takes up to the slots per type; mark_jobs_succeeded moves them to history."""
+    enrich = [await insert_job(db_pool, org_id, "ai_enrich") for _ in range(3)]
+    retention = await insert_job(db_pool, org_id, "retention")
+    
+    claimed = await claim_jobs(db_pool, WORKER_ID, {"ai_enrich": 2, "retention": 5, "schedule_run": 0})
+    
+    claimed_ids = {job["id"] for job in claimed}
+    assert claimed_ids == set(enrich[:2]) | {retention}
+    assert all(job["attempts"] == 1 and job["org_id"] == org_id for job in claimed)
+    rows = await db_pool.fetch(
+        """
+        select id::text as id, status, locked_by, lease_expires_at > now() as leased
+        from public.job_queue
+        where org_id = $1::uuid and status = 'running'
+        """,
+        org_id,
+    )
+    assert {row["id"] for row in rows} == claimed_ids
+    assert all(row["locked_by"] == WORKER_ID and row["leased"] for row in rows)
+    
+    await mark_jobs_succeeded(db_pool, list(claimed_ids), WORKER_ID)
+    
+    history = await db_pool.fetch(
+        "select id::text as id, status, attempts from public.job_history where org_id = $1::uuid",
+        org_id,
+    )
+    assert {row["id"] for row in history} == claimed_ids
+    assert all(row["status"] == "succeeded" and row["attempts"] == 1 for row in history)
+    assert await db_pool.fetchval(
+        "select array_agg(id::text) from public.job_queue where org_id = $1::uuid", org_id
+    ) == [enrich[2]]
+
+
+async def test_claim_skips_future_and_zero_slots(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """Jobs not yet due, and types without a free slot, are left queued."""
+    await insert_job(db_pool, org_id, run_after=datetime.now(timezone.utc) + timedelta(hours=1))
+    await insert_job(db_pool, org_id, "retention")
+    
+    assert await claim_jobs(db_pool, WORKER_ID, {"ai_enrich": 5, "retention": 0}) == []
+    assert await claim_jobs(db_pool, WORKER_ID, {}) == []
+
+
+async def test_release_returns_own_jobs_without_counting_the_attempt(
+    db_pool: asyncpg.Pool, org_id: str
+) -> None:
+    """release_jobs requeues this worker's running jobs only."""
+    own = await insert_job(db_pool, org_id)
+    other = await insert_job(db_pool, org_id)
+    claimed = await claim_jobs(db_pool, WORKER_ID, {"ai_enrich": 1})
+    assert [job["id"] for job in claimed] == [own]
+    await claim_jobs(db_pool, "other-worker", {"ai_enrich": 1})
+    
+    assert await release_jobs(db_pool, [own, other], WORKER_ID) == 1
+    
+    rows = {
+        row["id"]: row
+        for row in await db_pool.fetch(
+            """
+            select id::text as id, status, attempts, locked_by, lease_expires_at
+            from public.job_queue
+            where org_id = $1::uuid
+            """,
+            org_id,
+        )
+    }
+    assert rows[own]["status"] == "queued"
+    assert rows[own]["attempts"] == 0
+    assert rows[own]["locked_by"] is None and rows[own]["lease_expires_at"] is None
+    assert rows[other]["status"] == "running" and rows[other]["locked_by"] == "other-worker"
+    assert await release_jobs(db_pool, [], WORKER_ID) == 0
+
+
+async def test_claim_takes_highest_priority_first(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """A later job with a higher priority jumps the queue; equal ones go oldest first."""
+    normal = [await insert_job(db_pool, org_id) for _ in range(2)]
+    urgent = await insert_job(db_pool, org_id, priority=10)
+    
+    order = []
+    while job := await claim_next_job(db_pool, WORKER_ID, ["ai_enrich"]):
+        order.append(job["id"])
+    
+    assert order == [urgent, *normal]
+
+
+async def test_batch_claim_shares_slots_across_orgs(
+    db_pool: asyncpg.Pool, org_id: str, other_org_id: str
+) -> None:
+    """Within a priority, orgs take turns: a backlog in one org cannot fill the batch."""
+    busy = [await insert_job(db_pool, org_id) for _ in range(5)]
+    quiet = [await insert_job(db_pool, other_org_id) for _ in range(2)]
+    
+    claimed = await claim_jobs(db_pool, WORKER_ID, {"ai_enrich": 5})
+    
+    assert {job["id"] for job in claimed} == {*busy[:3], *quiet}
+
+
+async def test_reaper_requeues_or_dead_letters_expired_jobs(
+    db_pool: asyncpg.Pool, org_id: str
+) -> None:
+    """Expired leases are requeued with attempts left, dead-lettered without; live ones stay."""
+    expired = datetime.now(timezone.utc) - timedelta(seconds=5)
+    retry = await insert_job(
+        db_pool, org_id, status="running", locked_by="gone", lease_expires_at=expired,
+        attempts=1, max_attempts=3,
+    )
+    dead = await insert_job(
+        db_pool, org_id, status="running", locked_by="gone", lease_expires_at=expired,
+        attempts=3, max_attempts=3,
+    )
+    alive = await insert_job(
+        db_pool, org_id, status="running", locked_by=WORKER_ID,
+        lease_expires_at=datetime.now(timezone.utc) + timedelta(minutes=1), attempts=1,
+    )
+    
+    assert await reap_expired_jobs(db_pool) >= 2
+    
+    queue = {
+        row["id"]: row
+        for row in await db_pool.fetch(
+            """
+            select id::text as id, status, attempts, error_class, locked_by
+            from public.job_queue
+            where org_id = $1::uuid
+            """,
+            org_id,
+        )
+    }
+    history = await db_pool.fetchrow(
+        "select id::text as id, status, error_class from public.job_history where org_id = $1::uuid",
+        org_id,
+    )
+    assert set(queue) == {retry, alive}
+    assert queue[retry]["status"] == "queued" and queue[retry]["attempts"] == 1
+    assert queue[retry]["error_class"] == "lease_expired" and queue[retry]["locked_by"] is None
+    assert queue[alive]["status"] == "running"
+    assert dict(history) == {"id": dead, "status": "failed", "error_class": "lease_expired"}
+
+
+async def test_extend_leases_only_for_own_running_jobs(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """A worker that lost a job to the reaper learns so from extend_leases."""
+    soon = datetime.now(timezone.utc) + timedelta(seconds=5)
+    own = await insert_job(db_pool, org_id, status="running", locked_by=WORKER_ID, lease_expires_at=soon)
+    taken = await insert_job(db_pool, org_id, status="running", locked_by="other-worker", lease_expires_at=soon)
+    requeued = await insert_job(db_pool, org_id)
+    
+    assert await extend_leases(db_pool, [own, taken, requeued], WORKER_ID) == {own}
+    assert await db_pool.fetchval(
+        "select lease_expires_at > $2 from public.job_queue where id = $1::uuid", own, soon
+    )
+    assert await extend_leases(db_pool, [], WORKER_ID) == set()
+
+
+async def test_stale_worker_cannot_finish_a_reclaimed_job(db_pool: asyncpg.Pool, org_id: str) -> None:
+    """A worker whose job was reaped and claimed again cannot finish or requeue it."""
+    expired = datetime.now(timezone.utc) - timedelta(seconds=5)
+    job_id = await insert_job(
+        db_pool, org_id, status="running", locked_by=WORKER_ID, lease_expires_at=expired,
+        attempts=1, max_attempts=3,
+    )
+    assert await reap_expired_jobs(db_pool) >= 1
+    claimed = await claim_jobs(db_pool, "other-worker", {"ai_enrich": 1})
+    assert [job["id"] for job in claimed] == [job_id]
+    
+    assert await mark_job_succeeded(db_pool, job_id, WORKER_ID) is False
+    assert await mark_jobs_succeeded(db_pool, [job_id], WORKER_ID) == 0
+    assert await mark_job_failed(db_pool, job_id, WORKER_ID, "late", 2, 3) is None
+    assert await mark_job_failed(db_pool, job_id, WORKER_ID, "late", 3, 3) is None
+    
+    row = await db_pool.fetchrow(
+        "select status, locked_by, attempts, error_class from public.job_queue where id = $1::uuid",
+        job_id,
+    )
+    assert dict(row) == {
+        "status": "running",
+        "locked_by": "other-worker",
+        "attempts": 2,
+        "error_class": "lease_expired",
+    }
+    assert not await db_pool.fetchval(
+        "select count(*) from public.job_history where id = $1::uuid", job_id
+    )
+    assert await mark_job_succeeded(db_pool, job_id, "other-worker") is True
+
+async def test_non_retryable_error_dead_letters_at_once(
+    db_pool: asyncpg.Pool, org_id: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """NonRetryableError skips the remaining attempts; RetryableError is requeued."""
+    errors = {"final": NonRetryableError("bad payload"), "transient": RetryableError("reset")}
+    
+    async def handler(pool: asyncpg.Pool, job_id: str, payload: dict) -> None:
+        raise errors[payload["kind"]]
+    
+    monkeypatch.setitem(JOB_HANDLERS, "ai_enrich", handler)
+    final = await insert_job(db_pool, org_id, payload='{"kind": "final"}', max_attempts=5)
+    transient = await insert_job(db_pool, org_id, payload='{"kind": "transient"}', max_attempts=5)
+    for job in await claim_jobs(db_pool, WORKER_ID, {"ai_enrich": 2}):
+        await run_job(db_pool, job, WORKER_ID)
+    
+    history = await db_pool.fetchrow(
+        "select id::text as id, status, error, error_class from public.job_history where org_id = $1::uuid",
+        org_id,
+    )
+    queued = await db_pool.fetchrow(
+        "select id::text as id, status, attempts, error_class from public.job_queue where org_id = $1::uuid",
+        org_id,
+    )
+    assert dict(history) == {
+        "id": final,
+        "status": "failed",
+        "error": "NonRetryableError: bad payload",
+        "error_class": "non_retryable",
+    }
+    assert dict(queued) == {"id": transient, "status": "queued", "attempts": 1, "error_class": "error"}
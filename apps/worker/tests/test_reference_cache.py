@@ -0,0 +1,86 @@
+"""Tests for the scheduler reference data cache."""
+
+import asyncio
+import os
+
+import asyncpg
+import pytest
+
+from app.scheduler import reference_cache as reference_cache_module
+from app.scheduler.reference_cache import ReferenceCache
+
+
+class Clock:
+    """Stand-in for time.monotonic."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(reference_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_short_ttl_without_listener(clock: Clock) -> None:
+    """Without LISTEN, entries live for the short TTL only."""
+    cache = ReferenceCache(ttl_seconds=900, unlistened_ttl_seconds=30)
+    cache.put("org", [], [], cache.generation("org"))
+    
+    assert not cache.listening
+    assert cache.current_ttl == 30
+    clock.now += 29
+    assert cache.get("org") is not None
+    clock.now += 2
+    assert cache.get("org") is None
+
+
+def test_zero_unlistened_ttl_bypasses_cache(clock: Clock) -> None:
+    """An unlistened TTL of 0 keeps the old bypass-without-listener behaviour."""
+    cache = ReferenceCache(ttl_seconds=900, unlistened_ttl_seconds=0)
+    cache.put("org", [], [], cache.generation("org"))
+    
+    assert not cache.enabled
+    assert cache.get("org") is None
+
+
+def test_load_racing_invalidation_is_not_cached(clock: Clock) -> None:
+    """Data read before an invalidation is dropped by put."""
+    cache = ReferenceCache(ttl_seconds=900, unlistened_ttl_seconds=30)
+    generation = cache.generation("org")
+    cache.invalidate("org")
+    cache.put("org", [], [], generation)
+    
+    assert cache.get("org") is None
+
+
+async def test_notification_evicts_org(
+    db_pool: asyncpg.Pool, org_id: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A technician change notifies the listener, which evicts the org."""
+    monkeypatch.setenv("LISTEN_DATABASE_URL", os.environ["TEST_DATABASE_URL"])
+    cache = ReferenceCache(ttl_seconds=900, unlistened_ttl_seconds=30)
+    await cache.ensure_listening()
+    try:
+        assert cache.listening
+        assert cache.current_ttl == 900
+        cache.put(org_id, [], [], cache.generation(org_id))
+        
+        await db_pool.execute(
+            "insert into public.technicians (org_id, name) values ($1::uuid, 'Tech')", org_id
+        )
+        for _ in range(50):
+            if cache.get(org_id) is None:
+                break
+            await asyncio.sleep(0.02)
+        assert cache.get(org_id) is None
+    finally:
+        await cache.stop()
+    
+    assert not cache.listening
+    assert cache.current_ttl == 30
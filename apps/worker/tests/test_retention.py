@@ -0,0 +1,114 @@
+"""Tests for the retention job (needs TEST_DATABASE_URL)."""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from app.handlers.retention import handle_retention
+
+from tests.factories import (
+    HORIZON_START,
+    insert_job,
+    insert_resources,
+    insert_schedule_run,
+    insert_task,
+    insert_work_order,
+)
+
+
+async def ids(pool: asyncpg.Pool, table: str, org_id: str) -> set[str]:
+    """IDs of an org's rows in a table."""
+    rows = await pool.fetch(
+        f"select id::text as id from public.{table} where org_id = $1::uuid", org_id
+    )
+    return {row["id"] for row in rows}
+
+
+async def insert_history(pool: asyncpg.Pool, org_id: str, updated_at: datetime) -> str:
+    """Succeeded job in job_history; returns its ID."""
+    return await pool.fetchval(
+        """
+        insert into public.job_history (org_id, type, payload, status, updated_at)
+        values ($1::uuid, 'ai_enrich', '{}', 'succeeded', $2)
+        returning id::text
+        """,
+        org_id,
+        updated_at,
+    )
+
+
+async def test_finished_jobs_move_to_history_then_archive(
+    db_pool: asyncpg.Pool, org_id: str
+) -> None:
+    """Finished jobs leave job_queue; history past the org's retention is archived."""
+    now = datetime.now(timezone.utc)
+    await db_pool.execute(
+        "update public.organizations set job_retention_days = 7 where id = $1::uuid", org_id
+    )
+    stale = await insert_job(db_pool, org_id, status="succeeded", updated_at=now - timedelta(days=1))
+    queued = await insert_job(db_pool, org_id)
+    old = await insert_history(db_pool, org_id, now - timedelta(days=8))
+    recent = await insert_history(db_pool, org_id, now - timedelta(days=6))
+    
+    await handle_retention(db_pool, queued, {"org_id": org_id})
+    
+    assert await ids(db_pool, "job_queue", org_id) == {queued}
+    assert await ids(db_pool, "job_history", org_id) == {stale, recent}
+    assert await ids(db_pool, "job_queue_archive", org_id) == {old}
+    result = json.loads(await db_pool.fetchval(
+        "select result from public.job_queue where id = $1::uuid", queued
+    ))
+    assert result["jobs_moved_to_history"] == 1
+    assert result["jobs_archived"] == 1
+    assert result["complete"] is True
+
+
+async def test_retired_items_are_archived_after_retention(
+    db_pool: asyncpg.Pool, org_id: str
+) -> None:
+    """Items retired by a publish older than the item retention move to the archive."""
+    now = datetime.now(timezone.utc)
+    await db_pool.execute(
+        "update public.organizations set schedule_item_retention_days = 30 where id = $1::uuid",
+        org_id,
+    )
+    tech_id, bay_id = await insert_resources(db_pool, org_id)
+    task_id = await insert_task(db_pool, org_id, await insert_work_order(db_pool, org_id))
+    old_publish = await insert_schedule_run(
+        db_pool, org_id, status="succeeded", publish_seq=2, updated_at=now - timedelta(days=31)
+    )
+    await insert_schedule_run(
+        db_pool, org_id, status="succeeded", publish_seq=3, updated_at=now - timedelta(days=1)
+    )
+    
+    async def item(published_seq: int, retired_seq: int | None) -> str:
+        return await db_pool.fetchval(
+            """
+            insert into public.schedule_items (
+              org_id, schedule_run_id, task_id, technician_id, bay_id,
+              start_at, end_at, published_seq, retired_seq
+            )
+            values ($1::uuid, $2::uuid, $3::uuid, $4::uuid, $5::uuid, $6, $7, $8, $9)
+            returning id::text
+            """,
+            org_id,
+            old_publish,
+            task_id,
+            tech_id,
+            bay_id,
+            HORIZON_START,
+            HORIZON_START + timedelta(hours=1),
+            published_seq,
+            retired_seq,
+        )
+    
+    retired_long_ago = await item(1, 2)
+    retired_recently = await item(2, 3)
+    live = await item(3, None)
+    
+    await handle_retention(db_pool, str(uuid.uuid4()), {"org_id": org_id})
+    
+    assert await ids(db_pool, "schedule_items", org_id) == {retired_recently, live}
+    assert await ids(db_pool, "schedule_items_archive", org_id) == {retired_long_ago}
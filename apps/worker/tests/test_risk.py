@@ -0,0 +1,109 @@
+"""Tests for Monte Carlo duration risk."""
+
+import pytest
+
+from app.scheduler.heuristic import run_heuristic
+from app.scheduler.models import ScheduleInput, ScheduleItem, WorkOrder
+from app.scheduler.risk import evaluate_duration_risk
+from app.scheduler.synthetic import generate_instance
+
+from tests.factories import at, make_input, make_item, make_locked_task, make_task
+
+
+def overrun_input() -> tuple[ScheduleInput, list[ScheduleItem]]:
+    """`a` plans 120 of 60-180 minutes, then `b` and locked `c` follow on t1."""
+    return make_input(
+        [
+            make_task("a", duration_minutes_low=60, duration_minutes_high=180, duration=120),
+            make_task("b", work_order_id="wo2"),
+            make_locked_task("c", "t1", "b1", 180, 240),
+        ],
+        work_orders={
+            "wo1": WorkOrder(id="wo1", priority=3, due_date=None, parts_ready=True),
+            "wo2": WorkOrder(id="wo2", priority=3, due_date=at(180), parts_ready=True),
+        },
+    ), [
+        make_item("a", "t1", "b1", 0, 120),
+        make_item("b", "t1", "b1", 120, 180),
+        make_item("c", "t1", "b1", 180, 240, is_locked=True),
+    ]
+
+
+def test_same_seed_same_report() -> None:
+    """Reruns of the same schedule report the same risk; other seeds differ."""
+    input_data = generate_instance(300, seed=1)
+    items = run_heuristic(input_data).items
+    
+    def stored(seed: int) -> dict:
+        report = evaluate_duration_risk(input_data, items, scenarios=200, seed=seed)
+        result = report.to_dict()
+        del result["wall_time_ms"]
+        return {"report": result, "tasks": report.task_risk}
+    
+    assert stored(7) == stored(7)
+    assert stored(7) != stored(8)
+
+
+def test_fixed_durations_carry_no_risk() -> None:
+    """Without a duration spread nothing can overrun."""
+    input_data = make_input(
+        [make_task("a"), make_task("b", work_order_id="wo2")],
+        work_orders={
+            "wo1": WorkOrder(id="wo1", priority=3, due_date=at(60), parts_ready=True),
+            "wo2": WorkOrder(id="wo2", priority=3, due_date=at(120), parts_ready=True),
+        },
+    )
+    report = evaluate_duration_risk(input_data, [
+        make_item("a", "t1", "b1", 0, 60),
+        make_item("b", "t1", "b1", 60, 120),
+    ], scenarios=100)
+    
+    assert report.expected_late_work_orders == 0
+    assert report.expected_overtime_minutes == 0
+    assert report.technicians == []
+    assert all(risk["expected_start_delay_minutes"] == 0 for risk in report.task_risk.values())
+
+
+def test_overrun_pushes_later_work() -> None:
+    """An overrun delays the tasks behind it, locked ones included."""
+    input_data, items = overrun_input()
+    report = evaluate_duration_risk(input_data, items, scenarios=4000, seed=3)
+    
+    # Symmetric triangular over 60-180: P(a > 120) = 1/2, E[(a - 120)+] = 60/6
+    assert report.work_orders[0]["work_order_id"] == "wo2"
+    assert report.work_orders[0]["p_late"] == pytest.approx(0.5, abs=0.05)
+    assert report.task_risk["b"]["expected_start_delay_minutes"] == pytest.approx(10, abs=1.5)
+    assert report.task_risk["c"]["expected_start_delay_minutes"] == pytest.approx(10, abs=1.5)
+    assert report.task_risk["a"] == {"p_work_order_late": 0.0, "expected_start_delay_minutes": 0.0}
+    assert report.technicians[0]["technician_id"] == "t1"
+    assert report.expected_overtime_minutes == pytest.approx(10, abs=1.5)
+
+
+def test_annotate_adds_risk_to_why() -> None:
+    """annotate keeps existing `why` entries and adds `risk`."""
+    input_data, items = overrun_input()
+    items[1].why = {"reason": "scheduled"}
+    report = evaluate_duration_risk(input_data, items, scenarios=100)
+    annotated = report.annotate(items)
+    
+    assert annotated[1].why == {"reason": "scheduled", "risk": report.task_risk["b"]}
+    assert items[1].why == {"reason": "scheduled"}
+
+
+def test_unrelated_change_keeps_task_risk() -> None:
+    """A task's samples do not depend on which other tasks are in the schedule."""
+    input_data, items = overrun_input()
+    before = evaluate_duration_risk(input_data, items, scenarios=500).task_risk
+    
+    # Another uncertain task, simulated first, on the other technician and bay
+    input_data, items = overrun_input()
+    input_data.tasks.insert(0, make_task(
+        "d", work_order_id="wo3", duration_minutes_low=30, duration_minutes_high=90
+    ))
+    input_data.work_orders["wo3"] = WorkOrder(id="wo3", priority=3, due_date=at(60), parts_ready=True)
+    after = evaluate_duration_risk(
+        input_data, [make_item("d", "t2", "b2", 0, 60), *items], scenarios=500
+    ).task_risk
+    
+    assert {task_id: after[task_id] for task_id in before} == before
+    assert after["d"]["p_work_order_late"] > 0
@@ -0,0 +1,63 @@
+"""Tests for cancelling the schedule run handler (needs TEST_DATABASE_URL)."""
+
+import asyncio
+import threading
+from datetime import timedelta
+
+import asyncpg
+import pytest
+
+from app.handlers import schedule_run
+from app.handlers.schedule_run import handle_schedule_run
+from app.job_errors import JOB_RELEASED
+
+from tests.factories import (
+    HORIZON_START,
+    insert_resources,
+    insert_schedule_run,
+    insert_task,
+    insert_work_order,
+)
+
+
+@pytest.mark.parametrize(
+    ("cancel_message", "status"),
+    [(None, "failed"), (JOB_RELEASED, "queued")],
+)
+async def test_cancel_stops_the_solve_and_settles_the_run(
+    db_pool: asyncpg.Pool,
+    org_id: str,
+    monkeypatch: pytest.MonkeyPatch,
+    cancel_message: str | None,
+    status: str,
+) -> None:
+    """A cancelled run signals the solver to stop and does not stay 'running'."""
+    await insert_resources(db_pool, org_id)
+    await insert_task(db_pool, org_id, await insert_work_order(db_pool, org_id))
+    run_id = await insert_schedule_run(db_pool, org_id)
+    solving = threading.Event()
+    stopped = threading.Event()
+    
+    def solve(*args: object, stop_event: threading.Event, **kwargs: object) -> None:
+        solving.set()
+        if stop_event.wait(5):
+            stopped.set()
+    
+    monkeypatch.setattr(schedule_run, "_solve", solve)
+    handler = asyncio.create_task(handle_schedule_run(db_pool, "job", {
+        "schedule_run_id": run_id,
+        "org_id": org_id,
+        "horizon_start": HORIZON_START.isoformat(),
+        "horizon_end": (HORIZON_START + timedelta(days=1)).isoformat(),
+    }))
+    while not solving.is_set():
+        await asyncio.sleep(0.01)
+    
+    handler.cancel(cancel_message)
+    with pytest.raises(asyncio.CancelledError):
+        await handler
+    
+    assert stopped.is_set()
+    assert await db_pool.fetchval(
+        "select status from public.schedule_runs where id = $1::uuid", run_id
+    ) == status
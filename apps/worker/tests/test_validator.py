@@ -0,0 +1,169 @@
+"""Tests for schedule validation."""
+
+from app.scheduler.heuristic import run_heuristic
+from app.scheduler.synthetic import generate_instance
+from app.scheduler.validator import (
+    MAX_REPORTED_VIOLATIONS,
+    ValidationReport,
+    validate_schedule,
+)
+
+from tests.factories import at, make_input, make_item, make_locked_task, make_task
+
+
+def kinds(report: ValidationReport) -> dict[str, str]:
+    """Severity per violation kind."""
+    return {v.kind: v.severity for v in report.violations}
+
+
+def test_valid_schedule_has_no_violations() -> None:
+    """A heuristic schedule passes validation."""
+    input_data = generate_instance(200, seed=1)
+    report = validate_schedule(input_data, run_heuristic(input_data).items)
+    
+    assert report.is_valid
+    assert report.violations == []
+    assert report.checked_items == len(input_data.tasks)
+
+
+def test_overlap_on_technician_and_bay_is_an_error() -> None:
+    """Two unlocked tasks on the same technician and bay at once."""
+    input_data = make_input([make_task("a"), make_task("b")])
+    report = validate_schedule(input_data, [
+        make_item("a", "t1", "b1", 0, 60),
+        make_item("b", "t1", "b1", 30, 90),
+    ])
+    
+    assert kinds(report) == {"technician_overlap": "error", "bay_overlap": "error"}
+    assert report.violations[0].task_ids == ["a", "b"]
+    assert not report.is_valid
+
+
+def test_back_to_back_tasks_do_not_overlap() -> None:
+    """A task may start the minute the previous one ends."""
+    input_data = make_input([make_task("a"), make_task("b")])
+    report = validate_schedule(input_data, [
+        make_item("a", "t1", "b1", 0, 60),
+        make_item("b", "t1", "b1", 60, 120),
+    ])
+    
+    assert report.violations == []
+
+
+def test_overlap_between_locked_tasks_is_a_warning() -> None:
+    """Hand-edited locks that collide are reported but do not fail the run."""
+    input_data = make_input([
+        make_locked_task("l1", "t1", "b1", 0, 60),
+        make_locked_task("l2", "t1", "b2", 30, 90),
+    ])
+    report = validate_schedule(input_data, [
+        make_item("l1", "t1", "b1", 0, 60, is_locked=True),
+        make_item("l2", "t1", "b2", 30, 90, is_locked=True),
+    ])
+    
+    assert kinds(report) == {"technician_overlap": "warning"}
+    assert "both locked" in report.violations[0].message
+    assert report.is_valid
+    assert len(report.warnings) == 1
+
+
+def test_hard_skill_and_bay_type() -> None:
+    """Hard skills and bay types must be met; soft skills need not be."""
+    input_data = make_input([
+        make_task("hard", required_skill="engine", required_skill_is_hard=True),
+        make_task("soft", required_skill="engine"),
+        make_task("paint", required_bay_type="paint"),
+    ])
+    report = validate_schedule(input_data, [
+        make_item("hard", "t2", "b1", 0, 60),
+        make_item("soft", "t2", "b2", 60, 120),
+        make_item("paint", "t1", "b1", 120, 180),
+    ])
+    
+    assert {(v.kind, v.task_ids[0]) for v in report.violations} == {
+        ("skill", "hard"),
+        ("bay_type", "paint"),
+    }
+
+
+def test_time_window_horizon_and_duration() -> None:
+    """Per-item checks on unlocked tasks."""
+    input_data = make_input(
+        [
+            make_task("early", earliest_start=at(120)),
+            make_task("late", latest_finish=at(60)),
+            make_task("outside"),
+            make_task("short"),
+        ],
+        horizon_minutes=600,
+    )
+    report = validate_schedule(input_data, [
+        make_item("early", "t1", "b1", 60, 120),
+        make_item("late", "t2", "b2", 30, 90),
+        make_item("outside", "t1", "b1", 570, 630),
+        make_item("short", "t2", "b2", 200, 230),
+    ])
+    
+    assert {(v.kind, v.task_ids[0]) for v in report.violations} == {
+        ("time_window", "early"),
+        ("time_window", "late"),
+        # No latest finish: the window ends with the horizon
+        ("horizon", "outside"),
+        ("time_window", "outside"),
+        ("duration", "short"),
+    }
+
+
+def test_moved_lock_is_an_error() -> None:
+    """Locked tasks must keep their technician, bay and times."""
+    input_data = make_input([
+        make_locked_task("moved", "t1", "b1", 0, 60),
+        make_locked_task("reassigned", "t2", "b2", 0, 60),
+        make_locked_task("kept", "t1", "b1", 60, 120),
+    ])
+    report = validate_schedule(input_data, [
+        make_item("moved", "t1", "b1", 200, 260, is_locked=True),
+        make_item("reassigned", "t1", "b2", 300, 360, is_locked=True),
+        make_item("kept", "t1", "b1", 60, 120, is_locked=True),
+    ])
+    
+    assert sorted(v.task_ids[0] for v in report.errors if v.kind == "lock_changed") == [
+        "moved",
+        "reassigned",
+    ]
+
+
+def test_coverage_errors() -> None:
+    """Every unlocked task exactly once, on known tasks and resources."""
+    input_data = make_input([
+        make_task("missing"),
+        make_task("twice"),
+        make_task("nowhere"),
+        make_locked_task("locked", "t1", "b1", 600, 660),
+    ])
+    report = validate_schedule(input_data, [
+        make_item("twice", "t1", "b1", 0, 60),
+        make_item("twice", "t2", "b2", 0, 60),
+        make_item("nowhere", "t9", "b1", 100, 160),
+        make_item("ghost", "t1", "b1", 200, 260),
+    ])
+    found = {(v.kind, v.task_ids[0]) for v in report.violations}
+    
+    # A locked task may be left out (it is saved as is)
+    assert found == {
+        ("missing_task", "missing"),
+        ("duplicate_task", "twice"),
+        ("unknown_resource", "nowhere"),
+        ("unknown_task", "ghost"),
+    }
+
+
+def test_report_stores_capped_violations_with_full_counts() -> None:
+    """to_dict keeps every count but only the first violations."""
+    tasks = [make_task(f"task-{i}") for i in range(MAX_REPORTED_VIOLATIONS + 10)]
+    report = validate_schedule(make_input(tasks), [])
+    stored = report.to_dict()
+    
+    assert stored["valid"] is False
+    assert stored["counts"] == {"missing_task": MAX_REPORTED_VIOLATIONS + 10}
+    assert len(stored["violations"]) == MAX_REPORTED_VIOLATIONS
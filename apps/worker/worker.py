@@ -3,10 +3,30 @@ import logging
 import os
 import signal
 import sys
+import time
 
+# dataclass(slots=True) and asyncio.timeout (see DECISION_LOG.md, item 4)
+if sys.version_info < (3, 11):
+    sys.exit("The worker requires Python 3.11+")
+
+from app import metrics
+from app.core.config import settings
 from app.core.logging import configure_logging
 from app.db.session import close_pool, get_pool
-from app.queue_processor import process_job
+from app.handlers.retention import enqueue_retention_jobs
+from app.job_dispatcher import (
+    JobDispatcher,
+    min_pool_size_for,
+    parse_job_backoff_caps,
+    parse_job_concurrency,
+    parse_job_timeouts,
+    pool_size_for,
+)
+from app.job_wakeup import job_wakeup
+from app.metrics_server import MetricsServer
+from app.queue_processor import reap_expired_jobs
+from app.scheduler.auto_replan import enqueue_auto_replans
+from app.scheduler.reference_cache import reference_cache
 
 
 configure_logging()
@@ -22,33 +42,100 @@ def handle_shutdown_signal(signum: int, frame: object) -> None:
     global _shutdown
     logger.info("shutdown_signal_received", extra={"signal": signum})
     _shutdown = True
+    # Stop waiting for jobs; in-flight ones are drained by the worker loop
+    job_wakeup.nudge()
 
 
 async def worker_loop(worker_id: str, poll_interval: float) -> None:
     """
     Main worker loop.
     
-    Continuously polls for jobs and processes them.
+    Runs jobs concurrently up to the per-type limits in `JOB_CONCURRENCY`,
+    claiming whenever a slot frees up or a job notification arrives. Polls
+    every `JOB_FALLBACK_POLL_SECONDS` for missed notifications, or every
+    `poll_interval` while the listener is down. On shutdown, in-flight jobs
+    get `SHUTDOWN_GRACE_SECONDS` to finish and are then handed back.
     Uses FOR UPDATE SKIP LOCKED for safe concurrent processing.
     """
     global _shutdown
     
-    pool = await get_pool()
-    logger.info("worker_started", extra={"worker_id": worker_id})
+    # Registered on the loop so a signal interrupts the wait immediately
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, handle_shutdown_signal, sig, None)
+    
+    limits = parse_job_concurrency(settings.job_concurrency)
+    min_connections = min_pool_size_for(limits)
+    if 0 < settings.db_pool_max_size < min_connections:
+        # A schedule run's load could never get all of its connections
+        raise ValueError(
+            f"DB_POOL_MAX_SIZE={settings.db_pool_max_size} is below the "
+            f"{min_connections} connections JOB_CONCURRENCY needs"
+        )
+    pool = await get_pool(settings.db_pool_max_size or pool_size_for(limits))
+    dispatcher = JobDispatcher(
+        pool,
+        worker_id,
+        limits,
+        parse_job_timeouts(settings.job_timeouts),
+        parse_job_backoff_caps(settings.job_retry_backoff_caps),
+    )
+    dispatcher.start()
+    metrics_server = MetricsServer(pool, worker_id)
+    if settings.metrics_port:
+        await metrics_server.start(settings.metrics_host, settings.metrics_port)
+    logger.info(
+        "worker_started",
+        extra={
+            "worker_id": worker_id,
+            "job_concurrency": dispatcher.limits,
+            "job_timeouts": dispatcher.timeouts,
+            "job_retry_backoff_caps": dispatcher.backoff_caps,
+        },
+    )
+    next_retention_check = time.monotonic()
+    next_auto_replan = time.monotonic()
+    next_reap = time.monotonic()
+    next_metrics_log = time.monotonic() + settings.metrics_log_interval_seconds
     
     try:
         while not _shutdown:
             try:
-                # Try to process a job
-                processed = await process_job(pool, worker_id)
+                # (Re)start the reference cache listener if it is down
+                await reference_cache.ensure_listening()
+                await job_wakeup.ensure_listening()
+                
+                # Enqueue retention jobs for orgs due one; checked at least hourly,
+                # the enqueue skips orgs that had a job within the interval
+                if settings.retention_interval_seconds > 0 and time.monotonic() >= next_retention_check:
+                    next_retention_check = time.monotonic() + min(settings.retention_interval_seconds, 3600)
+                    await enqueue_retention_jobs(pool)
+                
+                # Re-plan orgs whose schedule changes have settled
+                if settings.auto_replan_check_seconds > 0 and time.monotonic() >= next_auto_replan:
+                    next_auto_replan = time.monotonic() + settings.auto_replan_check_seconds
+                    await enqueue_auto_replans(pool)
+                
+                # Recover jobs from workers that died mid-job
+                if time.monotonic() >= next_reap:
+                    next_reap = time.monotonic() + settings.job_reaper_interval_seconds
+                    await reap_expired_jobs(pool)
+                
+                if time.monotonic() >= next_metrics_log:
+                    next_metrics_log = time.monotonic() + settings.metrics_log_interval_seconds
+                    logger.info("worker_metrics", extra={"worker_id": worker_id, **metrics.snapshot()})
+                
+                # Mark finished jobs, then claim jobs into free slots
+                await dispatcher.flush()
+                await dispatcher.fill()
+                
+                # Wait for a notification, a freed slot, the next poll or the
+                # next re-plan check
+                timeout = settings.job_fallback_poll_seconds if job_wakeup.listening else poll_interval
+                if settings.auto_replan_check_seconds > 0:
+                    timeout = min(timeout, max(0.0, next_auto_replan - time.monotonic()))
+                await job_wakeup.wait(timeout)
                 
-                if processed:
-                    # Job was processed, check for more immediately
-                    continue
-                else:
-                    # No jobs available, wait before polling again
-                    await asyncio.sleep(poll_interval)
-                    
             except Exception as e:
                 logger.error(
                     "worker_loop_error",
@@ -60,6 +147,10 @@ async def worker_loop(worker_id: str, poll_interval: float) -> None:
     
     finally:
         logger.info("worker_shutting_down", extra={"worker_id": worker_id})
+        await dispatcher.shutdown(settings.shutdown_grace_seconds)
+        await metrics_server.stop()
+        await reference_cache.stop()
+        await job_wakeup.stop()
         await close_pool()
         logger.info("worker_stopped", extra={"worker_id": worker_id})
 
@@ -69,10 +160,6 @@ def main() -> None:
     worker_id = os.getenv("WORKER_ID", "worker-1")
     poll_interval = float(os.getenv("POLL_INTERVAL_SECONDS", "2"))
     
-    # Register signal handlers for graceful shutdown
-    signal.signal(signal.SIGTERM, handle_shutdown_signal)
-    signal.signal(signal.SIGINT, handle_shutdown_signal)
-    
     try:
         asyncio.run(worker_loop(worker_id, poll_interval))
     except KeyboardInterrupt:
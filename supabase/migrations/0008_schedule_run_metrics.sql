@@ -0,0 +1,11 @@
+-- 0008_schedule_run_metrics.sql
+-- Per-run scheduler metrics (winning portfolio strategy, per-strategy stats, timings).
+-- Additive change.
+
+alter table public.schedule_runs
+  add column if not exists metrics jsonb;
+
+-- Lets us tune portfolio defaults from history, e.g. win counts per strategy.
+create index if not exists schedule_runs_org_strategy_idx
+  on public.schedule_runs (org_id, (metrics->>'strategy'))
+  where metrics is not null;
@@ -0,0 +1,8 @@
+-- 0009_org_scheduler_profile.sql
+-- Per-org CP-SAT solver profile (see docs/scheduler.md#solver-profiles).
+-- Null means the worker picks a profile from the run's task count.
+-- Additive change.
+
+alter table public.organizations
+  add column if not exists scheduler_profile text
+    check (scheduler_profile in ('fast', 'balanced', 'thorough'));
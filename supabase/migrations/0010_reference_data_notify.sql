@@ -0,0 +1,58 @@
+-- 0010_reference_data_notify.sql
+-- Notify workers when scheduler reference data changes, so their per-org
+-- caches (apps/worker/app/scheduler/reference_cache.py) can evict the org.
+-- Payload: {"org_id": "...", "table": "..."} on channel scheduler_reference_changed.
+-- Additive change.
+
+create or replace function public.notify_scheduler_reference_changed()
+returns trigger
+language plpgsql
+as $$
+declare
+  changed_org_id uuid;
+begin
+  if tg_op = 'DELETE' then
+    changed_org_id := old.org_id;
+  else
+    changed_org_id := new.org_id;
+  end if;
+
+  -- Identical payloads within one transaction are delivered once
+  perform pg_notify(
+    'scheduler_reference_changed',
+    json_build_object('org_id', changed_org_id, 'table', tg_table_name)::text
+  );
+  return null;
+end;
+$$;
+
+drop trigger if exists technicians_notify_reference on public.technicians;
+create trigger technicians_notify_reference
+after insert or update or delete on public.technicians
+for each row execute function public.notify_scheduler_reference_changed();
+
+drop trigger if exists technician_skills_notify_reference on public.technician_skills;
+create trigger technician_skills_notify_reference
+after insert or update or delete on public.technician_skills
+for each row execute function public.notify_scheduler_reference_changed();
+
+drop trigger if exists bays_notify_reference on public.bays;
+create trigger bays_notify_reference
+after insert or update or delete on public.bays
+for each row execute function public.notify_scheduler_reference_changed();
+
+drop trigger if exists bay_hours_notify_reference on public.bay_hours;
+create trigger bay_hours_notify_reference
+after insert or update or delete on public.bay_hours
+for each row execute function public.notify_scheduler_reference_changed();
+
+drop trigger if exists shifts_notify_reference on public.shifts;
+create trigger shifts_notify_reference
+after insert or update or delete on public.shifts
+for each row execute function public.notify_scheduler_reference_changed();
+
+drop trigger if exists technician_shift_assignments_notify_reference
+  on public.technician_shift_assignments;
+create trigger technician_shift_assignments_notify_reference
+after insert or update or delete on public.technician_shift_assignments
+for each row execute function public.notify_scheduler_reference_changed();
@@ -0,0 +1,12 @@
+-- 0011_task_horizon_indexes.sql
+-- Support horizon-scoped task loading in the worker (apps/worker/app/scheduler/data_loader.py):
+-- unlocked open tasks are filtered by their time window, locked ones by lock window overlap.
+-- Additive change.
+
+create index if not exists tasks_org_open_earliest_start_idx
+  on public.tasks (org_id, earliest_start)
+  where status in ('todo', 'scheduled') and not lock_flag;
+
+create index if not exists tasks_org_open_locked_window_idx
+  on public.tasks (org_id, locked_start_at, locked_end_at)
+  where status in ('todo', 'scheduled') and lock_flag;
@@ -0,0 +1,28 @@
+-- 0012_schedule_item_versions.sql
+-- Diff-based schedule publishing (see docs/scheduler.md#persistence).
+-- Each successful run gets the next per-org publish_seq; schedule_items rows are
+-- written only for new or changed assignments and are retired (not deleted) when
+-- replaced or dropped, so a run's schedule is the set of rows live at its seq.
+-- Rows from runs before this migration keep null seqs and are read by schedule_run_id.
+-- Additive change.
+
+alter table public.schedule_runs
+  add column if not exists publish_seq bigint;
+
+alter table public.schedule_items
+  add column if not exists published_seq bigint,
+  add column if not exists retired_seq bigint;
+
+create unique index if not exists schedule_runs_org_publish_seq_idx
+  on public.schedule_runs (org_id, publish_seq)
+  where publish_seq is not null;
+
+-- The org's live (currently published) schedule
+create index if not exists schedule_items_org_live_idx
+  on public.schedule_items (org_id, task_id)
+  where published_seq is not null and retired_seq is null;
+
+-- Reading a past run's schedule by seq window
+create index if not exists schedule_items_org_published_seq_idx
+  on public.schedule_items (org_id, published_seq)
+  where published_seq is not null;
@@ -0,0 +1,56 @@
+-- 0013_retention.sql
+-- Retention for schedule_items and job_queue (see docs/scheduler.md#retention).
+-- The worker's periodic `retention` job moves superseded schedule items and
+-- finished jobs into archive tables in small batches.
+-- Additive change.
+
+-- New job type, and a place for handlers to record what they did
+alter table public.job_queue drop constraint if exists job_queue_type_check;
+alter table public.job_queue
+  add constraint job_queue_type_check check (type in ('ai_enrich','schedule_run','retention'));
+
+alter table public.job_queue
+  add column if not exists result jsonb;
+
+-- Per-org retention in days; null uses the worker defaults
+alter table public.organizations
+  add column if not exists schedule_item_retention_days int
+    check (schedule_item_retention_days > 0),
+  add column if not exists job_retention_days int
+    check (job_retention_days > 0);
+
+-- ---------- archive tables ----------
+-- Same columns as the hot tables, no foreign keys, so archived rows outlive
+-- the runs/tasks/resources they reference.
+create table if not exists public.schedule_items_archive (
+  like public.schedule_items including defaults,
+  archived_at timestamptz not null default now()
+);
+
+create index if not exists schedule_items_archive_org_run_idx
+  on public.schedule_items_archive (org_id, schedule_run_id);
+create index if not exists schedule_items_archive_org_task_idx
+  on public.schedule_items_archive (org_id, task_id);
+
+create table if not exists public.job_queue_archive (
+  like public.job_queue including defaults,
+  archived_at timestamptz not null default now()
+);
+
+create index if not exists job_queue_archive_org_created_at_idx
+  on public.job_queue_archive (org_id, created_at desc);
+
+-- No client access (service role only), like job_queue
+alter table public.schedule_items_archive enable row level security;
+alter table public.job_queue_archive enable row level security;
+
+-- ---------- batch selection ----------
+-- Retired schedule items, by the publish that retired them
+create index if not exists schedule_items_org_retired_seq_idx
+  on public.schedule_items (org_id, retired_seq)
+  where retired_seq is not null;
+
+-- Finished jobs, oldest first
+create index if not exists job_queue_org_finished_updated_at_idx
+  on public.job_queue (org_id, updated_at)
+  where status in ('succeeded', 'failed');
@@ -0,0 +1,18 @@
+-- 0014_job_leases.sql
+-- Lease-based job claiming (see docs/job_queue.md#leases-and-recovery).
+-- A claimed job holds a lease that its worker extends while the job runs;
+-- workers requeue (or dead-letter) running jobs whose lease has expired.
+-- Jobs claimed before this migration have no lease and are recovered once
+-- they have been locked for an hour.
+-- Additive change.
+
+alter table public.job_queue
+  add column if not exists lease_expires_at timestamptz;
+
+alter table public.job_queue_archive
+  add column if not exists lease_expires_at timestamptz;
+
+-- Running jobs by lease expiry, for the reaper
+create index if not exists job_queue_running_lease_idx
+  on public.job_queue (lease_expires_at)
+  where status = 'running';
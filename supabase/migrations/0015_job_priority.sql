@@ -0,0 +1,19 @@
+-- 0015_job_priority.sql
+-- Job priorities and per-org fair claiming (see docs/job_queue.md#priorities-and-fairness).
+-- Workers claim the highest priority first and, within a priority, take
+-- turns across orgs. Rows inserted without a priority (bulk scripts,
+-- background jobs) get 0; the API enqueues at 50 and interactive requests
+-- at 100.
+-- Additive change.
+
+alter table public.job_queue
+  add column if not exists priority int not null default 0
+    check (priority between 0 and 100);
+
+alter table public.job_queue_archive
+  add column if not exists priority int;
+
+-- Per-org claim order; the claim query reads each org's head of queue from here
+create index if not exists job_queue_org_claim_idx
+  on public.job_queue (org_id, type, priority desc, run_after, created_at)
+  where status = 'queued';
@@ -0,0 +1,21 @@
+-- 0016_job_dedupe.sql
+-- Idempotent enqueue (see docs/job_queue.md#deduplication).
+-- A job enqueued with a dedupe_key is not created again while a job with the
+-- same org, type and key is queued or running (enforced here), or succeeded
+-- within the caller's dedupe window (checked by enqueue_job).
+-- Additive change.
+
+alter table public.job_queue
+  add column if not exists dedupe_key text;
+
+alter table public.job_queue_archive
+  add column if not exists dedupe_key text;
+
+create unique index if not exists job_queue_active_dedupe_key_idx
+  on public.job_queue (org_id, type, dedupe_key)
+  where dedupe_key is not null and status in ('queued', 'running');
+
+-- Recently finished jobs with a key, for the dedupe window
+create index if not exists job_queue_dedupe_key_idx
+  on public.job_queue (org_id, type, dedupe_key, updated_at desc)
+  where dedupe_key is not null;
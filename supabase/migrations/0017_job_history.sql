@@ -0,0 +1,39 @@
+-- 0017_job_history.sql
+-- Hot/cold split of job_queue (see docs/job_queue.md#job-history).
+-- Jobs move from job_queue to job_history in the statement that finishes
+-- them, so job_queue holds only queued and running jobs and its indexes
+-- stay small. Finished jobs already in job_queue are moved by the retention
+-- job in batches; job_history rows past the org's job retention move on to
+-- job_queue_archive.
+-- Replaces job_queue_status_run_after_idx, which indexed every finished job,
+-- with a partial index on claimable rows.
+
+create table if not exists public.job_history (
+  like public.job_queue including defaults,
+  finished_at timestamptz not null default now(),
+  primary key (id),
+  foreign key (org_id) references public.organizations(id) on delete cascade
+);
+
+-- list_jobs, newest first
+create index if not exists job_history_org_created_at_idx
+  on public.job_history (org_id, created_at desc);
+
+-- Retention batches and finished-job counts
+create index if not exists job_history_org_updated_at_idx
+  on public.job_history (org_id, updated_at);
+
+-- Succeeded jobs within the dedupe window
+create index if not exists job_history_dedupe_key_idx
+  on public.job_history (org_id, type, dedupe_key, updated_at desc)
+  where dedupe_key is not null;
+
+-- No client access (service role only), like job_queue
+alter table public.job_history enable row level security;
+
+-- Claimable rows only; finished jobs no longer bloat the claim path
+create index if not exists job_queue_claimable_idx
+  on public.job_queue (run_after, created_at)
+  where status = 'queued';
+
+drop index if exists public.job_queue_status_run_after_idx;
@@ -0,0 +1,15 @@
+-- 0018_job_error_class.sql
+-- Why a job's last attempt failed (see docs/job_queue.md#timeouts).
+-- 'timeout' when the worker cancelled a handler that ran past its type's
+-- timeout, 'lease_expired' when the reaper recovered it from a dead worker,
+-- 'error' for any other handler failure; null until a job fails.
+-- Additive change.
+
+alter table public.job_queue
+  add column if not exists error_class text;
+
+alter table public.job_history
+  add column if not exists error_class text;
+
+alter table public.job_queue_archive
+  add column if not exists error_class text;
@@ -0,0 +1,110 @@
+-- 0019_schedule_change_events.sql
+-- Automatic re-planning (see docs/scheduler.md#automatic-re-planning).
+-- Triggers on tasks and work_orders record schedule-relevant changes; the
+-- worker waits for a per-org quiet period, then enqueues at most one
+-- schedule run for everything recorded and deletes the events it covered.
+-- Writes the scheduler itself makes (todo -> scheduled on publish) are not
+-- recorded, so a run never triggers the next one.
+-- Additive change.
+
+-- Lock and task edits get their own trigger; the others already exist
+alter table public.schedule_runs drop constraint if exists schedule_runs_trigger_check;
+alter table public.schedule_runs
+  add constraint schedule_runs_trigger_check
+    check (trigger in ('manual','auto_parts','auto_callout','auto_hot_job','auto_edit','override'));
+
+-- Per-org quiet period in seconds; null uses the worker default, 0 disables
+alter table public.organizations
+  add column if not exists auto_replan_quiet_seconds int
+    check (auto_replan_quiet_seconds >= 0);
+
+create table if not exists public.schedule_change_events (
+  id bigint generated always as identity primary key,
+  org_id uuid not null references public.organizations(id) on delete cascade,
+  trigger text not null check (trigger in ('auto_parts','auto_callout','auto_hot_job','auto_edit')),
+  work_order_id uuid,
+  task_id uuid,
+  -- Affects only the tasks named here; false needs a full re-plan
+  local boolean not null,
+  created_at timestamptz not null default now()
+);
+
+create index if not exists schedule_change_events_org_id_idx
+  on public.schedule_change_events (org_id, id);
+
+-- No client access (service role only), like job_queue
+alter table public.schedule_change_events enable row level security;
+
+-- ---------- capture ----------
+create or replace function public.record_task_schedule_change()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op = 'INSERT' then
+    if new.status in ('todo', 'scheduled') then
+      insert into public.schedule_change_events (org_id, trigger, work_order_id, task_id, local)
+      values (new.org_id, 'auto_callout', new.work_order_id, new.id, true);
+    end if;
+  elsif tg_op = 'DELETE' then
+    if old.status in ('todo', 'scheduled') then
+      insert into public.schedule_change_events (org_id, trigger, work_order_id, task_id, local)
+      values (old.org_id, 'auto_edit', old.work_order_id, old.id, true);
+    end if;
+  elsif (old.status in ('todo', 'scheduled')) is distinct from (new.status in ('todo', 'scheduled'))
+    or (new.status in ('todo', 'scheduled') and (
+      old.lock_flag is distinct from new.lock_flag
+      or old.locked_tech_id is distinct from new.locked_tech_id
+      or old.locked_bay_id is distinct from new.locked_bay_id
+      or old.locked_start_at is distinct from new.locked_start_at
+      or old.locked_end_at is distinct from new.locked_end_at
+      or old.earliest_start is distinct from new.earliest_start
+      or old.latest_finish is distinct from new.latest_finish
+      or old.duration_minutes_low is distinct from new.duration_minutes_low
+      or old.duration_minutes_high is distinct from new.duration_minutes_high
+      or old.required_skill is distinct from new.required_skill
+      or old.required_skill_is_hard is distinct from new.required_skill_is_hard
+      or old.required_bay_type is distinct from new.required_bay_type
+    ))
+  then
+    -- todo <-> scheduled (the scheduler publishing) stays inside the set
+    insert into public.schedule_change_events (org_id, trigger, work_order_id, task_id, local)
+    values (new.org_id, 'auto_edit', new.work_order_id, new.id, true);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists tasks_record_schedule_change on public.tasks;
+create trigger tasks_record_schedule_change
+after insert or update or delete on public.tasks
+for each row execute function public.record_task_schedule_change();
+
+create or replace function public.record_work_order_schedule_change()
+returns trigger
+language plpgsql
+as $$
+begin
+  if old.parts_ready is distinct from new.parts_ready then
+    insert into public.schedule_change_events (org_id, trigger, work_order_id, local)
+    values (new.org_id, 'auto_parts', new.id, true);
+  end if;
+  if new.priority > old.priority then
+    -- A hotter job may need other work moved out of its way
+    insert into public.schedule_change_events (org_id, trigger, work_order_id, local)
+    values (new.org_id, 'auto_hot_job', new.id, false);
+  elsif new.priority < old.priority
+    or old.due_date is distinct from new.due_date
+    or old.customer_commitment_at is distinct from new.customer_commitment_at
+  then
+    insert into public.schedule_change_events (org_id, trigger, work_order_id, local)
+    values (new.org_id, 'auto_edit', new.id, true);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists work_orders_record_schedule_change on public.work_orders;
+create trigger work_orders_record_schedule_change
+after update on public.work_orders
+for each row execute function public.record_work_order_schedule_change();
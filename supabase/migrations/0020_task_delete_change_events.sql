@@ -0,0 +1,48 @@
+-- 0020_task_delete_change_events.sql
+-- Fix for 0019: deleting an organization with open tasks failed, because the
+-- cascaded task deletes recorded schedule change events for the org being
+-- deleted. Task deletes now only record an event while the org exists.
+-- Replaces the trigger function only; the trigger itself is unchanged.
+
+create or replace function public.record_task_schedule_change()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op = 'INSERT' then
+    if new.status in ('todo', 'scheduled') then
+      insert into public.schedule_change_events (org_id, trigger, work_order_id, task_id, local)
+      values (new.org_id, 'auto_callout', new.work_order_id, new.id, true);
+    end if;
+  elsif tg_op = 'DELETE' then
+    -- Deleting an organization cascades to its tasks after the org row is
+    -- gone; there is nothing left to re-plan, and the event would violate
+    -- its foreign key
+    if old.status in ('todo', 'scheduled') then
+      insert into public.schedule_change_events (org_id, trigger, work_order_id, task_id, local)
+      select old.org_id, 'auto_edit', old.work_order_id, old.id, true
+      where exists (select 1 from public.organizations o where o.id = old.org_id);
+    end if;
+  elsif (old.status in ('todo', 'scheduled')) is distinct from (new.status in ('todo', 'scheduled'))
+    or (new.status in ('todo', 'scheduled') and (
+      old.lock_flag is distinct from new.lock_flag
+      or old.locked_tech_id is distinct from new.locked_tech_id
+      or old.locked_bay_id is distinct from new.locked_bay_id
+      or old.locked_start_at is distinct from new.locked_start_at
+      or old.locked_end_at is distinct from new.locked_end_at
+      or old.earliest_start is distinct from new.earliest_start
+      or old.latest_finish is distinct from new.latest_finish
+      or old.duration_minutes_low is distinct from new.duration_minutes_low
+      or old.duration_minutes_high is distinct from new.duration_minutes_high
+      or old.required_skill is distinct from new.required_skill
+      or old.required_skill_is_hard is distinct from new.required_skill_is_hard
+      or old.required_bay_type is distinct from new.required_bay_type
+    ))
+  then
+    -- todo <-> scheduled (the scheduler publishing) stays inside the set
+    insert into public.schedule_change_events (org_id, trigger, work_order_id, task_id, local)
+    values (new.org_id, 'auto_edit', new.work_order_id, new.id, true);
+  end if;
+  return null;
+end;
+$$;
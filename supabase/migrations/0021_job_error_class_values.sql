@@ -0,0 +1,16 @@
+-- 0021_job_error_class_values.sql
+-- Documents the error classes in the schema, including 'non_retryable',
+-- added after 0018 (see docs/job_queue.md#retry-logic). Comments only.
+
+comment on column public.job_queue.error_class is
+  'Why the last attempt failed: timeout (cancelled past the type''s timeout), '
+  'lease_expired (recovered from a dead worker), non_retryable (NonRetryableError, '
+  'dead-lettered at once) or error; null until a job fails';
+
+comment on column public.job_history.error_class is
+  'Why the last attempt failed: timeout, lease_expired, non_retryable or error; '
+  'null for jobs that never failed';
+
+comment on column public.job_queue_archive.error_class is
+  'Why the last attempt failed: timeout, lease_expired, non_retryable or error; '
+  'null for jobs that never failed';
@@ -0,0 +1,12 @@
+-- 0022_job_queue_status_index.sql
+-- Reverts the index swap in 0017. Claims read job_queue_org_claim_idx (0015),
+-- so job_queue_claimable_idx was never used, while dropping
+-- job_queue_status_run_after_idx left the reaper's unleased branch and the
+-- queue gauges (status in ('queued', 'running')) without an index. Now that
+-- job_queue holds only queued and running jobs (0017), the full index stays
+-- the size of the backlog.
+
+drop index if exists public.job_queue_claimable_idx;
+
+create index if not exists job_queue_status_run_after_idx
+  on public.job_queue (status, run_after);